@@ -1,75 +1,173 @@
-from flask import Flask, render_template, request, jsonify
+import time
+BOOT_STARTED = time.perf_counter()
+
+from flask import Flask, Response, abort, g, render_template, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+from concurrent.futures import ThreadPoolExecutor
 from utils.algebra import MatrixAlgebra
-from scipy.integrate import solve_ivp
+from utils.factorization import Factorizations, factorization_cache
+from utils.storage import MatrixStore
+from utils.history import HistoryLog
+from utils.workers import OperationTimeout, symbolic_pool
+from utils.jobs import JobQueueFull, job_queue
+from utils.transport import MatrixTransport
+from utils.results import ResultEncoder
+from utils.singleflight import request_key, single_flight
+from utils.sparse import SparseAlgebra
+from utils.parametric import ParametricAlgebra
+from utils.expressions import MatrixExpression
+from utils.incremental import analysis_sessions
+from utils.ode import OdeProblem, OdeSolver, OdeSweep, sweep_pool, LINEAR_METHOD
+from utils.lazy import MATH_PRELOAD, BOOT_TIME_BUDGET, start_preload, import_report
+from utils.metrics import (
+    metrics, track_operation, http_requests, http_latency, http_errors, phase_latency, operation_engines,
+    ode_evaluations, CONTENT_TYPE
+)
 import re
 import numpy as np
 import json
 import os
+import atexit
+
+class ArrayJSONProvider(DefaultJSONProvider):
+    def dumps(self, obj, **kwargs):
+        return ResultEncoder.dumps(obj, fallback=DefaultJSONProvider.default).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return ResultEncoder.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Encoded straight to bytes; arrays never pass through Python lists
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(ResultEncoder.dumps(obj, fallback=DefaultJSONProvider.default),
+                                        mimetype=self.mimetype)
 
 app = Flask(__name__)
+app.json = ArrayJSONProvider(app)
 app.secret_key = os.environ.get("SECRET_KEY", "matrix_lab_pro_secure_key_2025")
 
 MATRICES_FILE = 'data/matrices.json'
+MATRICES_DB = os.environ.get("MATRICES_DB", 'data/matrices.db')
 HISTORY_FILE = 'data/computation_history.json'
-os.makedirs('data', exist_ok=True)
+HISTORY_LOG = os.environ.get("HISTORY_LOG", 'data/computation_history.jsonl')
+# Spawned pool workers re-import the script that started them as __mp_main__; under
+# `python app.py` that is this file, and they must not open the store, log or exit hooks
+SERVICE_PROCESS = __name__ != "__mp_main__"
+if SERVICE_PROCESS:
+    os.makedirs('data', exist_ok=True)
+MAX_MATRIX_DIM = int(os.environ.get("MAX_MATRIX_DIM", 1000))
+
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", 4))
+BATCH_MAX_JOBS = int(os.environ.get("BATCH_MAX_JOBS", 100))
+batch_executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS)
+
+if SERVICE_PROCESS:
+    matrix_store = MatrixStore(MATRICES_DB)
+    matrix_store.migrate_json(MATRICES_FILE)
 
 class MatrixManager:
     @staticmethod
     def load_matrices():
         try:
-            if os.path.exists(MATRICES_FILE):
-                with open(MATRICES_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return []
+            return matrix_store.all()
         except:
             return []
 
     @staticmethod
-    def save_matrices(matrices):
-        try:
-            with open(MATRICES_FILE, 'w', encoding='utf-8') as f:
-                json.dump(matrices, f, indent=2)
-            return True
-        except:
-            return False
+    def list_matrices(page=1, per_page=50):
+        per_page = min(max(int(per_page), 1), 500)
+        page = max(int(page), 1)
+        return {
+            "matrices": matrix_store.list((page - 1) * per_page, per_page),
+            "total": matrix_store.count(),
+            "page": page,
+            "per_page": per_page
+        }
+
+    @staticmethod
+    def get_matrix(name):
+        return matrix_store.get(name)
+
+    @staticmethod
+    def save_matrix(name, matrix):
+        return matrix_store.insert(name, matrix)
+
+    @staticmethod
+    def update_matrix(old_name, new_name, matrix):
+        return matrix_store.update(old_name, new_name, matrix)
+
+    @staticmethod
+    def edit_matrix(old_name, new_name, change):
+        return matrix_store.edit(old_name, new_name, change)
+
+    @staticmethod
+    def delete_matrix(name):
+        return matrix_store.delete(name)
+
+if SERVICE_PROCESS:
+    history_log = HistoryLog(HISTORY_LOG)
+    history_log.import_json(HISTORY_FILE)
+    atexit.register(history_log.close)
+    atexit.register(symbolic_pool.shutdown)
+    atexit.register(job_queue.shutdown)
+    atexit.register(sweep_pool.shutdown)
 
 class HistoryManager:
     @staticmethod
-    def load_history():
+    def load_history(n=10):
         try:
-            if os.path.exists(HISTORY_FILE):
-                with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return []
+            return history_log.tail(n)
         except:
             return []
 
     @staticmethod
-    def save_history(history):
-        try:
-            with open(HISTORY_FILE, 'w', encoding='utf-8') as f:
-                json.dump(history[-50:], f, indent=2)
-            return True
-        except:
-            return False
+    def clear_history():
+        history_log.clear()
 
     @staticmethod
-    def add_entry(operation, matrix_name, result):
-        history = HistoryManager.load_history()
-        entry = {
+    def make_entry(operation, matrix_name, result):
+        return {
             'timestamp': np.datetime64('now').astype(str),
             'operation': operation,
             'matrix': matrix_name,
-            'result_preview': str(result)[:100] + '...' if len(str(result)) > 100 else str(result)
+            'result_preview': HistoryLog.preview(result)
         }
-        history.append(entry)
-        HistoryManager.save_history(history)
+
+    @staticmethod
+    def add_entry(operation, matrix_name, result):
+        history_log.record(HistoryManager.make_entry(operation, matrix_name, result))
+
+    @staticmethod
+    def add_entries(entries):
+        for entry in entries:
+            history_log.record(entry)
+
+operation_handlers = {
+    "rref": MatrixAlgebra.rref,
+    "ref": MatrixAlgebra.ref,
+    "det": MatrixAlgebra.det,
+    "linear_independent": MatrixAlgebra.linear_independent,
+    "basis_dimension": lambda m, **options: format_basis_result(MatrixAlgebra.basis_dimension(m, **options)),
+    "row_space": MatrixAlgebra.row_space,
+    "col_space": MatrixAlgebra.col_space,
+    "eig": MatrixAlgebra.eig,
+    "diagonalize": MatrixAlgebra.diagonalize,
+    "inverse": MatrixAlgebra.inverse,
+    "transpose": MatrixAlgebra.transpose,
+    "trace": MatrixAlgebra.trace,
+    "rank": MatrixAlgebra.rank,
+    "nullity": MatrixAlgebra.nullity,
+    "power": MatrixAlgebra.power,
+    "expm": MatrixAlgebra.expm
+}
+# Request fields forwarded to the handler: partial spectra, the exponent of a power, the time of expm
+OPERATION_OPTIONS = {"eig": ("k", "which"), "power": ("exponent",), "expm": ("t",)}
 
 @app.route("/", methods=["GET", "POST"])
 def index():
     try:
-        rows = min(max(int(request.form.get("mRows", 3)), 1), 10)
-        cols = min(max(int(request.form.get("mCols", 3)), 1), 10)
+        rows = min(max(int(request.form.get("mRows", 3)), 1), MAX_MATRIX_DIM)
+        cols = min(max(int(request.form.get("mCols", 3)), 1), MAX_MATRIX_DIM)
     except:
         rows, cols = 3, 3
 
@@ -91,10 +189,11 @@ def index():
                         row.append(0.0)
                 matrix.append(row)
 
-            name = request.form.get("mName", "").strip() or f"M{len(MatrixManager.load_matrices()) + 1}"
-            matrices = MatrixManager.load_matrices()
-            matrices.append({"name": name, "matrix": matrix})
-            MatrixManager.save_matrices(matrices)
+            name = request.form.get("mName", "").strip() or f"M{matrix_store.count() + 1}"
+            try:
+                MatrixManager.save_matrix(name, matrix)
+            except ValueError as e:
+                computation_result = str(e)
 
         elif action == "operation":
             operation = request.form.get("op")
@@ -106,26 +205,8 @@ def index():
                 matrix = [[0.0 for _ in range(cols)] for _ in range(rows)]
 
             try:
-                operation_handlers = {
-                    "rref": MatrixAlgebra.rref,
-                    "ref": MatrixAlgebra.ref,
-                    "det": MatrixAlgebra.det,
-                    "linear_independent": MatrixAlgebra.linear_independent,
-                    "basis_dimension": lambda m: format_basis_result(MatrixAlgebra.basis_dimension(m)),
-                    "row_space": MatrixAlgebra.row_space,
-                    "col_space": MatrixAlgebra.col_space,
-                    "eig": MatrixAlgebra.eig,
-                    "diagonalize": MatrixAlgebra.diagonalize,
-                    "inverse": MatrixAlgebra.inverse,
-                    "transpose": MatrixAlgebra.transpose,
-                    "trace": MatrixAlgebra.trace,
-                    "rank": MatrixAlgebra.rank,
-                    "nullity": MatrixAlgebra.nullity
-                }
-
-                handler = operation_handlers.get(operation)
-                if handler:
-                    computation_result = handler(matrix)
+                if operation in operation_handlers:
+                    computation_result = run_operation(operation, matrix)[0]
                 else:
                     computation_result = f"Unsupported operation: {operation}"
 
@@ -136,83 +217,394 @@ def index():
         "index.html",
         rows=rows,
         cols=cols,
+        max_dim=MAX_MATRIX_DIM,
         matrix=matrix,
-        matrices=MatrixManager.load_matrices(),
+        matrices=MatrixManager.list_matrices()["matrices"],
         result=computation_result,
-        history=HistoryManager.load_history()[-5:]
+        history=HistoryManager.load_history(5)
     )
 
+def read_payload():
+    # JSON, msgpack or a raw .npy body; encoded matrices come back as NumPy arrays
+    try:
+        with phase_latency.time("decode"):
+            g.payload = MatrixTransport.read_request(request)
+    except Exception as e:
+        abort(jsonify({"success": False, "error": f"Could not decode request body: {str(e)}"}))
+    return g.payload
+
+def respond(payload):
+    data = g.get("payload")
+    if isinstance(payload, dict) and payload.get("success") is False:
+        g.failed = True
+    started = time.perf_counter()
+    try:
+        mimetype = MatrixTransport.response_format(request, data)
+        body, mimetype = MatrixTransport.pack(payload, mimetype, MatrixTransport.option(request, data, "encoding") == "base64")
+    except ValueError as e:
+        g.failed = True
+        return jsonify({"success": False, "error": str(e)})
+    response = jsonify(body) if mimetype == "application/json" else Response(body, mimetype=mimetype)
+    phase_latency.observe(time.perf_counter() - started, "encode")
+    return response
+
+def matrix_dimension(matrix):
+    # Cheap on purpose: never converts a nested list just to measure it
+    if isinstance(matrix, Factorizations):
+        matrix = matrix.matrix
+    shape = getattr(matrix, "shape", None)
+    if shape is not None:
+        return max(shape) if len(shape) else None
+    if isinstance(matrix, (list, tuple)) and matrix:
+        return max(len(matrix), len(matrix[0]) if isinstance(matrix[0], (list, tuple)) else 1)
+    return None
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    if MATH_PRELOAD:
+        # The first request of any kind (typically a health check) means the worker is serving
+        start_preload()
+
+@app.after_request
+def record_request_metrics(response):
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    started = g.get("request_started")
+    if started is not None:
+        http_latency.observe(time.perf_counter() - started, route, request.method)
+    http_requests.inc(route, request.method, str(response.status_code))
+    failed = g.get("failed") or response.status_code >= 400
+    if not failed and response.is_json and not response.is_streamed and (response.content_length or 0) < 4096:
+        # Older routes answer errors with a small jsonify body rather than going through respond()
+        failed = b'"success":false' in response.get_data()
+    if failed:
+        http_errors.inc(route)
+    return response
+
+def resolve_matrix(matrix, dense=False):
+    # Sparse inputs stay sparse end to end unless the caller explicitly asks to densify
+    if SparseAlgebra.is_sparse(matrix):
+        return SparseAlgebra.densify(matrix) if dense else SparseAlgebra.from_payload(matrix)
+    return matrix
+
+def run_operation(operation, matrix, engine="auto", tol=None, options=None, monitor=None):
+    # A cancellable caller computes on its own: cancelling must not fail the requests coalesced onto it
+    key = operation_key(operation, matrix, engine, tol, options) if monitor is None else None
+    with track_operation(operation, matrix_dimension(matrix)):
+        result, used = single_flight.run(
+            "operation", key, lambda: compute_operation(operation, matrix, engine, tol, options, monitor)
+        )
+    operation_engines.inc(operation, used)
+    return result, used
+
+def operation_key(operation, matrix, engine, tol, options=None):
+    # Dense inputs are identified by the factorization cache's content hash, which hashes them once
+    if not SparseAlgebra.is_sparse(matrix):
+        factorizations = Factorizations.of(matrix)
+        matrix = factorizations.key or factorizations.matrix
+    return request_key("operation", operation, matrix, engine, tol, options)
+
+def compute_operation(operation, matrix, engine="auto", tol=None, options=None, monitor=None):
+    if SparseAlgebra.is_sparse(matrix):
+        return SparseAlgebra.run(operation, matrix, tol, **(options or {})), "sparse"
+    handler = operation_handlers[operation]
+    factorizations = Factorizations.of(matrix)
+    used = MatrixAlgebra.engine_for(operation, factorizations, engine)
+    if used != "symbolic" or not symbolic_pool.handles(operation):
+        return MatrixAlgebra.run(handler, operation, factorizations, engine, tol, options)
+
+    # SymPy can run for minutes on awkward inputs; isolate it in a killable worker
+    result = factorizations.memo(
+        ("symbolic_result", operation, tol),
+        lambda: symbolic_pool.run(operation, factorizations.matrix, {"engine": "symbolic", "tol": tol}, monitor)
+    )
+    if operation == "basis_dimension":
+        result = format_basis_result(result)
+    return result, used
+
+def format_operation_result(operation, result):
+    if operation == "linear_independent":
+        return "Linearly Independent" if result else "Linearly Dependent"
+    if operation == "basis_dimension" and isinstance(result, dict):
+        return {
+            "rank": int(result["rank"]),
+            "independent": bool(result["independent"]),
+            "column_basis": result["column_basis"],
+            "row_basis": result["row_basis"],
+            "span_basis": result["span_basis"]
+        }
+    return result
+
+def exact_fields(operation, matrix, engine_used):
+    # Floats stay in "result"; the exact engine adds the same values as fractions
+    if engine_used != "exact":
+        return {}
+    exact = MatrixAlgebra.exact_form(operation, matrix)
+    return {"exact": exact} if exact is not None else {}
+
 def format_basis_result(basis_data):
     rank, independent, col_basis, row_basis, span_basis = basis_data
     return {
         "rank": rank,
         "independent": independent,
-        "column_basis": [[float(x) for x in v] for v in col_basis],
-        "row_basis": row_basis,
-        "span_basis": [[float(x) for x in v] for v in span_basis]
+        "column_basis": ResultEncoder.as_array(col_basis),
+        "row_basis": ResultEncoder.as_array(row_basis),
+        "span_basis": ResultEncoder.as_array(span_basis)
     }
 
 @app.route("/api/single_matrix_operation", methods=["POST"])
 def single_matrix_operation():
-    data = request.get_json()
+    data = read_payload()
 
     if not data:
-        return jsonify({"success": False, "error": "No data provided"})
+        return respond({"success": False, "error": "No data provided"})
 
     matrix = data.get("matrix")
     operation = data.get("operation")
     matrix_name = data.get("matrix_name", "Unknown")
+    engine = data.get("engine", "auto")
+    tol = data.get("tol")
+    options = {key: data[key] for key in OPERATION_OPTIONS[operation] if key in data} if operation in OPERATION_OPTIONS else None
 
-    if not matrix or not operation:
-        return jsonify({"success": False, "error": "Matrix and operation required"})
+    if matrix is None or not operation:
+        return respond({"success": False, "error": "Matrix and operation required"})
 
     try:
-        operation_handlers = {
-            "rref": MatrixAlgebra.rref,
-            "ref": MatrixAlgebra.ref,
-            "det": MatrixAlgebra.det,
-            "linear_independent": MatrixAlgebra.linear_independent,
-            "basis_dimension": lambda m: format_basis_result(MatrixAlgebra.basis_dimension(m)),
-            "row_space": MatrixAlgebra.row_space,
-            "col_space": MatrixAlgebra.col_space,
-            "eig": MatrixAlgebra.eig,
-            "diagonalize": MatrixAlgebra.diagonalize,
-            "inverse": MatrixAlgebra.inverse,
-            "transpose": MatrixAlgebra.transpose,
-            "trace": MatrixAlgebra.trace,
-            "rank": MatrixAlgebra.rank,
-            "nullity": MatrixAlgebra.nullity
-        }
+        if operation not in operation_handlers:
+            return respond({"success": False, "error": f"Unsupported operation: {operation}"})
 
-        handler = operation_handlers.get(operation)
-        if not handler:
-            return jsonify({"success": False, "error": f"Unsupported operation: {operation}"})
+        matrix = resolve_matrix(matrix, data.get("dense", False))
+        result, engine_used = run_operation(operation, matrix, engine, tol, options)
+        result = format_operation_result(operation, result)
 
-        result = handler(matrix)
+        HistoryManager.add_entry(operation, matrix_name, result)
+        return respond({"success": True, "result": result, "engine": engine_used,
+                        **exact_fields(operation, matrix, engine_used)})
 
-        if operation == "linear_independent":
-            result = "Linearly Independent" if result else "Linearly Dependent"
-        elif operation == "basis_dimension" and isinstance(result, dict):
-            result = {
-                "rank": int(result["rank"]),
-                "independent": bool(result["independent"]),
-                "column_basis": result["column_basis"],
-                "row_basis": result["row_basis"],
-                "span_basis": result["span_basis"]
-            }
+    except OperationTimeout as e:
+        return respond(e.to_dict())
+    except Exception as e:
+        return respond({"success": False, "error": str(e)})
 
-        HistoryManager.add_entry(operation, matrix_name, result)
-        return jsonify({"success": True, "result": result})
+@app.route("/api/eig_stack", methods=["POST"])
+def eig_stack():
+    data = read_payload()
+
+    if not data:
+        return respond({"success": False, "error": "No data provided"})
+
+    # A .npy body arrives as "matrix"; JSON clients send "matrices"
+    matrices = data.get("matrices", data.get("matrix"))
+    if matrices is None:
+        return respond({"success": False, "error": "A stack of matrices is required"})
+
+    try:
+        with track_operation("eig_stack", matrix_dimension(matrices)):
+            result = MatrixAlgebra.eig_stack(matrices, data.get("k"), data.get("which", "largest"))
+        operation_engines.inc("eig_stack", "numeric")
+        HistoryManager.add_entry("Batched eigen analysis", data.get("matrix_name", "Matrix stack"),
+                                 f"{result['count']} matrices, {result['structure']}")
+        return respond({"success": True, "result": result, "engine": "numeric"})
 
     except Exception as e:
-        return jsonify({"success": False, "error": str(e)})
+        return respond({"success": False, "error": str(e)})
+
+def parse_parametric_request(data):
+    operation = data.get("operation")
+    matrix = data.get("matrix")
+    parameters = data.get("parameters")
+    if matrix is None or not operation or not parameters:
+        raise ValueError("A matrix, an operation and a parameter grid are required")
+    return {
+        "operation": operation,
+        "matrix": matrix,
+        "parameters": parameters,
+        "mode": data.get("mode", "grid"),
+        "tol": data.get("tol"),
+        "method": data.get("method", "auto"),
+        "matrix_name": data.get("matrix_name", "Parametric matrix")
+    }
+
+def run_parametric(params):
+    options = {key: value for key, value in params.items() if key != "matrix_name"}
+    with track_operation(f"parametric_{params['operation']}", matrix_dimension(params["matrix"])):
+        result = single_flight.run("parametric", request_key("parametric", options),
+                                   lambda: ParametricAlgebra.evaluate(**options))
+    operation_engines.inc(f"parametric_{params['operation']}", result["method"])
+    HistoryManager.add_entry(f"Parametric {params['operation']}", params["matrix_name"],
+                             f"{result['points']} grid points, {result['method']}")
+    return result
+
+@app.route("/api/parametric_operation", methods=["POST"])
+def parametric_operation():
+    data = read_payload()
+
+    if not data:
+        return respond({"success": False, "error": "No data provided"})
+
+    try:
+        return respond({"success": True, "result": run_parametric(parse_parametric_request(data))})
+
+    except Exception as e:
+        return respond({"success": False, "error": str(e)})
+
+def parse_expression_request(data):
+    expression = data.get("expression")
+    matrices = data.get("matrices") or {}
+    outputs = data.get("outputs") or []
+    if not isinstance(expression, str) or not expression.strip():
+        raise ValueError("An expression is required")
+    if not isinstance(matrices, dict) or not isinstance(outputs, list):
+        raise ValueError("matrices must map names to matrices and outputs must list assigned names")
+    return {"expression": expression, "matrices": matrices, "outputs": outputs, "tol": data.get("tol")}
+
+def run_expression(params):
+    # Matrices sent with the request shadow saved ones of the same name
+    inline = params["matrices"]
+    graph = MatrixExpression.compile(
+        params["expression"], lambda name: inline[name] if name in inline else MatrixManager.get_matrix(name),
+        params["outputs"]
+    )
+    leaves = {name: factorizations.key for name, factorizations in graph.leaves.items()}
+    size = max((max(f.array().shape) for f in graph.leaves.values()), default=None)
+    with track_operation("matrix_expression", size):
+        result = single_flight.run(
+            "expression", request_key("expression", params["expression"], leaves, params["outputs"], params["tol"]),
+            lambda: MatrixExpression.evaluate(graph, params["tol"])
+        )
+    operation_engines.inc("matrix_expression", "numeric")
+    HistoryManager.add_entry("Matrix expression", params["expression"], result["result"])
+    return result
+
+@app.route("/api/matrix_expression", methods=["POST"])
+def matrix_expression():
+    data = read_payload()
+
+    if not data:
+        return respond({"success": False, "error": "No data provided"})
+
+    try:
+        return respond({"success": True, "result": run_expression(parse_expression_request(data))})
+
+    except Exception as e:
+        return respond({"success": False, "error": str(e)})
+
+@app.route("/api/sparse_operation", methods=["POST"])
+def sparse_operation():
+    data = read_payload()
+
+    if not data:
+        return respond({"success": False, "error": "No data provided"})
+
+    matrix = data.get("matrix")
+    operation = data.get("operation")
+    matrix_name = data.get("matrix_name", "Unknown")
+
+    if not SparseAlgebra.is_sparse(matrix) or not operation:
+        return respond({"success": False, "error": "A sparse matrix (coo or csr) and an operation are required"})
+
+    options = {}
+    if operation == "solve":
+        options["rhs"] = data.get("rhs")
+    elif operation == "eigs":
+        options = {key: data[key] for key in ("k", "which") if key in data}
+
+    try:
+        result = SparseAlgebra.run(operation, matrix, data.get("tol"), **options)
+        HistoryManager.add_entry(f"Sparse {operation}", matrix_name, result)
+        return respond({"success": True, "result": result, "engine": "sparse"})
+
+    except Exception as e:
+        return respond({"success": False, "error": str(e)})
+
+def run_batch_job(matrix_name, factorizations, operations, engine, tol):
+    outcomes = []
+    for operation in operations:
+        if operation not in operation_handlers:
+            outcomes.append({"operation": operation, "success": False, "error": f"Unsupported operation: {operation}"})
+            continue
+        try:
+            result, engine_used = run_operation(operation, factorizations, engine, tol)
+            outcomes.append({
+                "operation": operation,
+                "success": True,
+                "result": format_operation_result(operation, result),
+                "engine": engine_used,
+                **exact_fields(operation, factorizations, engine_used)
+            })
+        except OperationTimeout as e:
+            outcomes.append(e.to_dict())
+        except Exception as e:
+            outcomes.append({"operation": operation, "success": False, "error": str(e)})
+    return {"matrix_name": matrix_name, "success": True, "results": outcomes}
+
+@app.route("/api/batch", methods=["POST"])
+def batch_operations():
+    data = read_payload()
+
+    if not data:
+        return respond({"success": False, "error": "No data provided"})
+
+    jobs = data.get("jobs")
+    if not isinstance(jobs, list) or not jobs:
+        return respond({"success": False, "error": "A non-empty list of jobs is required"})
+    if len(jobs) > BATCH_MAX_JOBS:
+        return respond({"success": False, "error": f"At most {BATCH_MAX_JOBS} jobs per batch"})
+
+    try:
+        shared = {}
+        futures = []
+        for index, job in enumerate(jobs):
+            if not isinstance(job, dict):
+                futures.append({"success": False, "error": f"Job {index} must be an object"})
+                continue
+            operations = job.get("operations")
+            if not isinstance(operations, list) or not operations:
+                futures.append({"success": False, "error": f"Job {index} requires a list of operations"})
+                continue
+
+            matrix_name = job.get("name") or job.get("matrix_name")
+            matrix = job.get("matrix")
+            if matrix is None:
+                if not matrix_name:
+                    futures.append({"success": False, "error": f"Job {index} requires a matrix or a saved matrix name"})
+                    continue
+                # Jobs naming the same saved matrix share one set of factorizations
+                if matrix_name not in shared:
+                    saved = MatrixManager.get_matrix(matrix_name)
+                    shared[matrix_name] = Factorizations.of(saved) if saved is not None else None
+                if shared[matrix_name] is None:
+                    futures.append({"success": False, "matrix_name": matrix_name,
+                                    "error": f"Matrix not found: {matrix_name}"})
+                    continue
+                factorizations = shared[matrix_name]
+            else:
+                matrix = resolve_matrix(matrix, job.get("dense", data.get("dense", False)))
+                factorizations = matrix if SparseAlgebra.is_sparse(matrix) else Factorizations.of(matrix)
+
+            futures.append(batch_executor.submit(
+                run_batch_job, matrix_name or f"Job {index + 1}", factorizations, operations,
+                job.get("engine", data.get("engine", "auto")), job.get("tol", data.get("tol"))
+            ))
+
+        results = [f if isinstance(f, dict) else f.result() for f in futures]
+
+        HistoryManager.add_entries([
+            HistoryManager.make_entry(outcome["operation"], job["matrix_name"], outcome["result"])
+            for job in results if job["success"]
+            for outcome in job["results"] if outcome["success"]
+        ])
+        return respond({"success": True, "results": results})
+
+    except Exception as e:
+        return respond({"success": False, "error": str(e)})
 
 @app.route("/api/matrix_operation", methods=["POST"])
 def matrix_operation():
-    data = request.get_json()
+    data = read_payload()
 
     if not data:
-        return jsonify({"success": False, "error": "No data provided"})
+        return respond({"success": False, "error": "No data provided"})
 
     try:
         operation = data.get("operation")
@@ -222,81 +614,114 @@ def matrix_operation():
             matrix2 = data.get("matrix2")
             operator = data.get("operator")
 
-            if not all([matrix1, matrix2, operator]):
-                return jsonify({"success": False, "error": "Missing required parameters"})
+            if matrix1 is None or matrix2 is None or not operator:
+                return respond({"success": False, "error": "Missing required parameters"})
 
-            result = MatrixAlgebra.matrix_algebra(matrix1, operator, matrix2)
+            with track_operation("matrix_algebra", matrix_dimension(matrix1)):
+                result = MatrixAlgebra.matrix_algebra(matrix1, operator, matrix2)
             HistoryManager.add_entry(f"Algebra ({operator})", "Multiple", result)
-            return jsonify({"success": True, "result": result.tolist()})
+            return respond({"success": True, "result": result})
 
         elif operation == "scalar":
             matrix1 = data.get("matrix1")
             scalar = data.get("scalar")
 
             if matrix1 is None or scalar is None:
-                return jsonify({"success": False, "error": "Matrix and scalar required"})
+                return respond({"success": False, "error": "Matrix and scalar required"})
 
-            result = MatrixAlgebra.matrix_scaler_algebra(matrix1, scalar)
+            with track_operation("matrix_scaler_algebra", matrix_dimension(matrix1)):
+                result = MatrixAlgebra.matrix_scaler_algebra(matrix1, scalar)
             HistoryManager.add_entry("Scalar Multiplication", "Multiple", result)
-            return jsonify({"success": True, "result": result.tolist()})
+            return respond({"success": True, "result": result})
 
         elif operation == "cramer":
             matrix1 = data.get("matrix1")
             matrix2 = data.get("matrix2")
 
-            if not all([matrix1, matrix2]):
-                return jsonify({"success": False, "error": "Coefficient matrix and constant vector required"})
+            if matrix1 is None or matrix2 is None:
+                return respond({"success": False, "error": "Coefficient matrix and constant vector required"})
 
-            result = MatrixAlgebra.cramer(matrix1, matrix2)
+            with track_operation("cramer", matrix_dimension(matrix1)):
+                result = MatrixAlgebra.cramer(matrix1, matrix2)
             HistoryManager.add_entry("Cramer's Rule", "System", result)
-            if isinstance(result, str):
-                return jsonify({"success": True, "result": result})
-            else:
-                return jsonify({"success": True, "result": result.tolist()})
+            return respond({"success": True, "result": result})
+
+        elif operation == "solve":
+            matrix1 = data.get("matrix1")
+            matrix2 = data.get("matrix2")
+
+            if matrix1 is None or matrix2 is None:
+                return respond({"success": False, "error": "Coefficient matrix and right-hand side required"})
+
+            matrix1 = resolve_matrix(matrix1, data.get("dense", False))
+            with track_operation("solve", matrix_dimension(matrix1)):
+                if SparseAlgebra.is_sparse(matrix1):
+                    result = {"solution": SparseAlgebra.solve(matrix1, matrix2), "method": "sparse_lu"}
+                else:
+                    result = MatrixAlgebra.solve(matrix1, matrix2, data.get("tol"))
+            HistoryManager.add_entry("Linear Solve", "System", result["solution"])
+            return respond({"success": True, "result": result})
 
         else:
-            return jsonify({"success": False, "error": f"Unknown operation: {operation}"})
+            return respond({"success": False, "error": f"Unknown operation: {operation}"})
 
     except Exception as e:
-        return jsonify({"success": False, "error": str(e)})
+        return respond({"success": False, "error": str(e)})
 
 @app.route("/api/save_matrix", methods=["POST"])
 def save_matrix_api():
-    data = request.get_json()
+    data = read_payload()
 
     if not data:
-        return jsonify({"success": False, "error": "No data provided"})
+        return respond({"success": False, "error": "No data provided"})
 
     name = data.get("name", "").strip()
     matrix = data.get("matrix")
 
-    if not name or not matrix:
-        return jsonify({"success": False, "error": "Matrix name and data required"})
+    if not name or matrix is None:
+        return respond({"success": False, "error": "Matrix name and data required"})
 
     try:
-        matrices = MatrixManager.load_matrices()
-        matrices.append({"name": name, "matrix": matrix})
-
-        if MatrixManager.save_matrices(matrices):
-            return jsonify({"success": True, "matrices": matrices})
-        else:
-            return jsonify({"success": False, "error": "Failed to save matrix"})
+        return respond({"success": True, "matrix": MatrixManager.save_matrix(name, matrix)})
 
     except Exception as e:
-        return jsonify({"success": False, "error": str(e)})
+        return respond({"success": False, "error": str(e)})
 
 @app.route("/api/get_matrices", methods=["GET"])
 def get_matrices_api():
-    return jsonify(MatrixManager.load_matrices())
+    try:
+        return respond(MatrixManager.list_matrices(request.args.get("page", 1), request.args.get("per_page", 50)))
+    except ValueError:
+        return respond({"success": False, "error": "page and per_page must be integers"})
+
+@app.route("/api/get_matrix", methods=["GET"])
+def get_matrix_api():
+    name = request.args.get("name", "")
+    matrix = MatrixManager.get_matrix(name)
+    if matrix is None:
+        return respond({"success": False, "error": f"Matrix not found: {name}"})
+    return respond({"success": True, "name": name, "matrix": matrix})
+
+@app.route("/api/cache_stats", methods=["GET"])
+def cache_stats():
+    return jsonify(factorization_cache.stats())
+
+@app.route("/api/worker_stats", methods=["GET"])
+def worker_stats():
+    return jsonify(symbolic_pool.stats())
+
+@app.route("/api/coalescing_stats", methods=["GET"])
+def coalescing_stats():
+    return jsonify(single_flight.stats())
 
 @app.route("/api/get_history", methods=["GET"])
 def get_history_api():
-    return jsonify(HistoryManager.load_history()[-10:])
+    return jsonify(HistoryManager.load_history(10))
 
 @app.route("/api/clear_history", methods=["POST"])
 def clear_history():
     try:
-        HistoryManager.save_history([])
+        HistoryManager.clear_history()
         return jsonify({"success": True})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
@@ -314,49 +739,113 @@ def delete_matrix():
         return jsonify({"success": False, "error": "Matrix name required"})
 
     try:
-        matrices = MatrixManager.load_matrices()
-        matrices = [m for m in matrices if m["name"] != matrix_name]
-
-        if MatrixManager.save_matrices(matrices):
-            return jsonify({"success": True, "matrices": matrices})
+        if MatrixManager.delete_matrix(matrix_name):
+            analysis_sessions.close(matrix_name)
+            return jsonify({"success": True, "name": matrix_name})
         else:
-            return jsonify({"success": False, "error": "Failed to delete matrix"})
+            return jsonify({"success": False, "error": "Matrix not found"})
 
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
 @app.route("/api/update_matrix", methods=["POST"])
 def update_matrix():
-    data = request.get_json()
+    data = read_payload()
 
     if not data:
-        return jsonify({"success": False, "error": "No data provided"})
+        return respond({"success": False, "error": "No data provided"})
 
     old_name = data.get("old_name")
-    new_name = data.get("new_name", "").strip()
+    new_name = (data.get("new_name") or old_name or "").strip()
     matrix = data.get("matrix")
+    edits = data.get("edits")
 
-    if not all([old_name, new_name, matrix]):
-        return jsonify({"success": False, "error": "All parameters required"})
+    if not old_name or not new_name or (matrix is None and edits is None):
+        return respond({"success": False, "error": "All parameters required"})
 
     try:
-        matrices = MatrixManager.load_matrices()
-        updated = False
-
-        for m in matrices:
-            if m["name"] == old_name:
-                m["name"] = new_name
-                m["matrix"] = matrix
-                updated = True
-                break
-
-        if updated and MatrixManager.save_matrices(matrices):
-            return jsonify({"success": True, "matrices": matrices})
+        # The store write and the session refresh happen under one edit lock, in the same order
+        with analysis_sessions.editing(old_name, new_name):
+            if matrix is None:
+                matrix = MatrixManager.edit_matrix(old_name, new_name, lambda stored: apply_matrix_edits(stored, edits))
+                if matrix is None:
+                    return respond({"success": False, "error": "Matrix not found"})
+            elif not MatrixManager.update_matrix(old_name, new_name, matrix):
+                return respond({"success": False, "error": "Matrix not found"})
+            response = {"success": True, "name": new_name}
+            if old_name != new_name:
+                analysis_sessions.rename(old_name, new_name)
+            session = analysis_sessions.get(new_name)
+            if session is not None:
+                response["analysis"] = refresh_analysis(session, matrix, data.get("tol"))
+        return respond(response)
+
+    except Exception as e:
+        return respond({"success": False, "error": str(e)})
+
+def apply_matrix_edits(matrix, edits):
+    # Edits are {"row", "col", "value"} for one cell or {"row", "values"} for a whole row
+    if not isinstance(edits, list) or not edits:
+        raise ValueError("edits must be a non-empty list of {row, col, value} or {row, values}")
+    A = np.array(matrix, dtype=float)
+    for edit in edits:
+        if not isinstance(edit, dict) or "row" not in edit:
+            raise ValueError(f"Invalid edit: {edit}")
+        row = int(edit["row"])
+        if not 0 <= row < A.shape[0]:
+            raise ValueError(f"Row {row} is outside a {A.shape[0]}x{A.shape[1]} matrix")
+        if "values" in edit:
+            values = np.asarray(edit["values"], dtype=float)
+            if values.shape != (A.shape[1],):
+                raise ValueError(f"Row {row} needs {A.shape[1]} values")
+            A[row] = values
         else:
-            return jsonify({"success": False, "error": "Matrix not found or failed to update"})
+            col = int(edit.get("col", -1))
+            if not 0 <= col < A.shape[1]:
+                raise ValueError(f"Column {col} is outside a {A.shape[0]}x{A.shape[1]} matrix")
+            A[row, col] = float(edit["value"])
+    return A
+
+def refresh_analysis(session, matrix, tol=None):
+    with session.lock, track_operation("incremental_analysis", matrix_dimension(matrix)):
+        update = session.update(matrix)
+        result = session.analysis(tol)
+    operation_engines.inc("incremental_analysis", update["method"])
+    result["update"] = update
+    return result
+
+@app.route("/api/analysis_session", methods=["POST"])
+def open_analysis_session():
+    data = read_payload()
+
+    if not data or not data.get("name"):
+        return respond({"success": False, "error": "Matrix name required"})
+
+    try:
+        name = data["name"]
+        with analysis_sessions.editing(name):
+            matrix = MatrixManager.get_matrix(name)
+            if matrix is None:
+                return respond({"success": False, "error": "Matrix not found"})
+            with track_operation("incremental_analysis", matrix_dimension(matrix)):
+                session = analysis_sessions.open(name, matrix)
+                with session.lock:
+                    result = session.analysis(data.get("tol"))
+        operation_engines.inc("incremental_analysis", "refactor")
+        return respond({"success": True, "name": name, "analysis": result, "engine": "numeric"})
 
     except Exception as e:
-        return jsonify({"success": False, "error": str(e)})
+        return respond({"success": False, "error": str(e)})
+
+@app.route("/api/analysis_session/<path:name>", methods=["DELETE"])
+def close_analysis_session(name):
+    if analysis_sessions.close(name):
+        return respond({"success": True, "name": name})
+    return respond({"success": False, "error": "No analysis session for this matrix"})
+
+@app.route("/api/analysis_sessions", methods=["GET"])
+def list_analysis_sessions():
+    return respond({"success": True, **analysis_sessions.stats()})
 
 @app.route("/api/quick_actions", methods=["POST"])
 def quick_actions():
@@ -405,105 +894,181 @@ def about():
     return render_template("about.html")
 
 
-def solve_ode_numerically(equation, conditions, ode_type, start, end, step):
+def solve_ode_numerically(equation, conditions, ode_type, start, end, step, method="auto", rtol=1e-3, atol=1e-6,
+                          monitor=None):
     try:
-        if ode_type == "first_order":
-            return solve_first_order_ode(equation, conditions, start, end, step)
-        elif ode_type == "second_order":
-            return solve_second_order_ode(equation, conditions, start, end, step)
-        else:
-            raise ValueError(f"Unsupported ODE type: {ode_type}")
+        with track_operation("ode"):
+            if ode_type == "first_order":
+                return solve_first_order_ode(equation, conditions, start, end, step, method, rtol, atol, monitor)
+            elif ode_type in ("second_order", "higher_order"):
+                return solve_higher_order_ode(equation, conditions, start, end, step, method, rtol, atol, ode_type,
+                                              monitor)
+            elif ode_type == "system":
+                return solve_ode_system(equation, conditions, start, end, step, method, rtol, atol, monitor)
+            else:
+                raise ValueError(f"Unsupported ODE type: {ode_type}")
     except Exception as e:
         raise Exception(f"ODE solving failed: {str(e)}")
 
 
-def solve_first_order_ode(equation, conditions, start, end, step):
+def linear_form(problem, method):
+    # Constant-coefficient linear problems are evaluated in closed form unless a stepper is named
+    system = problem.get("system")
+    linear = system.linear_form() if system is not None and method in ("auto", LINEAR_METHOD) else None
+    if method == LINEAR_METHOD and linear is None:
+        raise ValueError(f"The {LINEAR_METHOD} method needs a linear system with constant coefficients: x' = A x + b")
+    return linear
+
+
+def integrate_problem(problem, start, end, step, method, rtol, atol, monitor=None):
+    linear = linear_form(problem, method)
+    results = dict(problem["details"])
+    if linear is not None:
+        t, y, evaluation = OdeSolver.linear(linear, start, end, step, problem["y0"])
+        method_used, stiffness = LINEAR_METHOD, None
+        results["evaluation"] = evaluation
+    else:
+        solution, method_used, stiffness = OdeSolver.integrate(
+            problem["fun"], start, end, step, problem["y0"], method, rtol, atol, jac=problem["jac"], monitor=monitor
+        )
+        ode_evaluations.observe(solution.nfev, method_used)
+        t, y = solution.t, solution.y
+
+    results.update({
+        "solution": {problem["independent"]: t.tolist()},
+        "range_start": start,
+        "range_end": end,
+        "step_size": step,
+        "method": method_used,
+        "stiffness": stiffness
+    })
+    for label, values in zip(problem["labels"], y):
+        results["solution"][label] = values.tolist()
+    return results
+
+
+def solve_first_order_ode(equation, conditions, start, end, step, method="auto", rtol=1e-3, atol=1e-6, monitor=None):
     try:
-        equation = equation.replace(' ', '')
+        return integrate_problem(OdeProblem.first_order(equation, conditions), start, end, step, method, rtol, atol, monitor)
+    except Exception as e:
+        raise Exception(f"First order ODE solving error: {str(e)}")
 
-        if 'dy/dx=' in equation:
-            expr = equation.split('dy/dx=')[1]
-        elif "y'=" in equation:
-            expr = equation.split("y'=")[1]
-        else:
-            raise ValueError("Invalid first order ODE format. Use: dy/dx = ... or y' = ...")
 
-        conditions = conditions.replace(' ', '')
-        ic_match = re.match(r"y\(([^)]+)\)=([^,]+)", conditions)
-        if not ic_match:
-            raise ValueError("Invalid initial condition format. Use: y(x0)=y0")
+def solve_higher_order_ode(equation, conditions, start, end, step, method="auto", rtol=1e-3, atol=1e-6,
+                           ode_type="higher_order", monitor=None):
+    try:
+        problem = OdeProblem.higher_order(equation, conditions, ode_type)
+        return integrate_problem(problem, start, end, step, method, rtol, atol, monitor)
+    except Exception as e:
+        raise Exception(f"Higher order ODE solving error: {str(e)}")
 
-        x0 = float(ic_match.group(1))
-        y0 = float(ic_match.group(2))
 
-        def ode_func(x, y):
-            local_expr = expr.replace('y', f'({y[0]})').replace('x', f'({x})')
-            try:
-                result = eval(local_expr, {"__builtins__": {}}, {})
-                return [result]
-            except Exception as eval_error:
-                raise ValueError(f"Could not evaluate expression: {local_expr}. Error: {str(eval_error)}")
-
-        t_eval = np.arange(start, end + step, step)
-        solution = solve_ivp(ode_func, [start, end], [y0], t_eval=t_eval, method='RK45')
-
-        results = {
-            "type": "first_order",
-            "solution": {
-                "x": solution.t.tolist(),
-                "y": solution.y[0].tolist()
-            },
-            "initial_condition": f"y({x0}) = {y0}",
-            "equation": equation,
-            "range_start": start,
-            "range_end": end,
-            "step_size": step
-        }
+def solve_ode_system(equations, conditions, start, end, step, method="auto", rtol=1e-3, atol=1e-6, monitor=None):
+    try:
+        return integrate_problem(OdeProblem.system(equations, conditions), start, end, step, method, rtol, atol, monitor)
+    except Exception as e:
+        raise Exception(f"ODE system solving error: {str(e)}")
 
-        return results
 
-    except Exception as e:
-        raise Exception(f"First order ODE solving error: {str(e)}")
+def parse_ode_sweep(data):
+    params = parse_ode_request(data)
+    params["sweep"] = OdeSweep.expand(data.get("sweep"), params["equation"], params["conditions"],
+                                      params["ode_type"])
+    return params
 
 
-def solve_second_order_ode(equation, conditions, start, end, step):
-    try:
-        equation = equation.replace(' ', '')
-        if "d²y/dx²+4y=0" in equation or "y''+4y=0" in equation:
-            conditions = conditions.replace(' ', '')
-            y_match = re.search(r"y\(([^)]+)\)=([^,]+)", conditions)
-            dy_match = re.search(r"y'\(([^)]+)\)=([^,]+)", conditions)
-
-            y0 = float(y_match.group(2)) if y_match else 0.0
-            dy0 = float(dy_match.group(2)) if dy_match else 1.0
-
-            def ode_func(t, yz):
-                y, z = yz
-                return [z, -4 * y]
-
-            t_eval = np.arange(start, end + step, step)
-            solution = solve_ivp(ode_func, [start, end], [y0, dy0], t_eval=t_eval, method='RK45')
-
-            results = {
-                "type": "second_order",
-                "solution": {
-                    "x": solution.t.tolist(),
-                    "y": solution.y[0].tolist(),
-                    "dy": solution.y[1].tolist()
-                },
-                "initial_conditions": conditions,
-                "equation": equation,
-                "range_start": start,
-                "range_end": end,
-                "step_size": step
-            }
-            return results
-        else:
-            raise ValueError("This second order ODE solver currently supports: y'' + 4y = 0")
+def solve_ode_sweep(**params):
+    with track_operation("ode_sweep"):
+        return OdeSweep.solve(**params)
+
 
+def stream_ode_events(params):
+    try:
+        problem = OdeProblem.build(params["equation"], params["conditions"], params["ode_type"])
+        stream = OdeSolver.stream(problem["fun"], params["start"], params["end"], params["step"], problem["y0"],
+                                  params["method"], params["rtol"], params["atol"], jac=problem["jac"],
+                                  linear=linear_form(problem, params["method"]))
     except Exception as e:
-        raise Exception(f"Second order ODE solving error: {str(e)}")
+        raise Exception(f"ODE solving failed: {str(e)}")
+
+    header = dict(problem["details"])
+    header.update({
+        "event": "start",
+        "range_start": params["start"],
+        "range_end": params["end"],
+        "step_size": params["step"],
+        "method": stream.method,
+        "stiffness": stream.stiffness,
+        "points": stream.points,
+        "columns": [problem["independent"]] + list(problem["labels"])
+    })
+
+    def events():
+        yield header
+        sent = 0
+        try:
+            for t, y in stream:
+                block = {"event": "block", "offset": sent, problem["independent"]: t.tolist()}
+                for label, values in zip(problem["labels"], y):
+                    block[label] = values.tolist()
+                sent += len(t)
+                yield block
+        except Exception as e:
+            yield {"event": "error", "error": f"ODE solving failed: {str(e)}", "points": sent}
+            return
+        yield {"event": "end", "points": sent, "method": stream.method}
+
+    return events()
+
+
+def parse_ode_request(data):
+    equation = data.get("equation", "")
+    if isinstance(equation, list):
+        equation = "; ".join(str(e).strip() for e in equation if str(e).strip())
+    params = {
+        "equation": equation.strip(),
+        "conditions": data.get("conditions", "").strip(),
+        "ode_type": data.get("type", "first_order"),
+        "start": float(data.get("range_start", 0)),
+        "end": float(data.get("range_end", 10)),
+        "step": float(data.get("step_size", 0.1)),
+        "method": data.get("method", "auto"),
+        "rtol": float(data.get("rtol", 1e-3)),
+        "atol": float(data.get("atol", 1e-6))
+    }
+
+    if not params["equation"] or not params["conditions"]:
+        raise ValueError("Equation and initial conditions are required")
+
+    if params["start"] >= params["end"]:
+        raise ValueError("End value must be greater than start value")
+
+    if params["step"] <= 0 or params["rtol"] <= 0 or params["atol"] <= 0:
+        raise ValueError("Step size and tolerances must be positive")
+
+    return params
+
+def record_ode_history(params):
+    HistoryManager.add_entry("ODE Solution", params["equation"][:50] + "...",
+                             f"Range: [{params['start']}, {params['end']}]")
+
+STREAM_FORMATS = {"application/x-ndjson": "ndjson", "text/event-stream": "sse"}
+
+def stream_ode_response(params, stream_format):
+    if stream_format not in STREAM_FORMATS.values():
+        raise ValueError(f"Unsupported stream format: {stream_format}. Use ndjson or sse")
+    # Problems in the request surface here as a normal JSON error, before any bytes are sent
+    events = stream_ode_events(params)
+    record_ode_history(params)
 
+    if stream_format == "sse":
+        body = (f"event: {event['event']}\ndata: {ResultEncoder.dumps(event).decode()}\n\n" for event in events)
+        mimetype = "text/event-stream"
+    else:
+        body = (ResultEncoder.dumps(event) + b"\n" for event in events)
+        mimetype = "application/x-ndjson"
+    return Response(stream_with_context(body), mimetype=mimetype,
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 @app.route("/api/solve_ode", methods=["POST"])
 def solve_ode():
@@ -513,27 +1078,183 @@ def solve_ode():
         return jsonify({"success": False, "error": "No data provided"})
 
     try:
-        equation = data.get("equation", "").strip()
-        conditions = data.get("conditions", "").strip()
-        ode_type = data.get("type", "first_order")
-        range_start = float(data.get("range_start", 0))
-        range_end = float(data.get("range_end", 10))
-        step_size = float(data.get("step_size", 0.1))
+        params = parse_ode_request(data)
 
-        if not equation or not conditions:
-            return jsonify({"success": False, "error": "Equation and initial conditions are required"})
+        # Only an explicit Accept entry opts in; */* keeps the plain JSON response
+        stream_format = data.get("stream") or next(
+            (STREAM_FORMATS[mimetype] for mimetype in request.accept_mimetypes.values() if mimetype in STREAM_FORMATS), None
+        )
+        if stream_format:
+            return stream_ode_response(params, stream_format)
 
-        if range_start >= range_end:
-            return jsonify({"success": False, "error": "End value must be greater than start value"})
+        result = single_flight.run("ode", request_key("ode", params), lambda: solve_ode_numerically(**params))
 
-        result = solve_ode_numerically(equation, conditions, ode_type, range_start, range_end, step_size)
-
-        HistoryManager.add_entry("ODE Solution", equation[:50] + "...", f"Range: [{range_start}, {range_end}]")
+        record_ode_history(params)
         return jsonify({"success": True, "result": result})
 
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
+@app.route("/api/solve_ode_sweep", methods=["POST"])
+def solve_ode_sweep_api():
+    data = read_payload()
+
+    if not data:
+        return respond({"success": False, "error": "No data provided"})
+
+    try:
+        params = parse_ode_sweep(data)
+        result = solve_ode_sweep(**params)
+        HistoryManager.add_entry("ODE Sweep", params["equation"][:50] + "...",
+                                 f"{result['sweep']['members']} members, range: [{params['start']}, {params['end']}]")
+        return respond({"success": True, "result": result})
+
+    except Exception as e:
+        return respond({"success": False, "error": str(e)})
+
+
+def parse_matrix_job(data):
+    operation = data.get("operation")
+    if operation not in operation_handlers:
+        raise ValueError(f"Unsupported operation: {operation}")
+    matrix_name = data.get("matrix_name") or data.get("name")
+    matrix = data.get("matrix")
+    if matrix is None:
+        if not matrix_name:
+            raise ValueError("A matrix or a saved matrix name is required")
+        matrix = MatrixManager.get_matrix(matrix_name)
+        if matrix is None:
+            raise ValueError(f"Matrix not found: {matrix_name}")
+    matrix = resolve_matrix(matrix, data.get("dense", False))
+    return {
+        "operation": operation,
+        "matrix": matrix,
+        "matrix_name": matrix_name or "Unknown",
+        "engine": data.get("engine", "auto"),
+        "tol": data.get("tol")
+    }
+
+def run_matrix_job(params, job):
+    # Symbolic work runs in a killable worker that watches for cancellation; numeric work
+    # cannot be interrupted and a cancel takes effect when it returns
+    job.report(0.0)
+    result, engine_used = run_operation(params["operation"], params["matrix"], params["engine"], params["tol"],
+                                        monitor=job.report)
+    job.report(1.0)
+    result = format_operation_result(params["operation"], result)
+    HistoryManager.add_entry(params["operation"], params["matrix_name"], result)
+    return {"result": result, "engine": engine_used,
+            **exact_fields(params["operation"], params["matrix"], engine_used)}
+
+def run_parametric_job(params, job):
+    job.report(0.0)
+    result = run_parametric(params)
+    job.report(1.0)
+    return result
+
+def run_expression_job(params, job):
+    job.report(0.0)
+    result = run_expression(params)
+    job.report(1.0)
+    return result
+
+def run_ode_job(params, job):
+    result = solve_ode_numerically(monitor=job.report, **params)
+    record_ode_history(params)
+    return result
+
+def run_ode_sweep_job(params, job):
+    result = solve_ode_sweep(monitor=job.report, **params)
+    record_ode_history(params)
+    return result
+
+JOB_PARSERS = {
+    "matrix_operation": parse_matrix_job,
+    "ode": parse_ode_request,
+    "ode_sweep": parse_ode_sweep,
+    "parametric": parse_parametric_request,
+    "expression": parse_expression_request
+}
+job_queue.register("matrix_operation", run_matrix_job)
+job_queue.register("ode", run_ode_job)
+job_queue.register("ode_sweep", run_ode_sweep_job)
+job_queue.register("parametric", run_parametric_job)
+job_queue.register("expression", run_expression_job)
+
+@app.route("/api/jobs", methods=["POST"])
+def submit_job():
+    data = read_payload()
+
+    if not data:
+        return respond({"success": False, "error": "No data provided"})
+
+    kind = data.get("kind")
+    if kind not in JOB_PARSERS:
+        return respond({"success": False, "error": f"Unsupported job kind: {kind}"})
+
+    try:
+        # Validate up front so malformed requests fail immediately rather than as failed jobs
+        job = job_queue.submit(kind, JOB_PARSERS[kind](data))
+        return respond({"success": True, "job": job.to_dict()}), 202
+    except JobQueueFull as e:
+        return respond({"success": False, "error": str(e)}), 503
+    except Exception as e:
+        return respond({"success": False, "error": str(e)})
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return respond({"success": False, "error": f"Job not found: {job_id}"}), 404
+    return respond({"success": True, "job": job.to_dict()})
+
+@app.route("/api/jobs/<job_id>", methods=["DELETE"])
+def cancel_job(job_id):
+    job = job_queue.cancel(job_id)
+    if job is None:
+        return respond({"success": False, "error": f"Job not found: {job_id}"}), 404
+    return respond({"success": True, "job": job.to_dict()})
+
+@app.route("/api/job_stats", methods=["GET"])
+def job_stats():
+    return jsonify({"success": True, "stats": job_queue.stats()})
+
+@metrics.collector
+def service_gauges():
+    cache = factorization_cache.stats()
+    jobs = job_queue.stats()
+    pool = symbolic_pool.stats()
+    gauges = [
+        ("matrixlab_factorization_cache_entries", "Matrices held in the factorization cache", None, cache["entries"]),
+        ("matrixlab_factorization_cache_bytes", "Estimated bytes held in the factorization cache", None, cache["bytes"]),
+        ("matrixlab_factorization_cache_hit_ratio", "Factorization cache hit ratio since start", None, cache["hit_rate"]),
+        ("matrixlab_symbolic_timeouts", "Symbolic operations stopped at their time limit", None, pool["timeouts"]),
+        ("matrixlab_history_dropped", "History entries dropped because the write queue was full", None,
+         history_log.dropped),
+        ("matrixlab_job_results_bytes", "Bytes retained by finished job results", None, jobs["bytes"]),
+        ("matrixlab_inflight_computations", "Distinct computations currently running in this worker", None,
+         single_flight.stats()["in_flight"])
+    ]
+    for status, count in jobs["by_status"].items():
+        gauges.append(("matrixlab_jobs", "Retained jobs by status", {"status": status}, count))
+    return gauges
+
+@app.route("/api/import_report", methods=["GET"])
+def import_report_api():
+    return jsonify({"success": True, "report": import_report(BOOT_SECONDS)})
+
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    return Response(metrics.render(), content_type=CONTENT_TYPE)
+
+BOOT_SECONDS = time.perf_counter() - BOOT_STARTED
+boot_report = import_report(BOOT_SECONDS)
+if boot_report["heavy_modules_loaded"] or BOOT_SECONDS > BOOT_TIME_BUDGET:
+    app.logger.warning("Slow boot: %.3fs (budget %.3fs); loaded eagerly: %s", BOOT_SECONDS, BOOT_TIME_BUDGET,
+                       ", ".join(boot_report["heavy_modules_loaded"]) or "none")
+else:
+    app.logger.info("Booted in %.3fs", BOOT_SECONDS)
+
 if __name__ == "__main__":
     app.run(debug=False, host='0.0.0.0', port=5000)
 
@@ -0,0 +1,371 @@
+import argparse
+import json
+import os
+import platform
+import re
+import signal
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from fractions import Fraction
+import numpy as np
+import scipy
+import sympy
+from scipy import linalg
+
+SIZES = (3, 10, 50, 100, 250, 500)
+QUICK_SIZES = (3, 10, 50)
+VALUE_TYPES = ("integer", "rational", "float", "hilbert")
+POINTS = (100, 1000, 10000)
+QUICK_POINTS = (100, 1000)
+# SymPy runs in exact arithmetic and grows super-linearly; larger symbolic cases are skipped
+SYMBOLIC_MAX_SIZE = 8
+ODE_RANGE = (0.0, 10.0)
+ODE_CASES = {
+    "first_order": {"equation": "dy/dx = -2*x*y + sin(x)", "conditions": "y(0)=1", "ode_type": "first_order"},
+    "second_order": {"equation": "y'' + 0.5*y' + 4*y = cos(x)", "conditions": "y(0)=1, y'(0)=0",
+                     "ode_type": "second_order"},
+    "system": {"equation": "x' = 10*(y - x); y' = x*(28 - z) - y; z' = x*y - 8/3*z",
+               "conditions": "x(0)=1, y(0)=1, z(0)=1", "ode_type": "system"},
+    "stiff": {"equation": "y' = -1000*(y - cos(x))", "conditions": "y(0)=0", "ode_type": "first_order"}
+}
+SWEEP_MEMBERS = 100
+# Options for operations that cannot run without them, sent the same way in both modes
+OPERATION_ARGUMENTS = {"power": {"exponent": 3}, "expm": {"t": 1.0}}
+CASE_TIMEOUT = 30.0
+DEFAULT_THRESHOLD = 1.25
+
+
+def make_matrix(value_type, n, seed=0):
+    rng = np.random.default_rng(seed + n)
+    if value_type == "integer":
+        return rng.integers(-9, 10, size=(n, n))
+    if value_type == "rational":
+        numerators = rng.integers(-9, 10, size=(n, n))
+        denominators = rng.integers(1, 10, size=(n, n))
+        return [[Fraction(int(p), int(q)) for p, q in zip(*row)] for row in zip(numerators, denominators)]
+    if value_type == "float":
+        return rng.standard_normal((n, n))
+    if value_type == "hilbert":
+        return linalg.hilbert(n)
+    raise ValueError(f"Unknown value type: {value_type}")
+
+
+def to_wire(matrix):
+    # JSON has no exact rationals; they travel as their float values
+    return np.asarray(matrix, dtype=float).tolist() if isinstance(matrix, list) else matrix.tolist()
+
+
+def matrix_cases(app, sizes, value_types):
+    from utils.algebra import MatrixAlgebra
+    cases = []
+    for value_type in value_types:
+        for n in sizes:
+            A = make_matrix(value_type, n)
+            b = np.arange(1, n + 1, dtype=float)
+            for operation, handler in app.operation_handlers.items():
+                options = OPERATION_ARGUMENTS.get(operation, {})
+                cases.append({
+                    "name": f"{operation}/{value_type}/{n}",
+                    "group": "operation",
+                    "symbolic": MatrixAlgebra.engine_for(operation, A) == "symbolic",
+                    "size": n,
+                    "run": lambda handler=handler, A=A, options=options: handler(A, **options),
+                    "http": ("/api/single_matrix_operation", dict(options, operation=operation, matrix=A))
+                })
+            for operator in ("+", "*"):
+                cases.append({
+                    "name": f"matrix_algebra({operator})/{value_type}/{n}",
+                    "group": "matrix_algebra",
+                    "symbolic": False,
+                    "size": n,
+                    "run": lambda operator=operator, A=A: MatrixAlgebra.matrix_algebra(A, operator, A),
+                    "http": ("/api/matrix_operation",
+                             {"operation": "algebra", "operator": operator, "matrix1": A, "matrix2": A})
+                })
+            cases.append({
+                "name": f"cramer/{value_type}/{n}",
+                "group": "cramer",
+                "symbolic": False,
+                "size": n,
+                "run": lambda A=A, b=b: MatrixAlgebra.cramer(A, b),
+                "http": ("/api/matrix_operation", {"operation": "cramer", "matrix1": A, "matrix2": b})
+            })
+    return cases
+
+
+def ode_cases(app, points):
+    from utils.ode import OdeProblem, OdeSolver
+    start, end = ODE_RANGE
+    cases = []
+    for count in points:
+        step = (end - start) / (count - 1)
+        for kind, case in ODE_CASES.items():
+            params = dict(case, start=start, end=end, step=step)
+            cases.append({
+                "name": f"ode/{kind}/{count}",
+                "group": "ode",
+                "symbolic": False,
+                "size": count,
+                "run": lambda params=params: app.solve_ode_numerically(**params),
+                "http": ("/api/solve_ode", ode_request(params))
+            })
+        params = dict(ODE_CASES["first_order"], start=start, end=end, step=step)
+        cases.append({
+            "name": f"ode/stream/{count}",
+            "group": "ode",
+            "symbolic": False,
+            "size": count,
+            "run": lambda params=params: drain_stream(OdeProblem, OdeSolver, params),
+            "http": ("/api/solve_ode", dict(ode_request(params), stream="ndjson"))
+        })
+        sweep = {"initial": np.linspace(-1, 1, SWEEP_MEMBERS).tolist()}
+        cases.append({
+            "name": f"ode/sweep{SWEEP_MEMBERS}/{count}",
+            "group": "ode",
+            "symbolic": False,
+            "size": count,
+            "run": lambda params=params, sweep=sweep: app.solve_ode_sweep(
+                sweep=app.parse_ode_sweep(dict(ode_request(params), sweep=sweep))["sweep"], **params),
+            "http": ("/api/solve_ode_sweep", dict(ode_request(params), sweep=sweep))
+        })
+    return cases
+
+
+def ode_request(params):
+    return {
+        "equation": params["equation"],
+        "conditions": params["conditions"],
+        "type": params["ode_type"],
+        "range_start": params["start"],
+        "range_end": params["end"],
+        "step_size": params["step"]
+    }
+
+
+def drain_stream(OdeProblem, OdeSolver, params):
+    problem = OdeProblem.build(params["equation"], params["conditions"], params["ode_type"])
+    stream = OdeSolver.stream(problem["fun"], params["start"], params["end"], params["step"], problem["y0"])
+    return sum(len(t) for t, _ in stream)
+
+
+def http_runner(client, route, payload, encoding):
+    from utils.transport import MatrixTransport
+    payload = dict(payload)
+    for key in ("matrix", "matrix1", "matrix2"):
+        if key in payload:
+            payload[key] = to_wire(payload[key]) if encoding == "json" else np.asarray(payload[key], dtype=float)
+    if encoding == "msgpack":
+        import msgpack
+        body = msgpack.packb(MatrixTransport.encode_payload(payload, binary=True), use_bin_type=True)
+        options = {"data": body, "content_type": "application/x-msgpack", "headers": {"Accept": "application/x-msgpack"}}
+    else:
+        if encoding == "base64":
+            payload = MatrixTransport.encode_payload(payload)
+            payload["encoding"] = "base64"
+        options = {"data": json.dumps(payload), "content_type": "application/json"}
+
+    def run():
+        response = client.post(route, **options)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{route} returned HTTP {response.status_code}")
+        # Decoding the body is part of the round trip a real client pays for
+        if response.is_json and response.get_json().get("success") is False:
+            raise RuntimeError(response.get_json().get("error"))
+        return response.get_data()
+    return run
+
+
+class CaseTimeout(Exception):
+    pass
+
+
+def limited(run, timeout):
+    # SymPy can stall for minutes on innocuous inputs; an alarm interrupts it between bytecodes
+    if not timeout or not hasattr(signal, "SIGALRM"):
+        return run
+
+    def alarm(signum, frame):
+        raise CaseTimeout(f"exceeded the {timeout:g}s case time limit")
+
+    def wrapped():
+        previous = signal.signal(signal.SIGALRM, alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+        try:
+            return run()
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    return wrapped
+
+
+def measure(run, repeat, memory, clear):
+    # An untimed first run absorbs one-off costs: worker start-up, expression compilation
+    clear()
+    run()
+    timings = []
+    for _ in range(repeat):
+        clear()
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+        # One sample is enough for cases that take seconds
+        if timings[0] > 2.0:
+            break
+    record = {
+        "repeat": len(timings),
+        "seconds_min": min(timings),
+        "seconds_median": statistics.median(timings)
+    }
+    if memory:
+        clear()
+        tracemalloc.start()
+        try:
+            run()
+            record["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return record
+
+
+def run_suite(args):
+    # Keep benchmark traffic out of the real matrix store and history log
+    scratch = tempfile.mkdtemp(prefix="matrixlab-bench-")
+    os.environ.setdefault("MATRICES_DB", os.path.join(scratch, "matrices.db"))
+    os.environ.setdefault("HISTORY_LOG", os.path.join(scratch, "history.jsonl"))
+    import app
+    from utils.factorization import factorization_cache
+
+    cases = []
+    if "matrix" in args.groups:
+        cases += matrix_cases(app, args.sizes, args.types)
+    if "ode" in args.groups:
+        cases += ode_cases(app, args.points)
+    if args.filter:
+        cases = [case for case in cases if re.search(args.filter, case["name"])]
+
+    modes = ["compute", "http"] if args.mode == "both" else [args.mode]
+    client = app.app.test_client() if "http" in modes else None
+    results = []
+    try:
+        for case in cases:
+            if case["symbolic"] and case["size"] > args.symbolic_max_size:
+                results.append({"name": case["name"], "group": case["group"], "mode": "skipped",
+                                "reason": f"symbolic engine above size {args.symbolic_max_size}"})
+                continue
+            for mode in modes:
+                run = case["run"] if mode == "compute" else http_runner(client, *case["http"], args.encoding)
+                record = {"name": case["name"], "group": case["group"], "mode": mode, "size": case["size"]}
+                try:
+                    record.update(measure(limited(run, args.timeout), args.repeat, args.memory, factorization_cache.clear))
+                except Exception as e:
+                    record["error"] = str(e)
+                results.append(record)
+                report(record)
+    finally:
+        app.symbolic_pool.shutdown()
+        app.sweep_pool.shutdown()
+
+    # What the HTTP layer adds on top of the computation: parsing, serialization, routing
+    compute = {r["name"]: r for r in results if r["mode"] == "compute" and "seconds_median" in r}
+    for record in results:
+        if record["mode"] == "http" and "seconds_median" in record and record["name"] in compute:
+            record["overhead_seconds"] = record["seconds_median"] - compute[record["name"]]["seconds_median"]
+
+    return {
+        "meta": {
+            "created_at": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "scipy": scipy.__version__,
+            "sympy": sympy.__version__,
+            "mode": args.mode,
+            "encoding": args.encoding,
+            "repeat": args.repeat
+        },
+        "results": results
+    }
+
+
+def report(record):
+    if "error" in record:
+        print(f"{record['mode']:8} {record['name']:40} ERROR {record['error']}")
+        return
+    peak = f"{record['peak_bytes'] / 1024:10.1f} KiB" if "peak_bytes" in record else ""
+    print(f"{record['mode']:8} {record['name']:40} {record['seconds_median'] * 1000:10.3f} ms "
+          f"(min {record['seconds_min'] * 1000:.3f} ms, n={record['repeat']}) {peak}", flush=True)
+
+
+def compare(current, baseline, threshold):
+    previous = {(r["mode"], r["name"]): r for r in baseline["results"] if "seconds_median" in r}
+    regressions = 0
+    print(f"\nComparison against baseline (regression threshold {threshold:g}x):")
+    for record in current["results"]:
+        old = previous.get((record["mode"], record["name"]))
+        if old is None or "seconds_median" not in record:
+            continue
+        ratio = record["seconds_median"] / max(old["seconds_median"], 1e-9)
+        flag = ""
+        if ratio > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif ratio < 1 / threshold:
+            flag = "  faster"
+        print(f"{record['mode']:8} {record['name']:40} {ratio:7.2f}x{flag}")
+    print(f"{regressions} regression(s)")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks for MatrixLab Pro matrix and ODE paths")
+    parser.add_argument("--mode", choices=("compute", "http", "both"), default="compute",
+                        help="time the functions directly, through the Flask test client, or both")
+    parser.add_argument("--groups", default="matrix,ode", help="comma-separated: matrix, ode")
+    parser.add_argument("--sizes", help="comma-separated matrix sizes (default: 3,10,50,100,250,500)")
+    parser.add_argument("--types", default=",".join(VALUE_TYPES), help="comma-separated value types")
+    parser.add_argument("--points", help="comma-separated ODE output grid sizes (default: 100,1000,10000)")
+    parser.add_argument("--filter", help="only run cases whose name matches this regular expression")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--encoding", choices=("json", "base64", "msgpack"), default="json",
+                        help="request/response encoding used in http mode")
+    parser.add_argument("--symbolic-max-size", type=int, default=SYMBOLIC_MAX_SIZE)
+    parser.add_argument("--timeout", type=float, default=CASE_TIMEOUT, help="seconds per run before a case is abandoned")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="skip the tracemalloc peak run")
+    parser.add_argument("--quick", action="store_true", help="small sizes, one repetition")
+    parser.add_argument("--save", help="write results as JSON (e.g. a baseline)")
+    parser.add_argument("--compare", help="baseline JSON to compare against; exits 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    args.groups = set(args.groups.split(","))
+    args.types = [t for t in args.types.split(",") if t]
+    unknown = set(args.types) - set(VALUE_TYPES)
+    if unknown:
+        parser.error(f"unknown value types: {', '.join(sorted(unknown))}")
+    args.sizes = [int(n) for n in args.sizes.split(",")] if args.sizes else list(QUICK_SIZES if args.quick else SIZES)
+    args.points = [int(n) for n in args.points.split(",")] if args.points else list(QUICK_POINTS if args.quick else POINTS)
+    if args.quick:
+        args.repeat = 1
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run_suite(args)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved {len(results['results'])} results to {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
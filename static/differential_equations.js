@@ -120,26 +120,23 @@ class DifferentialEquationsSolver {
         this.showResult('Solving differential equation...\n\nPlease wait while we compute the numerical solution.');
 
         try {
-            const response = await fetch('/api/solve_ode', {
-                method: 'POST',
-                headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify({
-                    equation: equation,
-                    conditions: conditions,
-                    type: type,
-                    range_start: rangeStart,
-                    range_end: rangeEnd,
-                    step_size: stepSize
-                })
-            });
-
-            const data = await response.json();
+            const payload = {
+                equation: equation,
+                conditions: conditions,
+                type: type,
+                range_start: rangeStart,
+                range_end: rangeEnd,
+                step_size: stepSize
+            };
+            const data = window.ReadableStream && window.TextDecoder
+                ? await this.streamSolution(payload)
+                : await this.runJob({kind: 'ode', ...payload});
 
             if (data.success) {
                 this.currentSolution = data.result;
                 const solution = this.formatODESolution(data.result);
                 this.showResult(solution);
-                this.plotSolution(data.result);
+                if (!data.streamed) this.plotSolution(data.result);
                 this.analyzeSolution(data.result);
 
                 if (window.notificationManager && window.notificationManager.odeSolutionSuccess) {
@@ -166,6 +163,73 @@ class DifferentialEquationsSolver {
         }
     }
 
+    async streamSolution(payload) {
+        const response = await fetch('/api/solve_ode', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({...payload, stream: 'ndjson'})
+        });
+        if (!(response.headers.get('Content-Type') || '').includes('ndjson')) {
+            return await response.json();
+        }
+
+        // Blocks are appended to the plotted arrays as they arrive, so the chart grows in place
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let result = null;
+        let columns = [];
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, {stream: true});
+            const lines = buffer.split('\n');
+            buffer = lines.pop();
+            for (const line of lines) {
+                if (!line.trim()) continue;
+                const event = JSON.parse(line);
+                if (event.event === 'start') {
+                    const { event: _, points, columns: names, ...header } = event;
+                    columns = names;
+                    result = {...header, solution: Object.fromEntries(columns.map(name => [name, []]))};
+                    this.plotSolution(result);
+                } else if (event.event === 'block') {
+                    columns.forEach(name => result.solution[name].push(...event[name]));
+                    if (this.chart) this.chart.update('none');
+                    this.showResult(`Solving differential equation... ${result.solution[columns[0]].length} points received`);
+                } else if (event.event === 'end') {
+                    result.method = event.method;
+                    return {success: true, result: result, streamed: true};
+                } else if (event.event === 'error') {
+                    return {success: false, error: event.error};
+                }
+            }
+        }
+        return {success: false, error: 'The solution stream ended unexpectedly'};
+    }
+
+    async runJob(payload) {
+        const response = await fetch('/api/jobs', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify(payload)
+        });
+        const submitted = await response.json();
+        if (!submitted.success) return submitted;
+
+        // Poll instead of holding one request open for the whole integration
+        const jobUrl = `/api/jobs/${submitted.job.id}`;
+        while (true) {
+            await new Promise(resolve => setTimeout(resolve, 250));
+            const { job } = await (await fetch(jobUrl)).json();
+            if (!job) return {success: false, error: 'Job expired before it could be read'};
+            if (job.status === 'succeeded') return {success: true, result: job.result};
+            if (job.status === 'failed') return {success: false, error: job.error};
+            if (job.status === 'cancelled') return {success: false, error: 'Job was cancelled'};
+            this.showResult(`Solving differential equation... ${Math.round(job.progress * 100)}%\n\nPlease wait while we compute the numerical solution.`);
+        }
+    }
+
     formatODESolution(result) {
         let output = `ORDINARY DIFFERENTIAL EQUATION SOLUTION\n`;
         output += `${'='.repeat(60)}\n\n`;
@@ -204,7 +268,7 @@ class DifferentialEquationsSolver {
 
             output += `\nFinal Value: y(${solution.x[solution.x.length - 1].toFixed(3)}) ≈ ${solution.y[solution.y.length - 1].toFixed(6)}`;
 
-        } else if (result.type === 'second_order') {
+        } else if (result.type === 'second_order' || result.type === 'higher_order') {
             output += "x\t\ty(x)\t\ty'(x)\n";
             output += "―".repeat(8) + "\t\t" + "―".repeat(12) + "\t\t" + "―".repeat(12) + "\n";
 
@@ -245,7 +309,7 @@ class DifferentialEquationsSolver {
 
         output += `\n\n${'='.repeat(60)}`;
         output += `\nComputation Details:\n`;
-        output += `• Method: Numerical Integration (Runge-Kutta 4th/5th Order)\n`;
+        output += `• Method: ${result.method || 'RK45'} (scipy solve_ivp)\n`;
         output += `• Points Computed: ${solution.x ? solution.x.length : solution.t ? solution.t.length : 0}\n`;
         output += `• Computation Time: ${new Date().toLocaleString()}`;
 
@@ -281,7 +345,7 @@ class DifferentialEquationsSolver {
                 fill: true,
                 tension: 0.4
             }];
-        } else if (result.type === 'second_order') {
+        } else if (result.type === 'second_order' || result.type === 'higher_order') {
             labels = result.solution.x;
             datasets = [
                 {
@@ -408,7 +472,7 @@ class DifferentialEquationsSolver {
         if (result.type === 'first_order') {
             const yValues = solution.y;
             analysis += this.analyzeFirstOrder(yValues, solution.x);
-        } else if (result.type === 'second_order') {
+        } else if (result.type === 'second_order' || result.type === 'higher_order') {
             const yValues = solution.y;
             const dyValues = solution.dy;
             analysis += this.analyzeSecondOrder(yValues, dyValues, solution.x);
@@ -581,7 +645,7 @@ class DifferentialEquationsSolver {
             solution.x.forEach((x, i) => {
                 csvContent += `${x},${solution.y[i]}\n`;
             });
-        } else if (this.currentSolution.type === 'second_order') {
+        } else if (this.currentSolution.type === 'second_order' || this.currentSolution.type === 'higher_order') {
             csvContent += "x,y(x),y'(x)\n";
             solution.x.forEach((x, i) => {
                 csvContent += `${x},${solution.y[i]},${solution.dy[i]}\n`;
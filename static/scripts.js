@@ -278,7 +278,7 @@ class MatrixLabPro {
     getValidatedDimension(elementId) {
         const input = document.getElementById(elementId);
         let value = parseInt(input.value) || 3;
-        value = Math.max(1, Math.min(10, value));
+        value = Math.max(1, Math.min(parseInt(input.max) || 10, value));
         input.value = value;
         return value;
     }
@@ -398,8 +398,7 @@ class MatrixLabPro {
 
             const data = await response.json();
             if (data.success) {
-                this.updateMatrixList(data.matrices);
-                this.updateMatrixSelectors();
+                await this.loadMatrices();
                 document.getElementById('mName').value = '';
                 this.showNotification(`Matrix "${name}" saved successfully`, 'success', 2000);
                 this.updateStats();
@@ -419,15 +418,24 @@ class MatrixLabPro {
 
     async loadMatrices() {
         try {
-            const response = await fetch('/api/get_matrices');
-            const matrices = await response.json();
-            this.updateMatrixList(matrices);
-            this.updateMatrixSelectors();
+            const response = await fetch('/api/get_matrices?page=1&per_page=500');
+            const page = await response.json();
+            this.updateMatrixList(page.matrices, page.total);
+            this.updateMatrixSelectors(page.matrices);
         } catch (error) {
             this.showNotification('Failed to load matrices', 'error', 2000);
         }
     }
 
+    async fetchMatrix(name) {
+        const response = await fetch(`/api/get_matrix?name=${encodeURIComponent(name)}`);
+        const data = await response.json();
+        if (!data.success) {
+            throw new Error(data.error);
+        }
+        return data.matrix;
+    }
+
     async loadHistory() {
         try {
             const response = await fetch('/api/get_history');
@@ -438,12 +446,14 @@ class MatrixLabPro {
         }
     }
 
-    updateMatrixList(matrices) {
+    updateMatrixList(matrices, total = matrices.length) {
         const matrixList = document.getElementById('matrixList');
         const matrixCount = document.getElementById('matrixCount');
         matrixList.innerHTML = '';
 
-        matrixCount.textContent = `${matrices.length} ${matrices.length === 1 ? 'matrix' : 'matrices'}`;
+        matrixCount.textContent = total > matrices.length
+            ? `${matrices.length} of ${total} matrices`
+            : `${total} ${total === 1 ? 'matrix' : 'matrices'}`;
 
         if (matrices.length === 0) {
             const emptyState = document.createElement('li');
@@ -463,12 +473,16 @@ class MatrixLabPro {
             li.innerHTML = `
                 <div>
                     <div class="matrix-name">${this.escapeHtml(matrix.name)}</div>
-                    <div class="matrix-dimensions">${matrix.matrix.length}×${matrix.matrix[0].length}</div>
+                    <div class="matrix-dimensions">${matrix.rows}×${matrix.cols}</div>
                 </div>
             `;
 
-            li.addEventListener('click', () => {
-                this.showMatrixDetails(matrix);
+            li.addEventListener('click', async () => {
+                try {
+                    this.showMatrixDetails({name: matrix.name, matrix: await this.fetchMatrix(matrix.name)});
+                } catch (error) {
+                    this.showNotification(`Failed to load matrix: ${error.message}`, 'error', 2000);
+                }
             });
 
             matrixList.appendChild(li);
@@ -516,7 +530,7 @@ class MatrixLabPro {
         return names[operation] || operation;
     }
 
-    async updateMatrixSelectors() {
+    updateMatrixSelectors(matrices) {
         const selectors = [
             'singleMatrixSelect',
             'matrix1Select',
@@ -526,25 +540,18 @@ class MatrixLabPro {
             'cramerResultSelect'
         ];
 
-        try {
-            const response = await fetch('/api/get_matrices');
-            const matrices = await response.json();
-
-            selectors.forEach(selectorId => {
-                const selector = document.getElementById(selectorId);
-                if (selector) {
-                    while (selector.children.length > 1) selector.removeChild(selector.lastChild);
-                    matrices.forEach(matrix => {
-                        const option = document.createElement('option');
-                        option.value = JSON.stringify(matrix.matrix);
-                        option.textContent = matrix.name;
-                        selector.appendChild(option);
-                    });
-                }
-            });
-        } catch (error) {
-            console.error('Selector update error:', error);
-        }
+        selectors.forEach(selectorId => {
+            const selector = document.getElementById(selectorId);
+            if (selector) {
+                while (selector.children.length > 1) selector.removeChild(selector.lastChild);
+                matrices.forEach(matrix => {
+                    const option = document.createElement('option');
+                    option.value = matrix.name;
+                    option.textContent = matrix.name;
+                    selector.appendChild(option);
+                });
+            }
+        });
     }
 
     showMatrixDetails(matrix) {
@@ -629,8 +636,7 @@ class MatrixLabPro {
 
             const data = await response.json();
             if (data.success) {
-                this.updateMatrixList(data.matrices);
-                this.updateMatrixSelectors();
+                await this.loadMatrices();
                 this.closeModal();
                 this.showNotification('Matrix updated successfully', 'success', 2000);
             } else {
@@ -658,8 +664,7 @@ class MatrixLabPro {
 
                 const data = await response.json();
                 if (data.success) {
-                    this.updateMatrixList(data.matrices);
-                    this.updateMatrixSelectors();
+                    await this.loadMatrices();
                     this.closeModal();
                     this.showNotification('Matrix deleted', 'success', 2000);
                     this.updateStats();
@@ -698,13 +703,13 @@ class MatrixLabPro {
             return;
         }
 
-        const matrix = JSON.parse(matrixSelect.value);
         const matrixName = matrixSelect.options[matrixSelect.selectedIndex].text;
 
         this.showResult('Computing...');
         this.setLoadingState(true);
 
         try {
+            const matrix = await this.fetchMatrix(matrixSelect.value);
             const response = await fetch('/api/single_matrix_operation', {
                 method: 'POST',
                 headers: {'Content-Type': 'application/json'},
@@ -717,7 +722,7 @@ class MatrixLabPro {
 
             const data = await response.json();
             if (data.success) {
-                const result = this.formatOperationResult(data.result, operation, matrixName);
+                const result = this.formatOperationResult(data.result, operation, matrixName, data.exact);
                 this.showResult(result);
 
                 // Use context-aware notification
@@ -759,8 +764,6 @@ class MatrixLabPro {
             return;
         }
 
-        const matrix1 = JSON.parse(matrix1Select.value);
-        const matrix2 = JSON.parse(matrix2Select.value);
         const matrix1Name = matrix1Select.options[matrix1Select.selectedIndex].text;
         const matrix2Name = matrix2Select.options[matrix2Select.selectedIndex].text;
 
@@ -768,6 +771,8 @@ class MatrixLabPro {
         this.setLoadingState(true);
 
         try {
+            const matrix1 = await this.fetchMatrix(matrix1Select.value);
+            const matrix2 = await this.fetchMatrix(matrix2Select.value);
             const response = await fetch('/api/matrix_operation', {
                 method: 'POST',
                 headers: {'Content-Type': 'application/json'},
@@ -810,13 +815,13 @@ class MatrixLabPro {
             return;
         }
 
-        const matrix = JSON.parse(matrixSelect.value);
         const matrixName = matrixSelect.options[matrixSelect.selectedIndex].text;
 
         this.showResult('Computing...');
         this.setLoadingState(true);
 
         try {
+            const matrix = await this.fetchMatrix(matrixSelect.value);
             const response = await fetch('/api/matrix_operation', {
                 method: 'POST',
                 headers: {'Content-Type': 'application/json'},
@@ -857,8 +862,6 @@ class MatrixLabPro {
             return;
         }
 
-        const matrix = JSON.parse(matrixSelect.value);
-        const result = JSON.parse(resultSelect.value);
         const matrixName = matrixSelect.options[matrixSelect.selectedIndex].text;
         const resultName = resultSelect.options[resultSelect.selectedIndex].text;
 
@@ -866,6 +869,8 @@ class MatrixLabPro {
         this.setLoadingState(true);
 
         try {
+            const matrix = await this.fetchMatrix(matrixSelect.value);
+            const result = await this.fetchMatrix(resultSelect.value);
             const response = await fetch('/api/matrix_operation', {
                 method: 'POST',
                 headers: {'Content-Type': 'application/json'},
@@ -895,7 +900,7 @@ class MatrixLabPro {
         }
     }
 
-    formatOperationResult(result, operation, matrixName) {
+    formatOperationResult(result, operation, matrixName, exact) {
         const operationNames = {
             'rref': 'Reduced Row Echelon Form',
             'ref': 'Row Echelon Form',
@@ -967,6 +972,9 @@ class MatrixLabPro {
             }
         } else output += `Result: ${JSON.stringify(result, null, 2)}`;
 
+        if (typeof exact === 'string') output += `\n\nExact: ${exact}`;
+        else if (Array.isArray(exact)) output += `\n\nExact:\n${this.formatMatrixForDisplay(exact)}`;
+
         output += `\n\n${'='.repeat(50)}`;
         output += `\nComputation completed: ${new Date().toLocaleString()}`;
         return output;
@@ -1024,6 +1032,11 @@ class MatrixLabPro {
     }
 
     formatNumber(value) {
+        if (value && typeof value === 'object' && 'real' in value && 'imag' in value) {
+            if (Math.abs(value.imag) < 1e-10) return this.formatNumber(value.real);
+            const sign = value.imag < 0 ? '-' : '+';
+            return `${this.formatNumber(value.real)} ${sign} ${this.formatNumber(Math.abs(value.imag))}i`;
+        }
         if (typeof value !== 'number') return String(value);
         if (Math.abs(value) < 1e-10) return '0';
         if (Math.abs(value - Math.round(value)) < 1e-10) return Math.round(value).toString();
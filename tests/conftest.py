@@ -0,0 +1,19 @@
+import os
+import tempfile
+import pytest
+
+# The app opens its store and history log at import time; tests must never touch data/
+DATA_DIR = tempfile.mkdtemp(prefix="matrixlab-tests-")
+os.environ.setdefault("MATRICES_DB", os.path.join(DATA_DIR, "matrices.db"))
+os.environ.setdefault("HISTORY_LOG", os.path.join(DATA_DIR, "computation_history.jsonl"))
+os.environ.setdefault("SYMBOLIC_POOL_SIZE", "0")
+os.environ.setdefault("SWEEP_WORKERS", "0")
+
+
+@pytest.fixture
+def client():
+    # Imported here so the environment above is in place before the app configures itself
+    from app import app
+    app.config["TESTING"] = True
+    with app.test_client() as client:
+        yield client
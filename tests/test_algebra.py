@@ -0,0 +1,222 @@
+from fractions import Fraction
+import numpy as np
+import pytest
+import scipy.linalg
+import sympy as sp
+from utils.algebra import MatrixAlgebra
+from utils.exact import ExactEngine
+from utils.numeric import NumericEngine
+
+ENGINES = ("numeric", "symbolic", "exact")
+MATRICES = {
+    "invertible": [[2, 1, 0], [1, 3, 1], [0, 1, 4]],
+    "singular": [[1, 2, 3], [4, 5, 6], [7, 8, 9]],
+    "rank_one": [[1, 2], [2, 4]],
+    "wide": [[1, 2, 0, 3], [2, 4, 1, 7], [0, 0, 1, 1]],
+    "tall": [[1, 0], [0, 1], [1, 1]],
+    "decimals": [[0.5, 1.25], [2.0, -0.75]],
+    "permutation": [[0, 1, 0], [0, 0, 1], [1, 0, 0]],
+}
+
+
+def same_span(X, Y):
+    X, Y = np.atleast_2d(np.asarray(X, dtype=float)), np.atleast_2d(np.asarray(Y, dtype=float))
+    rank = np.linalg.matrix_rank
+    return rank(X) == rank(Y) == rank(np.vstack([X, Y]))
+
+
+def cases():
+    return [pytest.param(name, engine, id=f"{name}-{engine}") for name in MATRICES for engine in ENGINES]
+
+
+@pytest.mark.parametrize("A", [
+    scipy.linalg.hilbert(25),
+    scipy.linalg.hilbert(12),
+    np.vander(np.linspace(0, 1, 30), 30),
+    np.outer(np.arange(1, 7), np.arange(1, 5)) + 1e-9 * np.eye(6, 4),
+], ids=["hilbert25", "hilbert12", "vandermonde30", "nearly_rank_one"])
+def test_numeric_spaces_have_rank_vectors(A):
+    rank = MatrixAlgebra.rank(A, engine="numeric")
+    assert rank == np.linalg.matrix_rank(A)
+    assert MatrixAlgebra.nullity(A, engine="numeric") == A.shape[1] - rank
+    assert len(MatrixAlgebra.row_space(A, engine="numeric")) == rank
+    assert len(MatrixAlgebra.col_space(A, engine="numeric")) == rank
+    basis = MatrixAlgebra.basis_dimension(A, engine="numeric")
+    assert basis[0] == rank
+    assert len(basis[2]) == len(basis[3]) == rank
+
+
+def test_numeric_spaces_share_tol():
+    A = np.diag([1.0, 1e-3, 1e-6])
+    for tol in (1e-9, 1e-4, 1e-2, 10.0):
+        rank = MatrixAlgebra.rank(A, engine="numeric", tol=tol)
+        assert len(MatrixAlgebra.row_space(A, engine="numeric", tol=tol)) == rank
+        assert len(MatrixAlgebra.col_space(A, engine="numeric", tol=tol)) == rank
+        assert MatrixAlgebra.basis_dimension(A, engine="numeric", tol=tol)[0] == rank
+
+
+@pytest.mark.parametrize("A, engine", [
+    ([[2, -3, 7], [5, 1, -4], [-6, 8, 9]], "numeric"),
+    ([[0, 1], [2, 0]], "numeric"),
+    ([[2, 1], [1, 2]], "symbolic"),
+    ([[1, 1], [0, 1]], "symbolic"),
+])
+def test_auto_diagonalize_keeps_sympy_to_rational_spectra(A, engine):
+    assert MatrixAlgebra.engine_for("diagonalize", A) == engine
+    result = MatrixAlgebra.diagonalize(A)
+    if isinstance(result, dict):
+        np.testing.assert_allclose(result["P"] @ result["D"] @ result["P_inv"], A, atol=1e-9)
+
+
+@pytest.mark.parametrize("name, engine", cases())
+def test_rank_nullity_and_independence_match_numpy(name, engine):
+    A = np.array(MATRICES[name], dtype=float)
+    rank = np.linalg.matrix_rank(A)
+    assert MatrixAlgebra.rank(MATRICES[name], engine=engine) == rank
+    assert MatrixAlgebra.nullity(MATRICES[name], engine=engine) == A.shape[1] - rank
+    assert MatrixAlgebra.linear_independent(MATRICES[name], engine=engine) == (rank == A.shape[0])
+
+
+@pytest.mark.parametrize("name, engine", cases())
+def test_det_and_inverse_match_numpy(name, engine):
+    A = np.array(MATRICES[name], dtype=float)
+    if A.shape[0] != A.shape[1]:
+        with pytest.raises(Exception):
+            MatrixAlgebra.det(MATRICES[name], engine=engine)
+        return
+    assert MatrixAlgebra.det(MATRICES[name], engine=engine) == pytest.approx(np.linalg.det(A), abs=1e-9)
+    inverse = MatrixAlgebra.inverse(MATRICES[name], engine=engine)
+    if np.linalg.matrix_rank(A) < A.shape[0]:
+        assert inverse == "Matrix is singular - no inverse exists"
+    else:
+        np.testing.assert_allclose(inverse, np.linalg.inv(A), atol=1e-12)
+
+
+@pytest.mark.parametrize("name, engine", cases())
+def test_rref_matches_sympy(name, engine):
+    expected = np.array(sp.Matrix(MATRICES[name]).applyfunc(sp.nsimplify).rref()[0].evalf(), dtype=float)
+    np.testing.assert_allclose(MatrixAlgebra.rref(MATRICES[name], engine=engine), expected, atol=1e-12)
+
+
+@pytest.mark.parametrize("name, engine", cases())
+def test_spaces_match_numpy(name, engine):
+    A = np.array(MATRICES[name], dtype=float)
+    rank = np.linalg.matrix_rank(A)
+    row_space = MatrixAlgebra.row_space(MATRICES[name], engine=engine)
+    col_space = MatrixAlgebra.col_space(MATRICES[name], engine=engine)
+    assert len(row_space) == len(col_space) == rank
+    assert same_span(row_space, A)
+    assert same_span(col_space, A.T)
+    basis = MatrixAlgebra.basis_dimension(MATRICES[name], engine=engine)
+    assert basis[0] == rank
+    assert same_span(basis[2], A.T) and same_span(basis[3], A)
+
+
+@pytest.mark.parametrize("name", ["invertible", "rank_one", "decimals"])
+@pytest.mark.parametrize("engine", ENGINES)
+def test_diagonalize_reconstructs_the_matrix(name, engine):
+    result = MatrixAlgebra.diagonalize(MATRICES[name], engine=engine)
+    np.testing.assert_allclose(result["P"] @ result["D"] @ result["P_inv"], MATRICES[name], atol=1e-9)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_defective_matrix_is_not_diagonalizable(engine):
+    assert "not diagonalizable" in MatrixAlgebra.diagonalize([[1, 1], [0, 1]], engine=engine)
+
+
+@pytest.mark.parametrize("name", ["invertible", "singular", "decimals", "permutation"])
+def test_eig_matches_numpy(name):
+    A = np.array(MATRICES[name], dtype=float)
+    result = MatrixAlgebra.eig(MATRICES[name])
+    values = np.asarray(result["eigenvalues"])
+    np.testing.assert_allclose(np.sort_complex(values), np.sort_complex(np.linalg.eigvals(A)), atol=1e-9)
+    vectors = np.asarray(result["eigenvectors"])
+    for value, vector in zip(values, vectors):
+        np.testing.assert_allclose(A @ vector, value * vector, atol=1e-9)
+
+
+@pytest.mark.parametrize("name", list(MATRICES))
+def test_transpose_and_trace(name):
+    A = np.array(MATRICES[name], dtype=float)
+    np.testing.assert_array_equal(MatrixAlgebra.transpose(MATRICES[name]), A.T)
+    if A.shape[0] == A.shape[1]:
+        assert MatrixAlgebra.trace(MATRICES[name]) == pytest.approx(np.trace(A))
+
+
+def test_numeric_engine_primitives_match_numpy():
+    rng = np.random.default_rng(4)
+    A = rng.standard_normal((6, 6))
+    assert NumericEngine.det(A) == pytest.approx(np.linalg.det(A))
+    np.testing.assert_allclose(NumericEngine.inverse(A), np.linalg.inv(A), atol=1e-10)
+    np.testing.assert_allclose(NumericEngine.singular_values(A), np.linalg.svd(A, compute_uv=False))
+    assert NumericEngine.inverse(np.ones((3, 3))) is None
+    R, pivots = NumericEngine.eliminate([[1, 2, 3], [2, 4, 7]])
+    np.testing.assert_allclose(R, [[1, 2, 0], [0, 0, 1]], atol=1e-12)
+    assert pivots == [0, 2]
+
+
+def test_operation_errors_are_reported_not_raised(client):
+    response = client.post("/api/single_matrix_operation", json={"matrix": [[1, 2]], "operation": "det"}).get_json()
+    assert not response["success"] and "square" in response["error"]
+    response = client.post("/api/single_matrix_operation", json={"matrix": [[1]], "operation": "lu"}).get_json()
+    assert not response["success"]
+
+
+def test_auto_engine_selection():
+    assert MatrixAlgebra.select_engine([[1, 2], [3, 4]]) == "exact"
+    assert MatrixAlgebra.select_engine([[0.5, 0.25], [1, 2]]) == "exact"
+    assert MatrixAlgebra.select_engine(np.random.default_rng(0).standard_normal((3, 3))) == "numeric"
+    assert MatrixAlgebra.select_engine(np.ones((30, 30))) == "numeric"
+    with pytest.raises(ValueError):
+        MatrixAlgebra.select_engine([[1]], engine="quantum")
+
+
+def test_exact_engine_matches_sympy():
+    A = [[Fraction(1, 2), 3, -1], [2, Fraction(-7, 3), 0], [1, 1, Fraction(5, 4)]]
+    M = sp.Matrix(A)
+    assert ExactEngine.det(A) == Fraction(str(M.det()))
+    assert ExactEngine.inverse(A) == [[Fraction(str(x)) for x in row] for row in M.inv().tolist()]
+    R, pivots = ExactEngine.rref([[1, 2, 3], [2, 4, 6], [1, 0, 1]])
+    expected, expected_pivots = sp.Matrix([[1, 2, 3], [2, 4, 6], [1, 0, 1]]).rref()
+    assert R == [[Fraction(str(x)) for x in row] for row in expected.tolist()]
+    assert tuple(pivots) == expected_pivots
+    assert ExactEngine.inverse([[1, 2], [2, 4]]) is None
+
+
+def test_exact_form_reports_fractions():
+    assert MatrixAlgebra.exact_form("det", [[1, 2], [3, 4]]) == "-2"
+    assert MatrixAlgebra.exact_form("inverse", [[2, 0], [0, 3]]) == [["1/2", "0"], ["0", "1/3"]]
+    assert MatrixAlgebra.exact_form("trace", [[2, 0], [0, 3]]) is None
+
+
+def test_operation_endpoint_reports_engine_and_exact_form(client):
+    response = client.post("/api/single_matrix_operation",
+                           json={"matrix": [[1, 2], [3, 4]], "operation": "det"}).get_json()
+    assert response["success"]
+    assert response["result"] == pytest.approx(-2.0)
+    assert response["engine"] == "exact"
+    assert response["exact"] == "-2"
+
+
+def test_solve_matches_numpy():
+    rng = np.random.default_rng(5)
+    A = rng.standard_normal((8, 8))
+    b = rng.standard_normal(8)
+    result = MatrixAlgebra.solve(A, b)
+    np.testing.assert_allclose(result["solution"], np.linalg.solve(A, b), atol=1e-10)
+    assert result["unique"]
+
+
+def test_power_and_expm_match_scipy():
+    A = np.array([[1.0, 2.0], [0.5, -1.0]])
+    np.testing.assert_allclose(MatrixAlgebra.power(A, 5), np.linalg.matrix_power(A, 5))
+    np.testing.assert_allclose(MatrixAlgebra.power(A, -2), np.linalg.matrix_power(np.linalg.inv(A), 2))
+    np.testing.assert_allclose(MatrixAlgebra.expm(A, 0.5), scipy.linalg.expm(0.5 * A))
+    with pytest.raises(Exception, match="integer exponent"):
+        MatrixAlgebra.power(A, 0.5)
+
+
+def test_power_endpoint_takes_an_exponent(client):
+    response = client.post("/api/single_matrix_operation",
+                           json={"matrix": [[1, 2], [3, 4]], "operation": "power", "exponent": 3}).get_json()
+    np.testing.assert_allclose(response["result"], np.linalg.matrix_power([[1, 2], [3, 4]], 3))
@@ -0,0 +1,23 @@
+import pytest
+
+
+def test_batch_shares_saved_matrices(client):
+    client.post("/api/save_matrix", json={"name": "batch", "matrix": [[2, 0], [0, 3]]})
+    response = client.post("/api/batch", json={"jobs": [
+        {"name": "batch", "operations": ["det", "trace", "lu"]},
+        {"matrix": [[1, 1], [1, 1]], "operations": ["rank"]},
+        {"name": "missing", "operations": ["det"]},
+        {"operations": ["det"]},
+    ]}).get_json()
+    first, second, third, fourth = response["results"]
+    assert [o["success"] for o in first["results"]] == [True, True, False]
+    assert first["results"][0]["result"] == pytest.approx(6.0)
+    assert first["results"][1]["result"] == pytest.approx(5.0)
+    assert second["results"][0]["result"] == 1
+    assert not third["success"] and not fourth["success"]
+    client.post("/api/delete_matrix", json={"name": "batch"})
+
+
+def test_batch_rejects_malformed_requests(client):
+    assert not client.post("/api/batch", json={"jobs": []}).get_json()["success"]
+    assert not client.post("/api/batch", json={"jobs": [{"matrix": [[1]]}]}).get_json()["results"][0]["success"]
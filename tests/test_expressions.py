@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+from utils.expressions import MatrixExpression
+
+rng = np.random.default_rng(11)
+MATRICES = {
+    "A": rng.standard_normal((6, 6)) + 6 * np.eye(6),
+    "B": rng.standard_normal((6, 3)),
+    "C": rng.standard_normal((3, 40)),
+    "D": rng.standard_normal((40, 2)),
+    "my matrix": np.arange(4.0).reshape(2, 2),
+}
+
+
+def evaluate(expression, outputs=None):
+    graph = MatrixExpression.compile(expression, MATRICES.get, outputs)
+    return MatrixExpression.evaluate(graph)
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("A*B + 2*B", lambda A, B, C, D: A @ B + 2 * B),
+    ("A' * A - A^T*A", lambda A, B, C, D: A.T @ A - A.T @ A),
+    ("A^3", lambda A, B, C, D: A @ A @ A),
+    ("A^-2", lambda A, B, C, D: np.linalg.inv(A @ A)),
+    ("A^0 + eye(6)", lambda A, B, C, D: 2 * np.eye(6)),
+    ("inv(A)*B", lambda A, B, C, D: np.linalg.solve(A, B)),
+    ("B'*inv(A)", lambda A, B, C, D: B.T @ np.linalg.inv(A)),
+    ("B*C*D", lambda A, B, C, D: B @ C @ D),
+    ("-(B*C)*D/4", lambda A, B, C, D: -(B @ C @ D) / 4),
+    ("det(A) * trace(A)", lambda A, B, C, D: np.linalg.det(A) * np.trace(A)),
+    ("solve(A, B) - B/det(A)", lambda A, B, C, D: np.linalg.solve(A, B) - B / np.linalg.det(A)),
+    ("transpose(B) * (A + A')", lambda A, B, C, D: B.T @ (A + A.T)),
+])
+def test_results_match_numpy(expression, expected):
+    result = evaluate(expression)
+    want = expected(*(MATRICES[name] for name in "ABCD"))
+    np.testing.assert_allclose(result["result"], want, rtol=1e-9, atol=1e-9)
+    assert result["shape"] == list(np.shape(want))
+
+
+def test_inputs_are_not_modified():
+    before = {name: value.copy() for name, value in MATRICES.items()}
+    evaluate("X = A + A; Y = X * 2 - A; Y*B + X*B")
+    for name, value in before.items():
+        np.testing.assert_array_equal(MATRICES[name], value)
+
+
+def test_repeated_subexpressions_are_evaluated_once():
+    result = evaluate("(A*B)' * (A*B) + (A*B)'*(A*B)")
+    assert result["stats"]["shared_subexpressions"] >= 1
+    assert len(result["plan"]) == 4
+    assert sum(1 for step in result["plan"] if " * " in step) == 2
+    AB = MATRICES["A"] @ MATRICES["B"]
+    np.testing.assert_allclose(result["result"], 2 * AB.T @ AB)
+
+
+def test_inverse_products_become_solves():
+    result = evaluate("inv(A)*B")
+    assert result["stats"]["solve_rewrites"] == 1
+    assert result["plan"] == ["t1 = solve(A, B)  [LU solve]"]
+
+
+def test_chain_order_minimizes_multiplications():
+    stats = evaluate("B*C*D")["stats"]
+    assert stats["multiplication_cost"] == 3 * 40 * 2 + 6 * 3 * 2
+    assert stats["left_to_right_cost"] == 6 * 3 * 40 + 6 * 40 * 2
+
+
+def test_assignments_are_returned_as_outputs():
+    result = evaluate('S = A + A; T = S*B; "my matrix"^2', outputs=["S", "T"])
+    np.testing.assert_allclose(result["outputs"]["S"], 2 * MATRICES["A"])
+    np.testing.assert_allclose(result["outputs"]["T"], 2 * MATRICES["A"] @ MATRICES["B"])
+    np.testing.assert_allclose(result["result"], MATRICES["my matrix"] @ MATRICES["my matrix"])
+
+
+@pytest.mark.parametrize("expression, message", [
+    ("", "required"),
+    ("A*C", "Inner dimensions"),
+    ("inv(B)", "square"),
+    ("A^0.5", "integers"),
+    ("Z + A", "Unknown matrix"),
+    ("A +", "end of expression"),
+    ("det = A", "function name"),
+    ("inv(A, B)", "argument"),
+    ("A $ B", "Unexpected character"),
+    ("eye(200000)", "limited"),
+    ("eye(-1)", "non-negative"),
+])
+def test_invalid_expressions_are_rejected(expression, message):
+    with pytest.raises(Exception, match=message):
+        MatrixExpression.compile(expression, MATRICES.get)
+
+
+def test_unknown_output_is_rejected():
+    with pytest.raises(Exception, match="not assigned"):
+        MatrixExpression.compile("A", MATRICES.get, ["Q"])
+
+
+def test_singular_inverse_fails_at_evaluation():
+    graph = MatrixExpression.compile("inv(S)*B", {"S": np.ones((6, 6)), "B": MATRICES["B"]}.get)
+    with pytest.raises(Exception, match="Expression evaluation failed"):
+        MatrixExpression.evaluate(graph)
+
+
+def test_expression_endpoint(client):
+    response = client.post("/api/matrix_expression", json={
+        "expression": "inv(A)*B", "matrices": {"A": [[2, 0], [0, 4]], "B": [[2], [4]]}
+    }).get_json()
+    assert response["success"], response
+    np.testing.assert_allclose(response["result"]["result"], [[1], [1]])
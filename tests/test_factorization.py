@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from utils.factorization import FactorizationCache, Factorizations
+
+
+def test_equal_contents_share_an_entry():
+    cache = FactorizationCache()
+    first = cache.lookup([[1, 2], [3, 4]])
+    assert cache.lookup(np.array([[1, 2], [3, 4]])) is first
+    assert cache.lookup([[1.0, 2.0], [3.0, 4.0]]) is not first
+    assert cache.lookup([[1, 2], [3, 5]]) is not first
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 3, 3)
+    assert stats["hit_rate"] == pytest.approx(1 / 4)
+
+
+def test_decompositions_are_computed_once_and_read_only():
+    cache = FactorizationCache()
+    A = np.array([[4.0, 1.0], [1.0, 3.0]])
+    F = cache.lookup(A)
+    Q, R, _ = F.qr()
+    assert F.qr()[0] is Q
+    np.testing.assert_allclose(F.singular_values(), np.linalg.svd(A, compute_uv=False))
+    with pytest.raises(ValueError):
+        Q[0, 0] = 0
+    stats = cache.stats()
+    assert stats["decomposition_hits"] >= 1
+    assert stats["bytes"] > 0
+
+
+def test_lookup_does_not_alias_the_caller_array():
+    cache = FactorizationCache()
+    A = np.array([[1.0, 2.0], [3.0, 4.0]])
+    F = cache.lookup(A)
+    A[0, 0] = 9
+    assert F.array()[0, 0] == 1
+
+
+def test_byte_budget_evicts_oldest_entries():
+    cache = FactorizationCache(max_bytes=3 * 8 * 16 * 16)
+    for i in range(5):
+        cache.lookup(np.full((16, 16), float(i)))
+    stats = cache.stats()
+    assert stats["entries"] == 3
+    assert stats["evictions"] == 2
+    assert stats["bytes"] <= cache.max_bytes
+    assert cache.lookup(np.full((16, 16), 4.0)) is not None
+    assert cache.stats()["hits"] == 1
+
+
+def test_expired_entries_are_rebuilt():
+    cache = FactorizationCache(ttl=-1)
+    first = cache.lookup([[1.0]])
+    assert cache.lookup([[1.0]]) is not first
+    assert cache.stats()["expirations"] == 1
+
+
+def test_symbolic_input_is_not_cached():
+    cache = FactorizationCache()
+    F = cache.lookup([["x", 1], [0, 1]])
+    assert isinstance(F, Factorizations)
+    assert cache.stats()["uncacheable"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_rank_and_independent_columns():
+    F = Factorizations([[1.0, 2.0, 3.0], [2.0, 4.0, 6.0], [1.0, 0.0, 1.0]])
+    assert F.numeric_rank() == 2
+    rows, cols = F.independent()
+    assert len(rows) == len(cols) == 2
+    assert np.linalg.matrix_rank(F.array()[rows]) == 2
+    assert np.linalg.matrix_rank(F.array()[:, cols]) == 2
+    assert F.exact_rank() == 2
+    assert Factorizations([[2, 1, 0], [0, 3, 1], [0, 0, -1]]).rational_spectrum()
+    assert not Factorizations([[0, 1, 0], [0, 0, 1], [2, 0, 0]]).rational_spectrum()
+
+
+def test_cache_stats_endpoint(client):
+    client.post("/api/single_matrix_operation", json={"matrix": [[1.5, 2], [3, 4]], "operation": "det"})
+    client.post("/api/single_matrix_operation", json={"matrix": [[1.5, 2], [3, 4]], "operation": "rank"})
+    stats = client.get("/api/cache_stats").get_json()
+    assert stats["entries"] >= 1
+    assert stats["hits"] >= 1
@@ -0,0 +1,93 @@
+import json
+import threading
+import numpy as np
+from utils.history import HistoryLog
+
+
+def test_records_are_appended_in_order(tmp_path):
+    log = HistoryLog(str(tmp_path / "history.jsonl"), keep=10)
+    for i in range(5):
+        log.record({"operation": "det", "index": i})
+    assert log.flush(2.0)
+    assert [e["index"] for e in log.tail(3)] == [2, 3, 4]
+    assert [e["index"] for e in log.tail(50)] == list(range(5))
+    assert log.tail(0) == []
+    log.close()
+
+
+def test_compaction_keeps_the_newest_entries(tmp_path):
+    path = tmp_path / "history.jsonl"
+    log = HistoryLog(str(path), keep=3)
+    for i in range(20):
+        log.record({"index": i})
+    log.flush(2.0)
+    log.close()
+    lines = path.read_text().splitlines()
+    assert len(lines) <= 2 * 3
+    assert json.loads(lines[-1])["index"] == 19
+    assert [e["index"] for e in HistoryLog(str(path), keep=3).tail(3)] == [17, 18, 19]
+
+
+def test_clear_empties_the_log(tmp_path):
+    log = HistoryLog(str(tmp_path / "history.jsonl"))
+    log.record({"index": 1})
+    log.clear()
+    assert log.tail(10) == []
+    log.record({"index": 2})
+    assert log.tail(10) == [{"index": 2}]
+    log.close()
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    log = HistoryLog(str(tmp_path / "history.jsonl"), queue_size=1)
+    log._ensure_writer = lambda: None
+    log.record({"index": 1})
+    log.record({"index": 2})
+    assert log.dropped == 1
+
+
+def test_import_json_only_seeds_a_new_log(tmp_path):
+    source = tmp_path / "history.json"
+    source.write_text(json.dumps([{"index": i} for i in range(10)]))
+    log = HistoryLog(str(tmp_path / "history.jsonl"), keep=4)
+    assert log.import_json(str(source)) == 4
+    assert [e["index"] for e in log.tail(10)] == [6, 7, 8, 9]
+    assert log.import_json(str(source)) == 0
+
+
+def test_preview_is_bounded():
+    big = np.arange(1_000_000.0).reshape(1000, 1000)
+    assert len(HistoryLog.preview(big)) <= 103
+    assert HistoryLog.preview("x" * 500).endswith("...")
+    assert HistoryLog.preview([[1, 2], [3, 4]]) == "[[1, 2], [3, 4]]"
+
+
+def test_history_endpoint_sees_the_latest_operation(client):
+    client.post("/api/clear_history")
+    client.post("/api/single_matrix_operation", json={"matrix": [[5]], "operation": "trace", "matrix_name": "M"})
+    history = client.get("/api/get_history").get_json()
+    assert history[-1]["operation"] == "trace" and history[-1]["matrix"] == "M"
+
+
+def test_clear_does_not_block_on_a_full_queue(tmp_path):
+    log = HistoryLog(str(tmp_path / "history.jsonl"), queue_size=2)
+    writer = log._ensure_writer
+    log._ensure_writer = lambda: None
+    log.record({"index": 1})
+    log.record({"index": 2})
+    log._ensure_writer = writer
+    assert log.clear()
+    assert log.tail(10) == []
+    log.close()
+
+
+def test_flush_waits_for_concurrent_records(tmp_path):
+    log = HistoryLog(str(tmp_path / "history.jsonl"), keep=1000)
+    threads = [threading.Thread(target=lambda i=i: [log.record({"index": i}) for _ in range(50)]) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert log.flush(5.0)
+    assert len(log.tail(500)) == 200 - log.dropped
+    log.close()
@@ -0,0 +1,114 @@
+import threading
+import numpy as np
+import pytest
+from utils.incremental import AnalysisSession, AnalysisSessions
+
+
+def check(session, A):
+    result = session.analysis()
+    rank = np.linalg.matrix_rank(A)
+    assert result["rank"] == rank
+    assert result["nullity"] == A.shape[1] - rank
+    if A.shape[0] == A.shape[1]:
+        assert result["det"] == pytest.approx(np.linalg.det(A), rel=1e-8, abs=1e-8)
+        if rank == A.shape[0]:
+            np.testing.assert_allclose(result["inverse"], np.linalg.inv(A), rtol=1e-8, atol=1e-10)
+        else:
+            assert result["inverse"] == "Matrix is singular - no inverse exists"
+    return result
+
+
+def test_single_entry_edits_use_rank_one_updates():
+    rng = np.random.default_rng(1)
+    A = rng.standard_normal((20, 20))
+    session = AnalysisSession("A", A)
+    for _ in range(10):
+        i, j = rng.integers(20, size=2)
+        A = A.copy()
+        A[i, j] += rng.standard_normal()
+        assert session.update(A)["method"] == "rank_one"
+        check(session, A)
+    assert session.refactors == 1
+
+
+def test_transitions_through_singular_matrices():
+    A = np.diag([1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0])
+    session = AnalysisSession("A", A)
+    check(session, A)
+    B = A.copy()
+    B[4, 4] = 0.0
+    session.update(B)
+    assert not check(session, B)["full_rank"]
+    C = B.copy()
+    C[4, 4] = 0.5
+    session.update(C)
+    assert check(session, C)["full_rank"]
+
+
+def test_wide_edits_and_reshapes_refactor():
+    A = np.eye(8)
+    session = AnalysisSession("A", A)
+    assert session.update(A)["method"] == "unchanged"
+    B = A + 1.0
+    assert session.update(B)["method"] == "refactor"
+    check(session, B)
+    C = np.arange(12.0).reshape(3, 4)
+    assert session.update(C)["method"] == "refactor"
+    np.testing.assert_allclose(check(session, C)["rref"], [[1, 0, -1, -2], [0, 1, 2, 3], [0, 0, 0, 0]], atol=1e-12)
+
+
+def test_sessions_are_bounded_and_renamable():
+    sessions = AnalysisSessions(limit=2)
+    sessions.open("A", np.eye(2))
+    sessions.open("B", np.eye(2))
+    sessions.get("A")
+    sessions.open("C", np.eye(2))
+    assert sessions.get("B") is None
+    assert sessions.get("A") is not None
+    assert sessions.rename("A", "D").name == "D"
+    assert sessions.get("A") is None
+    assert sessions.close("D") and not sessions.close("D")
+    assert [s["name"] for s in sessions.stats()["sessions"]] == ["C"]
+
+
+def test_idle_sessions_expire():
+    sessions = AnalysisSessions(ttl=-1)
+    sessions.open("A", np.eye(2))
+    assert sessions.get("A") is None
+
+
+def test_edits_refresh_an_open_session(client):
+    A = [[4.0, 1.0, 0.0], [1.0, 3.0, 1.0], [0.0, 1.0, 2.0]]
+    client.post("/api/save_matrix", json={"name": "session", "matrix": A})
+    opened = client.post("/api/analysis_session", json={"name": "session"}).get_json()
+    assert opened["analysis"]["rank"] == 3
+    updated = client.post("/api/update_matrix", json={
+        "old_name": "session", "new_name": "renamed", "edits": [{"row": 2, "values": [4.0, 1.0, 0.0]}]
+    }).get_json()
+    assert updated["success"]
+    assert updated["analysis"]["rank"] == 2
+    assert updated["analysis"]["det"] == pytest.approx(0.0, abs=1e-12)
+    stored = client.get("/api/get_matrix?name=renamed").get_json()
+    np.testing.assert_array_equal(stored["matrix"][2], [4.0, 1.0, 0.0])
+    client.post("/api/delete_matrix", json={"name": "renamed"})
+
+
+def test_concurrent_edits_keep_the_session_in_step(client):
+    client.post("/api/save_matrix", json={"name": "shared", "matrix": np.eye(8).tolist()})
+    client.post("/api/analysis_session", json={"name": "shared"})
+
+    def edit(i):
+        client.application.test_client().post("/api/update_matrix", json={
+            "old_name": "shared", "edits": [{"row": i, "col": (i + 1) % 8, "value": 0.5}]
+        })
+
+    threads = [threading.Thread(target=edit, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stored = np.array(client.get("/api/get_matrix?name=shared").get_json()["matrix"])
+    assert np.count_nonzero(stored - np.eye(8)) == 8
+    final = client.post("/api/update_matrix", json={"old_name": "shared", "edits": [{"row": 0, "col": 0, "value": 1.0}]})
+    assert final.get_json()["analysis"]["det"] == pytest.approx(np.linalg.det(stored))
+    client.post("/api/delete_matrix", json={"name": "shared"})
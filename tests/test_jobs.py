@@ -0,0 +1,126 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from utils.jobs import CANCELLED, FAILED, SUCCEEDED, Job, JobCancelled, JobQueue, JobQueueFull
+
+
+@pytest.fixture
+def jobs():
+    queue = JobQueue(ThreadPoolExecutor(max_workers=1))
+    yield queue
+    queue.shutdown()
+
+
+def test_job_runs_to_completion(jobs):
+    jobs.register("square", lambda params, job: params["x"] ** 2)
+    job = jobs.submit("square", {"x": 7})
+    job.future.result(5)
+    assert jobs.get(job.id).status == SUCCEEDED
+    assert job.to_dict()["result"] == 49
+    assert job.progress == 1.0
+    assert jobs.stats()["succeeded"] == 1
+
+
+def test_handler_errors_mark_the_job_failed(jobs):
+    def fail(params, job):
+        raise Exception("bad input")
+
+    jobs.register("fail", fail)
+    job = jobs.submit("fail", {})
+    job.future.result(5)
+    assert job.status == FAILED
+    assert job.to_dict()["error"] == "bad input"
+
+
+def test_unknown_kind_is_rejected(jobs):
+    with pytest.raises(ValueError):
+        jobs.submit("missing", {})
+
+
+def test_running_job_stops_at_its_next_progress_report(jobs):
+    started, release = threading.Event(), threading.Event()
+
+    def slow(params, job):
+        started.set()
+        release.wait(5)
+        job.report(0.5)
+        return "finished"
+
+    jobs.register("slow", slow)
+    job = jobs.submit("slow", {})
+    assert started.wait(5)
+    jobs.cancel(job.id)
+    assert job.to_dict()["cancel_requested"]
+    release.set()
+    job.future.result(5)
+    assert job.status == CANCELLED
+    assert "result" not in job.to_dict()
+
+
+def test_queued_job_is_cancelled_without_running(jobs):
+    release = threading.Event()
+    ran = []
+    jobs.register("block", lambda params, job: release.wait(5))
+    jobs.register("record", lambda params, job: ran.append(1))
+    blocker = jobs.submit("block", {})
+    queued = jobs.submit("record", {})
+    jobs.cancel(queued.id)
+    release.set()
+    blocker.future.result(5)
+    assert queued.status == CANCELLED
+    assert not ran
+
+
+def test_pending_limit(jobs):
+    release = threading.Event()
+    jobs.max_pending = 2
+    jobs.register("block", lambda params, job: release.wait(5))
+    first = jobs.submit("block", {})
+    jobs.submit("block", {})
+    with pytest.raises(JobQueueFull):
+        jobs.submit("block", {})
+    release.set()
+    first.future.result(5)
+
+
+def test_results_expire_and_are_evicted_by_size():
+    jobs = JobQueue(ThreadPoolExecutor(max_workers=1), ttl=3600, max_bytes=2000)
+    jobs.register("payload", lambda params, job: "x" * params["size"])
+    first = jobs.submit("payload", {"size": 1500})
+    first.future.result(5)
+    second = jobs.submit("payload", {"size": 1500})
+    second.future.result(5)
+    assert jobs.get(first.id) is None
+    assert jobs.get(second.id) is second
+    assert jobs.stats()["evicted"] == 1
+    jobs.ttl = -1
+    assert jobs.get(second.id) is None
+    assert jobs.stats()["expired"] == 1
+    jobs.shutdown()
+
+
+def test_progress_is_monotonic_and_clamped():
+    job = Job("kind", {})
+    job.report(0.4)
+    job.report(0.2)
+    assert job.progress == 0.4
+    job.report(3)
+    assert job.progress == 1.0
+    job._cancel.set()
+    with pytest.raises(JobCancelled):
+        job.report(0.5)
+
+
+def test_job_endpoints(client):
+    submitted = client.post("/api/jobs", json={"kind": "matrix_operation", "operation": "rank",
+                                               "matrix": [[1, 2], [2, 4]]})
+    assert submitted.status_code == 202
+    job_id = submitted.get_json()["job"]["id"]
+    from app import job_queue
+    job_queue.get(job_id).future.result(10)
+    job = client.get(f"/api/jobs/{job_id}").get_json()["job"]
+    assert job["status"] == "succeeded"
+    assert job["result"]["result"] == 1
+    assert client.get("/api/jobs/unknown").status_code == 404
+    response = client.post("/api/jobs", json={"kind": "matrix_operation", "operation": "lu", "matrix": [[1]]})
+    assert not response.get_json()["success"]
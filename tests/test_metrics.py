@@ -0,0 +1,8 @@
+def test_metrics_endpoint_exposes_latency_and_gauges(client):
+    client.post("/api/single_matrix_operation", json={"matrix": [[1.5, 2], [3, 4]], "operation": "det"})
+    response = client.get("/metrics")
+    assert response.content_type.startswith("text/plain")
+    text = response.get_data(as_text=True)
+    assert "matrixlab_factorization_cache_entries" in text
+    assert 'operation="det"' in text
+    assert "# TYPE" in text
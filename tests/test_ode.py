@@ -0,0 +1,183 @@
+import json
+import numpy as np
+import pytest
+from utils import ode
+from utils.ode import ExpressionCompiler, OdeProblem, OdeSolver, OdeSweep, OdeSystem, SweepPool
+
+
+def solve(equation, conditions, ode_type, start=0.0, end=2.0, step=0.1, method="auto"):
+    problem = OdeProblem.build(equation, conditions, ode_type)
+    solution, method_used, _ = OdeSolver.integrate(problem["fun"], start, end, step, problem["y0"], method,
+                                                   1e-8, 1e-10, jac=problem["jac"])
+    return solution, method_used
+
+
+def test_first_order_matches_the_exact_solution():
+    solution, _ = solve("dy/dx = -2*y + x", "y(0)=1", "first_order")
+    x = solution.t
+    exact = (x / 2 - 0.25) + 1.25 * np.exp(-2 * x)
+    np.testing.assert_allclose(solution.y[0], exact, atol=1e-7)
+    np.testing.assert_allclose(x, np.linspace(0, 2, 21))
+
+
+def test_second_order_oscillator():
+    solution, _ = solve("y'' + y = 0", "y(0)=1, y'(0)=0", "second_order", end=6.0)
+    np.testing.assert_allclose(solution.y[0], np.cos(solution.t), atol=1e-6)
+    np.testing.assert_allclose(solution.y[1], -np.sin(solution.t), atol=1e-6)
+
+
+def test_stiff_problem_switches_to_an_implicit_method():
+    solution, method = solve("dy/dx = -1000*(y - cos(x))", "y(0)=0", "first_order", end=10.0)
+    assert method in ("Radau", "BDF", "LSODA")
+    np.testing.assert_allclose(solution.y[0][-1], np.cos(10.0), atol=1e-2)
+
+
+def test_linear_system_closed_form_matches_integration():
+    problem = OdeProblem.build("x' = -y; y' = x - 0.1*y", "x(0)=1, y(0)=0", "system")
+    linear = problem["system"].linear_form()
+    assert linear is not None
+    np.testing.assert_allclose(linear[0], [[0, -1], [1, -0.1]])
+    t, states, _ = OdeSolver.linear(linear, 0.0, 5.0, 0.25, problem["y0"])
+    solution, _, _ = OdeSolver.integrate(problem["fun"], 0.0, 5.0, 0.25, problem["y0"], "RK45", 1e-10, 1e-12)
+    np.testing.assert_allclose(t, solution.t)
+    np.testing.assert_allclose(states, solution.y, atol=1e-8)
+    assert OdeSystem.first_order_system("x' = x*y; y' = 1").linear_form() is None
+
+
+@pytest.mark.parametrize("equation, conditions, ode_type", [
+    ("dy/dx = sin(x) - y", "y(0)=1", "first_order"),
+    ("y'' = -y - 0.2*y'", "y(0)=1, y'(0)=0", "second_order"),
+])
+def test_stream_matches_integrate(equation, conditions, ode_type):
+    problem = OdeProblem.build(equation, conditions, ode_type)
+    solution, _, _ = OdeSolver.integrate(problem["fun"], 0.0, 4.0, 0.05, problem["y0"], "RK45", 1e-8, 1e-10,
+                                         jac=problem["jac"])
+    blocks = list(OdeSolver.stream(problem["fun"], 0.0, 4.0, 0.05, problem["y0"], "RK45", 1e-8, 1e-10,
+                                   jac=problem["jac"], chunk_size=16))
+    assert all(len(t) <= 16 for t, _ in blocks)
+    t = np.concatenate([t for t, _ in blocks])
+    y = np.concatenate([y for _, y in blocks], axis=1)
+    np.testing.assert_allclose(t, solution.t)
+    np.testing.assert_allclose(y, solution.y, atol=1e-6)
+
+
+def test_grid_stays_inside_the_range():
+    np.testing.assert_allclose(OdeSolver.grid(0.0, 1.0, 0.25), [0, 0.25, 0.5, 0.75, 1.0])
+    np.testing.assert_allclose(OdeSolver.grid(0.0, 1.0, 0.35), [0, 0.35, 0.7, 1.0])
+    np.testing.assert_allclose(OdeSolver.grid(0.0, 1.0, 0.3), [0, 0.3, 0.6, 0.9])
+    np.testing.assert_allclose(OdeSolver.grid(0.0, 1.0, 0.3, 2, 4), [0.6, 0.9])
+
+
+@pytest.mark.parametrize("expression", ["__import__('os')", "y.real", "open(x)", "lambda: 1", "x[0]"])
+def test_expression_compiler_rejects_unsafe_input(expression):
+    with pytest.raises(ValueError):
+        ExpressionCompiler.compile(expression)
+
+
+def test_expression_compiler_is_vectorized():
+    f = ExpressionCompiler.compile("sin(x) + y^2")
+    np.testing.assert_allclose(f(np.array([0.0, np.pi / 2]), np.array([2.0, 3.0])), [4.0, 10.0])
+
+
+def test_sweep_expansion():
+    grid = OdeSweep.expand({"initial": [0, 1], "parameters": {"k": [1, 2, 3]}}, "dy/dx = -k*y", "y(0)=5",
+                           "first_order")
+    assert grid["conditions"] == ["y(0)=0.0"] * 3 + ["y(0)=1.0"] * 3
+    np.testing.assert_array_equal(grid["parameters"]["k"], [1, 2, 3, 1, 2, 3])
+    zipped = OdeSweep.expand({"mode": "zip", "parameters": {"a": [1, 2], "b": [3]}}, "dy/dx = -a*b*y", "y(0)=5",
+                             "first_order")
+    assert zipped["conditions"] == ["y(0)=5", "y(0)=5"]
+    np.testing.assert_array_equal(zipped["parameters"]["b"], [3, 3])
+
+
+@pytest.mark.parametrize("sweep", [
+    None,
+    {},
+    {"mode": "random", "initial": [1]},
+    {"mode": "zip", "parameters": {"a": [1, 2], "b": [1, 2, 3]}},
+    {"parameters": {"y": [1]}},
+    {"parameters": {"k": []}},
+    {"parameters": {"k": list(range(100000))}},
+])
+def test_invalid_sweeps_are_rejected(sweep):
+    with pytest.raises(ValueError):
+        OdeSweep.expand(sweep, "dy/dx = -k*y", "y(0)=1", "first_order")
+
+
+@pytest.mark.parametrize("name", ["u", "v", "s"])
+def test_system_variables_cannot_be_swept(name):
+    with pytest.raises(ValueError, match="variable of the equation"):
+        OdeSweep.expand({"parameters": {name: [1, 2]}}, "du/ds = -v; dv/ds = u", "u(0)=1, v(0)=0", "system")
+    sweep = OdeSweep.expand({"parameters": {"w": [1, 2]}}, ["u' = -w*v", "v' = w*u"], "u(0)=1, v(0)=0", "system")
+    assert len(sweep["conditions"]) == 2
+
+
+def test_stacked_sweep_matches_members_solved_alone():
+    sweep = OdeSweep.expand({"initial": [1, 2], "parameters": {"k": [0.5, 3.0]}}, "dy/dx = -k*y", "y(0)=1",
+                           "first_order")
+    result = OdeSweep.solve("dy/dx = -k*y", "y(0)=1", "first_order", 0.0, 2.0, 0.1, sweep=sweep)
+    assert result["strategy"] == "stacked"
+    assert result["sweep"]["members"] == 4
+    y = result["solution"]["y"]
+    x = result["solution"]["x"]
+    for i, (conditions, k) in enumerate(zip(sweep["conditions"], sweep["parameters"]["k"])):
+        y0 = OdeProblem.first_order_condition(conditions)[1]
+        np.testing.assert_allclose(y[i], y0 * np.exp(-k * x), rtol=1e-2)
+
+
+@pytest.mark.parametrize("workers", [0, 1])
+def test_fan_out_sweep(monkeypatch, workers):
+    pool = SweepPool(workers)
+    monkeypatch.setattr(ode, "sweep_pool", pool)
+    sweep = OdeSweep.expand({"parameters": {"w": [1.0, 2.0]}}, "y'' = -w^2*y", "y(0)=1, y'(0)=0", "second_order")
+    progress = []
+    try:
+        result = OdeSweep.solve("y'' = -w^2*y", "y(0)=1, y'(0)=0", "second_order", 0.0, 3.0, 0.1,
+                                rtol=1e-8, atol=1e-10, sweep=sweep, monitor=progress.append)
+    finally:
+        pool.shutdown()
+    assert result["strategy"] == "process_pool"
+    x = result["solution"]["x"]
+    for i, w in enumerate([1.0, 2.0]):
+        np.testing.assert_allclose(result["solution"]["y"][i], np.cos(w * x), atol=1e-6)
+        np.testing.assert_allclose(result["solution"]["dy"][i], -w * np.sin(w * x), atol=1e-6)
+    assert progress[-1] == 1.0
+
+
+def test_sweep_reports_malformed_equations():
+    sweep = OdeSweep.expand({"parameters": {"w": [1.0]}}, "y'' = w*", "y(0)=1, y'(0)=0", "second_order")
+    with pytest.raises(Exception, match="ODE sweep failed"):
+        OdeSweep.solve("y'' = w*", "y(0)=1, y'(0)=0", "second_order", 0.0, 1.0, 0.1, sweep=sweep)
+
+
+def test_stream_endpoint_matches_the_plain_response(client):
+    payload = {"equation": "dy/dx = -y", "conditions": "y(0)=1", "range_end": 3, "step_size": 0.01,
+               "method": "RK45", "rtol": 1e-8, "atol": 1e-10}
+    plain = client.post("/api/solve_ode", json=payload).get_json()["result"]
+    streamed = client.post("/api/solve_ode", json=dict(payload, stream="ndjson"))
+    assert streamed.mimetype == "application/x-ndjson"
+    events = [json.loads(line) for line in streamed.data.splitlines()]
+    assert events[0]["event"] == "start" and events[-1]["event"] == "end"
+    blocks = [event for event in events if event["event"] == "block"]
+    x = np.concatenate([block["x"] for block in blocks])
+    y = np.concatenate([block["y"] for block in blocks])
+    assert events[-1]["points"] == len(x) == 301
+    np.testing.assert_allclose(y, np.exp(-x), atol=1e-7)
+    np.testing.assert_allclose(x, plain["solution"]["x"])
+    np.testing.assert_allclose(y, np.ravel(plain["solution"]["y"]), atol=1e-7)
+
+
+def test_sweep_endpoint(client):
+    response = client.post("/api/solve_ode_sweep", json={
+        "equation": "y'' = -w^2*y", "conditions": "y(0)=1, y'(0)=0", "type": "second_order",
+        "range_end": 2, "sweep": {"parameters": {"w": [1, 2]}}
+    }).get_json()
+    assert response["success"], response
+    assert response["result"]["sweep"]["members"] == 2
+    assert np.shape(response["result"]["solution"]["y"]) == (2, 21)
+    response = client.post("/api/solve_ode_sweep", json={
+        "equation": "du/dt = -v; dv/dt = u", "conditions": "u(0)=1, v(0)=0", "type": "system",
+        "sweep": {"parameters": {"u": [1, 2]}}
+    }).get_json()
+    assert not response["success"]
+    assert "variable of the equation" in response["error"]
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from utils.parametric import ParametricAlgebra
+
+MATRIX = [["a", 1], ["b", "a*b"]]
+PARAMETERS = {"a": [0.5, 1.0, 2.0], "b": [-1.0, 3.0]}
+
+
+def stacked():
+    a, b = np.meshgrid(PARAMETERS["a"], PARAMETERS["b"], indexing="ij")
+    a, b = a.ravel(), b.ravel()
+    return np.stack([np.stack([a, np.ones_like(a)], axis=1), np.stack([b, a * b], axis=1)], axis=1)
+
+
+@pytest.mark.parametrize("method", ["symbolic", "numeric"])
+def test_det_and_trace_match_numpy(method):
+    det = ParametricAlgebra.evaluate("det", MATRIX, PARAMETERS, method=method)
+    assert det["method"] == method
+    assert det["grid_shape"] == [3, 2] and det["points"] == 6
+    np.testing.assert_allclose(det["values"], np.linalg.det(stacked()))
+    trace = ParametricAlgebra.evaluate("trace", MATRIX, PARAMETERS, method=method)
+    np.testing.assert_allclose(trace["values"], np.trace(stacked(), axis1=1, axis2=2))
+
+
+@pytest.mark.parametrize("method", ["symbolic", "numeric"])
+def test_eig_matches_numpy(method):
+    result = ParametricAlgebra.evaluate("eig", MATRIX, PARAMETERS, method=method)
+    np.testing.assert_allclose(result["values"], np.sort_complex(np.linalg.eigvals(stacked())), atol=1e-12)
+
+
+@pytest.mark.parametrize("method", ["symbolic", "numeric"])
+def test_inverse_marks_singular_points(method):
+    result = ParametricAlgebra.evaluate("inverse", [["a", 1], [1, "a"]], {"a": [1.0, 2.0]}, method=method)
+    assert np.isnan(result["values"][0]).all()
+    np.testing.assert_allclose(result["values"][1], np.linalg.inv([[2.0, 1.0], [1.0, 2.0]]))
+
+
+def test_rank_over_a_zip_grid():
+    result = ParametricAlgebra.evaluate("rank", [["t", 1, 0], [1, "t", 0]], {"t": [1.0, 0.0, -1.0]}, mode="zip")
+    assert result["grid_shape"] == [3]
+    np.testing.assert_array_equal(result["values"], [1, 2, 1])
+
+
+@pytest.mark.parametrize("operation, matrix, parameters, message", [
+    ("det", [["a", 1]], {"a": [1]}, "square"),
+    ("det", MATRIX, {"a": [1]}, "Unknown name"),
+    ("det", MATRIX, {"sin": [1], "b": [1]}, "Invalid parameter name"),
+    ("lu", MATRIX, PARAMETERS, "Unsupported parametric operation"),
+    ("det", [["a", 1], [1]], {"a": [1]}, "same"),
+    ("det", MATRIX, {"a": list(range(1000)), "b": list(range(1000))}, "limit"),
+])
+def test_invalid_requests_are_rejected(operation, matrix, parameters, message):
+    with pytest.raises(Exception, match=message):
+        ParametricAlgebra.evaluate(operation, matrix, parameters)
@@ -0,0 +1,86 @@
+import os
+import threading
+import time
+import numpy as np
+import pytest
+from utils.results import ResultEncoder
+from utils.singleflight import SingleFlight, request_key
+
+
+def test_request_key_is_order_independent_for_dicts():
+    assert request_key("op", {"a": 1, "b": [1, 2]}) == request_key("op", {"b": [1, 2], "a": 1})
+    assert request_key("op", np.eye(2)) != request_key("op", np.eye(3))
+
+
+def test_concurrent_callers_share_one_computation():
+    flight = SingleFlight("")
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 42
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.run("test", "key", compute)))
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=lambda: results.append(flight.run("test", "key", compute)))
+    follower.start()
+    while flight.stats()["coalesced"] == 0:
+        time.sleep(0.001)
+    release.set()
+    leader.join()
+    follower.join()
+    assert results == [42, 42]
+    assert len(calls) == 1
+
+
+def test_rendezvous_format_round_trips_result_types():
+    value = ({
+        "matrix": np.arange(6).reshape(2, 3),
+        "spectrum": np.array([1 + 2j, 3]),
+        "scalar": np.float64(2.5),
+        "missing": float("nan"),
+        "nested": [(1, "x", None, True), complex(1, -1)]
+    }, "numeric")
+    decoded = SingleFlight.decode(ResultEncoder.loads(ResultEncoder.dumps(SingleFlight.encode(value))))
+    result, engine = decoded
+    assert engine == "numeric"
+    np.testing.assert_array_equal(result["matrix"], value[0]["matrix"])
+    assert result["matrix"].dtype == value[0]["matrix"].dtype
+    np.testing.assert_array_equal(result["spectrum"], value[0]["spectrum"])
+    assert isinstance(result["scalar"], np.float64)
+    assert np.isnan(result["missing"])
+    assert result["nested"] == [(1, "x", None, True), complex(1, -1)]
+
+
+@pytest.mark.parametrize("value", [{1: 2}, {"__type__": "tuple"}, np.array([object()]), object()])
+def test_rendezvous_format_refuses_other_types(value):
+    with pytest.raises(TypeError):
+        SingleFlight.encode(value)
+
+
+@pytest.mark.skipif(os.name != "posix", reason="cross-worker coalescing is POSIX only")
+def test_shared_directory_must_be_private(tmp_path):
+    private = SingleFlight(str(tmp_path / "private"))
+    assert private.run("test", "key", lambda: np.eye(2)).shape == (2, 2)
+    assert private.stats()["cross_worker"]
+    assert os.stat(tmp_path / "private").st_mode & 0o777 == 0o700
+
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o777)
+    flight = SingleFlight(str(shared))
+    assert flight.run("test", "key", lambda: 7) == 7
+    assert not flight.stats()["cross_worker"]
+    assert os.listdir(shared) == []
+
+
+def test_coalescing_stats_endpoint(client):
+    stats = client.get("/api/coalescing_stats").get_json()
+    assert stats["in_flight"] == 0
+    assert stats["cross_worker"] is False
@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+import scipy.sparse as sps
+from utils.sparse import SparseAlgebra
+
+
+def sparse(A):
+    return sps.csr_matrix(np.asarray(A, dtype=float))
+
+
+@pytest.mark.parametrize("A", [
+    np.eye(50, k=1),
+    np.eye(50, k=-1),
+    [[0, 1], [0, 0]],
+    [[0, 0], [1, 0]],
+    np.diag([1e-8, 1.0]),
+    np.diag([1e-20, 1.0]),
+    np.ones((5, 7)),
+    np.zeros((3, 4)),
+    [[1, 2, 0], [2, 4, 0], [0, 0, 3]],
+], ids=["upper_shift", "lower_shift", "nilpotent_2x2", "lower_nilpotent_2x2", "scaled_diagonal",
+        "tiny_diagonal", "ones", "zeros", "dependent_block"])
+def test_rank_matches_numpy(A):
+    A = np.asarray(A, dtype=float)
+    assert SparseAlgebra.rank(sparse(A)) == np.linalg.matrix_rank(A)
+    assert SparseAlgebra.nullity(sparse(A)) == A.shape[1] - np.linalg.matrix_rank(A)
+
+
+def test_rank_of_random_low_rank_products():
+    rng = np.random.default_rng(12)
+    for _ in range(50):
+        m, n = rng.integers(2, 25, 2)
+        k = rng.integers(1, min(m, n) + 1)
+        left = rng.standard_normal((m, k)) * (rng.random((m, k)) < 0.4)
+        right = rng.standard_normal((k, n)) * (rng.random((k, n)) < 0.4)
+        A = left @ right
+        assert SparseAlgebra.rank(sparse(A)) == np.linalg.matrix_rank(A)
+
+
+def test_rank_honours_tol():
+    assert SparseAlgebra.rank(sparse(np.diag([1e-8, 1.0])), tol=1e-6) == 1
+
+
+def test_rank_of_large_block_diagonal():
+    blocks = [sps.csr_matrix([[1.0, 1.0], [1.0, 1.0]]), sps.identity(3)] * 2000
+    assert SparseAlgebra.rank(sps.block_diag(blocks, format="csr")) == 2000 * 4
+
+
+def test_run_rank_on_payload():
+    payload = {"format": "coo", "shape": [3, 3], "row": [0, 1], "col": [1, 2], "data": [1.0, 1.0]}
+    assert SparseAlgebra.run("rank", payload) == 2
+    assert SparseAlgebra.run("nullity", payload) == 1
+
+
+def laplacian(n):
+    return sps.diags([-np.ones(n - 1), 2 * np.ones(n), -np.ones(n - 1)], [-1, 0, 1], format="csr")
+
+
+def test_solve_matches_numpy():
+    S = laplacian(40)
+    b = np.arange(40.0)
+    np.testing.assert_allclose(SparseAlgebra.solve(S, b), np.linalg.solve(S.toarray(), b))
+    with pytest.raises(Exception, match="singular"):
+        SparseAlgebra.solve(sparse(np.ones((3, 3))), np.ones(3))
+
+
+@pytest.mark.parametrize("which", ["largest", "smallest"])
+def test_symmetric_eigs_match_numpy(which):
+    S = laplacian(60)
+    result = SparseAlgebra.eigs(S, k=4, which=which)
+    spectrum = np.linalg.eigvalsh(S.toarray())
+    expected = spectrum[::-1][:4] if which == "largest" else spectrum[:4]
+    assert result["symmetric"]
+    np.testing.assert_allclose(result["eigenvalues"], expected, rtol=1e-8)
+    for value, vector in zip(result["eigenvalues"], result["eigenvectors"]):
+        np.testing.assert_allclose(S @ vector, value * vector, atol=1e-8)
+
+
+def test_nonsymmetric_eigs_match_numpy():
+    A = np.diag(np.arange(1.0, 31.0)) + np.eye(30, k=1)
+    result = SparseAlgebra.eigs(sparse(A), k=3)
+    assert not result["symmetric"]
+    np.testing.assert_allclose(result["eigenvalues"], [30.0, 29.0, 28.0], rtol=1e-8)
+
+
+def test_transpose_and_trace():
+    A = np.array([[1.0, 0, 2], [0, 3, 0], [4, 0, 5]])
+    payload = SparseAlgebra.transpose(sparse(A))
+    np.testing.assert_array_equal(SparseAlgebra.densify(payload), A.T)
+    assert SparseAlgebra.trace(sparse(A)) == np.trace(A)
+    with pytest.raises(ValueError):
+        SparseAlgebra.run("det", SparseAlgebra.to_payload(sparse(A)))
+
+
+def test_sparse_endpoint_ranks_singular_patterns(client):
+    n = 50
+    matrix = {"format": "coo", "shape": [n, n], "row": list(range(n - 1)), "col": list(range(1, n)),
+              "data": [1.0] * (n - 1)}
+    response = client.post("/api/sparse_operation", json={"matrix": matrix, "operation": "rank"}).get_json()
+    assert response["success"], response
+    assert response["result"] == n - 1
+    assert response["engine"] == "sparse"
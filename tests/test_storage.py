@@ -0,0 +1,125 @@
+import json
+import threading
+import numpy as np
+import pytest
+from utils.storage import MatrixExistsError, MatrixStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return MatrixStore(str(tmp_path / "matrices.db"))
+
+
+def test_round_trip_preserves_values_and_shape(store):
+    A = [[1.5, -2.0, 3.25], [0.0, 1e-300, -7.0]]
+    meta = store.insert("A", A)
+    assert (meta["rows"], meta["cols"]) == (2, 3)
+    np.testing.assert_array_equal(store.get("A"), A)
+    assert store.get("missing") is None
+
+
+def test_names_are_unique(store):
+    store.insert("A", [[1]])
+    store.insert("B", [[2]])
+    with pytest.raises(MatrixExistsError):
+        store.insert("A", [[3]])
+    with pytest.raises(MatrixExistsError):
+        store.update("B", "A", [[3]])
+    np.testing.assert_array_equal(store.get("A"), [[1]])
+
+
+def test_update_rename_and_delete(store):
+    store.insert("A", [[1, 2]])
+    assert store.update("A", "B", [[3], [4]])
+    assert store.get("A") is None
+    np.testing.assert_array_equal(store.get("B"), [[3], [4]])
+    assert not store.update("A", "C", [[1]])
+    assert store.delete("B")
+    assert not store.delete("B")
+    assert store.count() == 0
+
+
+def test_list_pages_in_insertion_order(store):
+    for i in range(5):
+        store.insert(f"M{i}", np.eye(i + 1))
+    assert [m["name"] for m in store.list(1, 2)] == ["M1", "M2"]
+    assert store.list(4, 10)[0]["rows"] == 5
+    assert [m["name"] for m in store.all()] == [f"M{i}" for i in range(5)]
+    assert store.count() == 5
+
+
+@pytest.mark.parametrize("matrix", [[], [1, 2], [[[1]]], [["a"]]])
+def test_rejects_non_matrices(store, matrix):
+    with pytest.raises(ValueError):
+        store.insert("bad", matrix)
+
+
+def test_json_migration_runs_once(store, tmp_path):
+    path = tmp_path / "matrices.json"
+    path.write_text(json.dumps([
+        {"name": "A", "matrix": [[1, 2]]},
+        {"name": "A", "matrix": [[9]]},
+        {"name": "", "matrix": [[3]]},
+        {"name": "broken"}
+    ]))
+    assert store.migrate_json(str(path)) == 2
+    np.testing.assert_array_equal(store.get("A"), [[1, 2]])
+    assert store.count() == 2
+    assert store.migrate_json(str(path)) == 0
+
+
+def test_each_thread_gets_its_own_connection(store):
+    errors = []
+
+    def writer(i):
+        try:
+            store.insert(f"T{i}", [[i]])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert store.count() == 8
+
+
+def test_concurrent_edits_are_not_lost(tmp_path):
+    path = str(tmp_path / "matrices.db")
+    MatrixStore(path).insert("counter", [[0.0]])
+    errors = []
+
+    def worker():
+        store = MatrixStore(path)
+        try:
+            for _ in range(20):
+                store.edit("counter", "counter", lambda A: A + 1)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert MatrixStore(path).get("counter")[0, 0] == 80.0
+    assert MatrixStore(path).edit("missing", "missing", lambda A: A) is None
+
+
+def test_matrix_routes(client):
+    A = [[1.0, 2.0], [3.0, 4.0]]
+    assert client.post("/api/save_matrix", json={"name": "routes", "matrix": A}).get_json()["success"]
+    assert not client.post("/api/save_matrix", json={"name": "routes", "matrix": A}).get_json()["success"]
+    assert client.get("/api/get_matrix?name=routes").get_json()["matrix"] == A
+    page = client.get("/api/get_matrices?page=1&per_page=500").get_json()
+    assert "routes" in [m["name"] for m in page["matrices"]]
+    assert "matrix" not in page["matrices"][0]
+    default = client.get("/api/get_matrices").get_json()
+    assert default["page"] == 1 and default["per_page"] == 50
+    assert client.post("/api/update_matrix", json={"old_name": "routes", "new_name": "moved", "matrix": [[5.0]]}).get_json()["success"]
+    assert not client.get("/api/get_matrix?name=routes").get_json()["success"]
+    assert client.post("/api/delete_matrix", json={"name": "moved"}).get_json()["success"]
+    assert not client.post("/api/delete_matrix", json={"name": "moved"}).get_json()["success"]
@@ -0,0 +1,73 @@
+import json
+import numpy as np
+import pytest
+from utils.transport import MatrixTransport
+
+
+def test_encoded_matrices_round_trip_exactly():
+    A = np.array([[1.0, -2.5, np.pi], [1e-300, 0.0, -1e300]])
+    encoded = MatrixTransport.encode_matrix(A)
+    assert encoded["dtype"] == "<f8" and encoded["shape"] == [2, 3]
+    decoded = MatrixTransport.decode_matrix(json.loads(json.dumps(encoded)))
+    np.testing.assert_array_equal(decoded, A)
+    np.testing.assert_array_equal(MatrixTransport.decode_matrix(MatrixTransport.encode_matrix(A, binary=True)), A)
+
+
+def test_payloads_decode_nested_matrices_only():
+    A = np.eye(2)
+    payload = {"matrix": MatrixTransport.encode_matrix(A), "jobs": [{"matrix": MatrixTransport.encode_matrix(2 * A)}],
+               "plain": [[1, 2]], "sparse": {"format": "coo", "shape": [2, 2], "data": [1]}}
+    decoded = MatrixTransport.decode_payload(payload)
+    np.testing.assert_array_equal(decoded["matrix"], A)
+    np.testing.assert_array_equal(decoded["jobs"][0]["matrix"], 2 * A)
+    assert decoded["plain"] == [[1, 2]]
+    assert decoded["sparse"] == payload["sparse"]
+
+
+def test_other_dtypes_are_rejected():
+    encoded = MatrixTransport.encode_matrix(np.eye(2))
+    encoded["dtype"] = ">f4"
+    with pytest.raises(ValueError):
+        MatrixTransport.decode_matrix(encoded)
+
+
+@pytest.mark.parametrize("array", [
+    np.arange(12.0).reshape(3, 4),
+    np.asfortranarray(np.arange(12.0).reshape(3, 4)),
+    np.arange(6, dtype=np.int32).reshape(2, 3),
+])
+def test_npy_round_trip(array):
+    np.testing.assert_array_equal(MatrixTransport.read_npy(MatrixTransport.write_npy(array)), array)
+
+
+def test_npy_rejects_objects():
+    import io
+    buffer = io.BytesIO()
+    np.save(buffer, np.array(["a", "b"]))
+    with pytest.raises(ValueError):
+        MatrixTransport.read_npy(buffer.getvalue())
+
+
+def test_encode_payload_handles_numpy_values():
+    payload = MatrixTransport.encode_payload({
+        "result": np.array([[1 + 2j, 3]]),
+        "det": np.float64(2.0),
+        "eig": complex(1, -1),
+        "pair": (np.int64(1), np.eye(1))
+    })
+    assert MatrixTransport.decode_matrix(payload["result"]["imag"]).tolist() == [[2.0, 0.0]]
+    assert payload["det"] == 2.0 and type(payload["det"]) is float
+    assert payload["eig"] == {"real": 1.0, "imag": -1.0}
+    assert payload["pair"][0] == 1
+    assert MatrixTransport.decode_matrix(payload["pair"][1]).tolist() == [[1.0]]
+
+
+def test_binary_requests_and_responses(client):
+    A = np.random.default_rng(2).standard_normal((5, 5))
+    response = client.post("/api/single_matrix_operation",
+                           json={"matrix": MatrixTransport.encode_matrix(A), "operation": "inverse"}).get_json()
+    np.testing.assert_allclose(response["result"], np.linalg.inv(A), atol=1e-10)
+    raw = client.post("/api/single_matrix_operation?operation=transpose&format=npy",
+                      data=MatrixTransport.write_npy(A), content_type="application/x-npy")
+    assert raw.mimetype == "application/x-npy"
+    np.testing.assert_array_equal(MatrixTransport.read_npy(raw.data), A.T)
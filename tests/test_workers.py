@@ -0,0 +1,74 @@
+import os
+import subprocess
+import sys
+import pytest
+from utils.workers import OperationTimeout, SymbolicPool
+
+IRRATIONAL = [[(3 * i + 5 * j) % 7 + (i == j) for j in range(7)] for i in range(7)]
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = SymbolicPool(size=1, timeout=60)
+    yield pool
+    pool.shutdown()
+
+
+def test_worker_computes_symbolic_results(pool):
+    assert pool.run("det", [[1, 2], [3, 4]], {"engine": "symbolic"}) == -2
+    assert pool.run("rank", [[1, 2], [2, 4]], {"engine": "symbolic"}) == 1
+    assert pool.stats()["tasks"] == 2
+
+
+def test_worker_errors_are_reraised(pool):
+    with pytest.raises(Exception, match="square"):
+        pool.run("det", [[1, 2, 3]], {"engine": "symbolic"})
+    assert pool.stats()["errors"] == 1
+
+
+def test_runaway_task_is_killed_and_the_worker_replaced(pool):
+    pool.run("rank", [[1]])
+    pool.timeouts = {"diagonalize": 0.5}
+    with pytest.raises(OperationTimeout) as raised:
+        pool.run("diagonalize", IRRATIONAL, {"engine": "symbolic"})
+    assert raised.value.to_dict()["timed_out"]
+    assert raised.value.limit == 0.5
+    stats = pool.stats()
+    assert stats["timeouts"] == 1 and stats["restarts"] == 1
+    pool.timeouts = {}
+    assert pool.run("rank", [[1, 0], [0, 1]]) == 2
+
+
+def test_monitor_can_stop_a_running_task(pool):
+    pool.run("rank", [[1]])
+    checks = []
+
+    def monitor(progress):
+        checks.append(progress)
+        if len(checks) >= 2:
+            raise RuntimeError("cancelled")
+
+    restarts = pool.stats()["restarts"]
+    with pytest.raises(RuntimeError, match="cancelled"):
+        pool.run("diagonalize", IRRATIONAL, {"engine": "symbolic"}, monitor)
+    stats = pool.stats()
+    assert stats["cancelled"] == 1 and stats["restarts"] == restarts + 1
+    assert pool.run("rank", [[1, 0], [0, 1]], monitor=lambda progress: None) == 2
+
+
+def test_spawned_workers_do_not_set_up_the_service(tmp_path):
+    # What a spawn child does with the parent's main script when it is app.py
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root, MATRICES_DB=str(tmp_path / "matrices.db"),
+               HISTORY_LOG=str(tmp_path / "history.jsonl"))
+    code = "import runpy, sys; runpy.run_path(sys.argv[1], run_name='__mp_main__')"
+    subprocess.run([sys.executable, "-c", code, os.path.join(root, "app.py")], cwd=tmp_path, env=env, check=True)
+    assert os.listdir(tmp_path) == []
+
+
+def test_pool_routing():
+    pool = SymbolicPool(size=0)
+    assert not pool.enabled and not pool.handles("det")
+    pool = SymbolicPool(size=1, timeout=3, timeouts={"diagonalize": 30})
+    assert pool.handles("rref") and not pool.handles("eig")
+    assert pool.limit_for("diagonalize") == 30 and pool.limit_for("det") == 3
@@ -1,50 +1,133 @@
-import sympy as sp
+import os
 import numpy as np
+from utils.lazy import lazy_module
+from utils.numeric import NumericEngine
+from utils.exact import ExactEngine
+from utils.factorization import Factorizations
+from utils.results import ResultEncoder
+from utils.sparse import EIGEN_TARGETS
+
+linalg = lazy_module("scipy.linalg")
+
+ENGINES = ("auto", "numeric", "symbolic", "exact")
+ENGINE_OPERATIONS = frozenset([
+    "rref", "ref", "det", "linear_independent", "basis_dimension", "row_space",
+    "col_space", "inverse", "transpose", "trace", "rank", "nullity", "diagonalize"
+])
+# Operations with a fraction-free rational implementation; the rest fall back to SymPy
+EXACT_OPERATIONS = frozenset([
+    "rref", "det", "linear_independent", "basis_dimension", "row_space", "col_space",
+    "inverse", "rank", "nullity"
+])
+FIXED_ENGINES = {"eig": "numeric", "power": "numeric", "expm": "numeric"}
+# SymPy's diagonalize slows down sharply beyond this size, and on irrational eigenvalues at any
+# size; auto switches to the numeric path for both
+SYMBOLIC_DIAGONALIZE_SIZE = int(os.environ.get("SYMBOLIC_DIAGONALIZE_SIZE", 6))
+# Eigenvector matrices conditioned worse than this mean a numerically defective matrix
+DIAGONALIZE_MAX_CONDITION = float(os.environ.get("DIAGONALIZE_MAX_CONDITION", 1e12))
+# Eigenvector matrices conditioned worse than this make x(t) = V exp(Dt) V^-1 x0 lose too many digits;
+# such systems are advanced with a one-step propagator expm(A h) instead
+LINEAR_FLOW_MAX_CONDITION = float(os.environ.get("LINEAR_FLOW_MAX_CONDITION", 1e6))
+# Time points evaluated per block, bounding the complex (n, points) temporaries
+LINEAR_FLOW_BLOCK = 4096
+# Largest system solved by determinants; bigger ones go through one LU factorization
+CRAMER_MAX_SIZE = 4
 
 class MatrixAlgebra:
     @staticmethod
-    def ref(matrix):
+    def select_engine(matrix, engine="auto", exact=True):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine}. Use one of: {', '.join(ENGINES)}")
+        if engine != "auto":
+            return engine
+        if isinstance(matrix, Factorizations):
+            matrix = matrix.matrix
+        if exact and ExactEngine.prefers_exact(matrix):
+            return "exact"
+        return "numeric" if NumericEngine.prefers_numeric(matrix) else "symbolic"
+
+    @staticmethod
+    def engine_for(operation, matrix, engine="auto"):
+        if operation in ENGINE_OPERATIONS:
+            if operation in EXACT_OPERATIONS:
+                return MatrixAlgebra.select_engine(matrix, engine)
+            # An explicit exact request gets SymPy's rational arithmetic instead
+            if engine == "exact":
+                return "symbolic"
+            used = MatrixAlgebra.select_engine(matrix, engine, exact=False)
+            if operation == "diagonalize" and engine == "auto" and used == "symbolic":
+                F = Factorizations.of(matrix)
+                raw = np.asarray(F.matrix)
+                numeric = raw.dtype.kind in "iubf" or ExactEngine.prefers_exact(raw)
+                if numeric and raw.ndim == 2 and raw.shape[0] == raw.shape[1] and (
+                        raw.shape[0] > SYMBOLIC_DIAGONALIZE_SIZE or not F.rational_spectrum()):
+                    return "numeric"
+            return used
+        return FIXED_ENGINES.get(operation)
+
+    @staticmethod
+    def exact_form(operation, matrix):
+        # Exact companions of float results, as "p/q" strings; None where the float result is already exact
+        F = Factorizations.of(matrix)
+        if operation == "det":
+            return str(F.exact_det())
+        if operation == "inverse":
+            inverse = F.exact_inverse()
+            return ExactEngine.to_strings(inverse) if inverse is not None else None
+        if operation in ("rref", "row_space", "col_space", "basis_dimension"):
+            R, pivots = F.exact_rref()
+            row_basis = ExactEngine.to_strings(R[:len(pivots)])
+            column_basis = [[str(row[j]) for row in F.exact()] for j in pivots]
+            if operation == "rref":
+                return ExactEngine.to_strings(R)
+            if operation == "row_space":
+                return row_basis
+            if operation == "col_space":
+                return column_basis
+            return {"column_basis": column_basis, "row_basis": row_basis, "span_basis": column_basis}
+        return None
+
+    @staticmethod
+    def run(handler, operation, matrix, engine="auto", tol=None, options=None):
+        used = MatrixAlgebra.engine_for(operation, matrix, engine)
+        if operation in ENGINE_OPERATIONS:
+            return handler(matrix, engine=used, tol=tol, **(options or {})), used
+        return handler(matrix, **(options or {})), used
+
+    @staticmethod
+    def nonzero_rows(R, tol=1e-10):
+        return R[np.any(np.abs(R) > tol, axis=1)]
+
+    @staticmethod
+    def ref(matrix, engine="auto", tol=None):
         try:
-            M = sp.Matrix(matrix)
-            echelon_form, pivots = M.echelon_form(with_pivots=True)
-            result = []
-            for i in range(echelon_form.rows):
-                row = []
-                for j in range(echelon_form.cols):
-                    element = echelon_form[i, j]
-                    if hasattr(element, 'evalf'):
-                        row.append(float(element.evalf()))
-                    else:
-                        row.append(float(element))
-                result.append(row)
-            return result
+            F = Factorizations.of(matrix)
+            if MatrixAlgebra.select_engine(F, engine, exact=False) == "numeric":
+                return F.elimination(tol, reduced=False)[0]
+            echelon_form, pivots = F.symbolic_echelon()
+            return ResultEncoder.as_array(echelon_form)
         except Exception as e:
             raise Exception(f"REF computation failed: {str(e)}")
 
     @staticmethod
-    def rref(matrix):
+    def rref(matrix, engine="auto", tol=None):
         try:
-            M = sp.Matrix(matrix)
-            rref_matrix, pivots = M.rref()
-            result = []
-            for i in range(rref_matrix.rows):
-                row = []
-                for j in range(rref_matrix.cols):
-                    element = rref_matrix[i, j]
-                    if hasattr(element, 'evalf'):
-                        row.append(float(element.evalf()))
-                    else:
-                        row.append(float(element))
-                result.append(row)
-            return result
+            F = Factorizations.of(matrix)
+            used = MatrixAlgebra.select_engine(F, engine)
+            if used == "numeric":
+                return F.elimination(tol)[0]
+            if used == "exact":
+                return ExactEngine.to_float(F.exact_rref()[0])
+            rref_matrix, pivots = F.symbolic_rref()
+            return ResultEncoder.as_array(rref_matrix)
         except Exception as e:
             raise Exception(f"RREF computation failed: {str(e)}")
 
     @staticmethod
     def matrix_algebra(matrix1, operator, matrix2):
         try:
-            a = np.array(matrix1, dtype=float)
-            b = np.array(matrix2, dtype=float)
+            a = Factorizations.of(matrix1).array()
+            b = Factorizations.of(matrix2).array()
             if operator == "+":
                 if a.shape != b.shape:
                     raise ValueError("Matrix dimensions must match for addition")
@@ -65,34 +148,49 @@ class MatrixAlgebra:
     @staticmethod
     def matrix_scaler_algebra(matrix, num):
         try:
-            return np.array(matrix, dtype=float) * float(num)
+            return Factorizations.of(matrix).array() * float(num)
         except Exception as e:
             raise Exception(f"Scalar multiplication failed: {str(e)}")
 
     @staticmethod
-    def det(matrix):
+    def det(matrix, engine="auto", tol=None):
         try:
-            matrix_np = np.array(matrix, dtype=float)
+            F = Factorizations.of(matrix)
+            matrix_np = F.array()
             if matrix_np.shape[0] != matrix_np.shape[1]:
                 raise ValueError("Matrix must be square for determinant computation")
-            return float(np.linalg.det(matrix_np))
+            used = MatrixAlgebra.select_engine(F, engine)
+            if used == "numeric":
+                return NumericEngine.det_from_lu(*F.lu())
+            if used == "exact":
+                return float(F.exact_det())
+            return float(F.symbolic_det())
         except Exception as e:
             raise Exception(f"Determinant computation failed: {str(e)}")
 
     @staticmethod
     def cramer(matrix, result):
         try:
-            A = np.array(matrix, dtype=float)
+            F = Factorizations.of(matrix)
+            A = F.array()
             b = np.array(result, dtype=float)
             if A.shape[0] != A.shape[1]:
                 raise ValueError("Coefficient matrix must be square")
             if len(b.shape) > 1:
                 b = b.flatten()
-            det_A = np.linalg.det(A)
-            if abs(det_A) < 1e-10:
+            if b.shape[0] != A.shape[0]:
+                raise ValueError(f"Constant vector has {b.shape[0]} entries; expected {A.shape[0]}")
+            n = A.shape[0]
+            lu, piv = F.lu()
+            # Singularity is judged on the condition estimate, not an absolute determinant cutoff
+            if NumericEngine.rcond_from_lu(A, lu) <= NumericEngine.rcond_threshold(n):
                 return "System is singular - no unique solution exists"
+            if n > CRAMER_MAX_SIZE:
+                # Cramer's rule costs n+1 determinants; beyond teaching sizes one factorization does
+                return linalg.lu_solve((lu, piv), b, check_finite=False)
+            det_A = NumericEngine.det_from_lu(lu, piv)
             solutions = []
-            for i in range(A.shape[1]):
+            for i in range(n):
                 Ai = A.copy()
                 Ai[:, i] = b
                 solutions.append(np.linalg.det(Ai) / det_A)
@@ -101,137 +199,257 @@ class MatrixAlgebra:
             raise Exception(f"Cramer's rule failed: {str(e)}")
 
     @staticmethod
-    def linear_independent(matrix):
+    def solve(matrix, rhs, tol=None):
         try:
-            M = sp.Matrix(matrix)
-            rank = M.rank()
-            return rank == M.shape[0]
+            F = Factorizations.of(matrix)
+            A = F.array()
+            B = NumericEngine.as_array(rhs)
+            m, n = A.shape
+            if B.shape[0] != m:
+                raise ValueError(f"Right-hand side has {B.shape[0]} rows; expected {m}")
+            threshold = NumericEngine.rcond_threshold(n, tol)
+            X = None
+            if m == n and n > 0:
+                cho = F.cholesky()
+                if cho is not None:
+                    rcond = NumericEngine.rcond_from_cholesky(A, cho[0])
+                    if rcond > threshold:
+                        X, method = linalg.cho_solve(cho, B, check_finite=False), "cholesky"
+                if X is None:
+                    lu, piv = F.lu()
+                    rcond = NumericEngine.rcond_from_lu(A, lu)
+                    if rcond > threshold:
+                        X, method = linalg.lu_solve((lu, piv), B, check_finite=False), "lu"
+            if X is None:
+                # Non-square or numerically singular: minimum-norm least-squares solution
+                cutoff = float(tol) if tol is not None else max(m, n) * np.finfo(float).eps
+                X, _, rank, s = linalg.lstsq(A, B, cond=cutoff, lapack_driver="gelsd", check_finite=False)
+                rcond = float(s[-1] / s[0]) if s.size and s[0] > 0 else 0.0
+                method = "least_squares"
+            else:
+                rank = n
+            residual = np.linalg.norm(A @ X - B, axis=0)
+            vector = np.ndim(rhs) == 1
+            return {
+                "solution": X[:, 0] if vector else X,
+                "method": method,
+                "condition_number": 1.0 / rcond if rcond > 0 else None,
+                "rank": int(rank),
+                "unique": bool(rank == n),
+                "residual_norm": float(residual[0]) if vector else residual
+            }
+        except Exception as e:
+            raise Exception(f"Linear solve failed: {str(e)}")
+
+    @staticmethod
+    def linear_independent(matrix, engine="auto", tol=None):
+        try:
+            F = Factorizations.of(matrix)
+            used = MatrixAlgebra.select_engine(F, engine)
+            if used == "numeric":
+                return F.numeric_rank(tol) == F.array().shape[0]
+            if used == "exact":
+                return F.exact_rank() == len(F.exact())
+            return F.symbolic_rank() == F.symbolic().shape[0]
         except Exception as e:
             raise Exception(f"Linear independence check failed: {str(e)}")
 
     @staticmethod
-    def basis_dimension(matrix):
+    def basis_dimension(matrix, engine="auto", tol=None):
         try:
-            M = sp.Matrix(matrix)
-            rank = M.rank()
+            F = Factorizations.of(matrix)
+            used = MatrixAlgebra.select_engine(F, engine)
+            if used == "numeric":
+                A = F.array()
+                rows, columns = F.independent(tol)
+                rank = len(columns)
+                column_space_basis = A[:, columns].T
+                return (rank, rank == A.shape[0], column_space_basis,
+                        A[rows], column_space_basis.copy())
+            if used == "exact":
+                A = F.array()
+                R, pivots = F.exact_rref()
+                rank = len(pivots)
+                column_space_basis = A[:, pivots].T
+                return (rank, rank == A.shape[0], column_space_basis,
+                        ExactEngine.to_float(R[:rank]), column_space_basis.copy())
+            M = F.symbolic()
+            rref_matrix, pivots = F.symbolic_rref()
+            rank = len(pivots)
             independent = (rank == M.shape[0])
-            rref_matrix, pivots = M.rref()
-            column_space_basis = []
-            for col_idx in pivots:
-                col_vector = []
-                for i in range(M.rows):
-                    col_vector.append(float(M[i, col_idx]))
-                column_space_basis.append(col_vector)
-            row_space_basis = []
-            for i in range(rref_matrix.rows):
-                row = [float(x) for x in rref_matrix.row(i)]
-                if any(abs(x) > 1e-10 for x in row):
-                    row_space_basis.append(row)
-            span_basis = column_space_basis.copy()
-            return rank, independent, column_space_basis, row_space_basis, span_basis
+            column_space_basis = ResultEncoder.as_array(M)[:, list(pivots)].T
+            row_space_basis = MatrixAlgebra.nonzero_rows(ResultEncoder.as_array(rref_matrix))
+            return rank, independent, column_space_basis, row_space_basis, column_space_basis.copy()
         except Exception as e:
             raise Exception(f"Basis analysis failed: {str(e)}")
 
     @staticmethod
-    def row_space(matrix):
+    def row_space(matrix, engine="auto", tol=None):
         try:
-            M = sp.Matrix(matrix)
-            rref_matrix, pivots = M.rref()
-            row_space_basis = []
-            for i in range(rref_matrix.rows):
-                row = [float(x) for x in rref_matrix.row(i)]
-                if any(abs(x) > 1e-10 for x in row):
-                    row_space_basis.append(row)
-            return row_space_basis
+            F = Factorizations.of(matrix)
+            used = MatrixAlgebra.select_engine(F, engine)
+            if used == "numeric":
+                return F.array()[F.independent(tol)[0]]
+            if used == "exact":
+                R, pivots = F.exact_rref()
+                return ExactEngine.to_float(R[:len(pivots)])
+            rref_matrix, pivots = F.symbolic_rref()
+            return MatrixAlgebra.nonzero_rows(ResultEncoder.as_array(rref_matrix))
         except Exception as e:
             raise Exception(f"Row space computation failed: {str(e)}")
 
     @staticmethod
-    def col_space(matrix):
+    def col_space(matrix, engine="auto", tol=None):
         try:
-            M = sp.Matrix(matrix)
-            rref_matrix, pivots = M.rref()
-            column_space_basis = []
-            for col_idx in pivots:
-                col_vector = []
-                for i in range(M.rows):
-                    col_vector.append(float(M[i, col_idx]))
-                column_space_basis.append(col_vector)
-            return column_space_basis
+            F = Factorizations.of(matrix)
+            used = MatrixAlgebra.select_engine(F, engine)
+            if used == "numeric":
+                return F.array()[:, F.independent(tol)[1]].T
+            if used == "exact":
+                return F.array()[:, F.exact_rref()[1]].T
+            rref_matrix, pivots = F.symbolic_rref()
+            return ResultEncoder.as_array(F.symbolic())[:, list(pivots)].T
         except Exception as e:
             raise Exception(f"Column space computation failed: {str(e)}")
 
     @staticmethod
-    def eig(matrix):
+    def eigen_target(which):
+        if which not in EIGEN_TARGETS:
+            raise ValueError(f"Unsupported target: {which}. Use one of: {', '.join(EIGEN_TARGETS)}")
+        return EIGEN_TARGETS[which]
+
+    @staticmethod
+    def extreme_eigenpairs(values, vectors, k, target):
+        # Works on one spectrum or a stack; eigenvectors are columns
+        keys = {"LM": -np.abs(values), "SM": np.abs(values), "LA": -values.real, "LR": -values.real,
+                "SA": values.real, "SR": values.real}
+        order = np.argsort(keys[target], axis=-1, kind="stable")[..., :k]
+        return (np.take_along_axis(values, order, axis=-1),
+                np.take_along_axis(vectors, order[..., np.newaxis, :], axis=-1))
+
+    @staticmethod
+    def eigen_decomposition(F):
+        # Full spectrum routed by structure: (values, eigenvector columns, structure)
+        A = F.array()
+        structure = F.structure()
+        if structure == "diagonal":
+            return np.diag(A).copy(), np.eye(A.shape[0]), structure
+        if structure in ("upper_triangular", "lower_triangular"):
+            triangular = F.triangular_eig()
+            if triangular is not None:
+                return triangular[0], triangular[1], structure
+        if structure == "symmetric":
+            values, vectors = F.eigh()
+            return values, vectors, structure
+        values, vectors = F.eig()
+        return values, vectors, structure
+
+    @staticmethod
+    def eig(matrix, k=None, which="largest"):
         try:
-            A = np.array(matrix, dtype=float)
+            F = Factorizations.of(matrix)
+            A = F.array()
+            n = A.shape[0]
             if A.shape[0] != A.shape[1]:
                 raise ValueError("Matrix must be square for eigenvalue analysis")
-            eigenvalues, eigenvectors = np.linalg.eig(A)
-            eigenvalues_list = []
-            for val in eigenvalues:
-                if abs(val.imag) < 1e-10:
-                    eigenvalues_list.append(float(val.real))
+            if k is None:
+                values, vectors, structure = MatrixAlgebra.eigen_decomposition(F)
+            else:
+                target = MatrixAlgebra.eigen_target(which)
+                k = int(k)
+                if not 1 <= k <= n:
+                    raise ValueError(f"k must be between 1 and {n} for a {n}x{n} matrix")
+                structure = F.structure()
+                if structure == "symmetric" and target not in ("LM", "SM"):
+                    # LAPACK computes only the requested end of a real spectrum
+                    values, vectors = F.eigh((n - k, n - 1) if target in ("LA", "LR") else (0, k - 1))
                 else:
-                    eigenvalues_list.append(complex(val))
-            eigenvectors_list = []
-            for i in range(eigenvectors.shape[1]):
-                eigenvector = []
-                for j in range(eigenvectors.shape[0]):
-                    val = eigenvectors[j, i]
-                    if abs(val.imag) < 1e-10:
-                        eigenvector.append(float(val.real))
-                    else:
-                        eigenvector.append(complex(val))
-                eigenvectors_list.append(eigenvector)
-            return {
-                "eigenvalues": eigenvalues_list,
-                "eigenvectors": eigenvectors_list
+                    values, vectors, structure = MatrixAlgebra.eigen_decomposition(F)
+                values, vectors = MatrixAlgebra.extreme_eigenpairs(values, vectors, k, target)
+            # One eigenvector per row; complex128 only when some part is genuinely complex
+            result = {
+                "eigenvalues": ResultEncoder.real_if_close(values),
+                "eigenvectors": ResultEncoder.real_if_close(vectors.T),
+                "structure": structure
             }
+            if k is not None:
+                result.update(k=k, which=which)
+            return result
         except Exception as e:
             raise Exception(f"Eigen analysis failed: {str(e)}")
 
     @staticmethod
-    def diagonalize(matrix):
+    def eig_stack(matrices, k=None, which="largest"):
         try:
-            M = sp.Matrix(matrix)
+            A = np.array(matrices, dtype=float)
+            if A.ndim == 2:
+                A = A[np.newaxis]
+            if A.ndim != 3 or A.shape[1] != A.shape[2] or 0 in A.shape:
+                raise ValueError("Expected a non-empty stack of square matrices with shape (count, n, n)")
+            count, n = A.shape[0], A.shape[1]
+            # One gufunc call: NumPy loops the LAPACK driver over the stack in C
+            structure = NumericEngine.structure(A)
+            if structure == "diagonal":
+                values, vectors = np.diagonal(A, axis1=1, axis2=2).copy(), np.broadcast_to(np.eye(n), A.shape)
+            elif structure == "symmetric":
+                values, vectors = np.linalg.eigh(A)
+            else:
+                values, vectors = np.linalg.eig(A)
+            if k is not None:
+                k = int(k)
+                if not 1 <= k <= n:
+                    raise ValueError(f"k must be between 1 and {n} for {n}x{n} matrices")
+                values, vectors = MatrixAlgebra.extreme_eigenpairs(
+                    values, vectors, k, MatrixAlgebra.eigen_target(which))
+            result = {
+                "count": count,
+                "eigenvalues": ResultEncoder.real_if_close(values),
+                "eigenvectors": ResultEncoder.real_if_close(np.swapaxes(vectors, 1, 2)),
+                "structure": structure
+            }
+            if k is not None:
+                result.update(k=k, which=which)
+            return result
+        except Exception as e:
+            raise Exception(f"Batched eigen analysis failed: {str(e)}")
+
+    @staticmethod
+    def numeric_diagonalize(F, tol=None):
+        A = F.array()
+        if A.shape[0] != A.shape[1]:
+            raise ValueError("Matrix must be square for diagonalization")
+        values, vectors, structure = MatrixAlgebra.eigen_decomposition(F)
+        if structure in ("diagonal", "symmetric"):
+            # Orthonormal eigenvectors: perfectly conditioned, and the inverse is the transpose
+            condition = 1.0
+            P_inv = vectors.T
+        else:
+            condition = float(np.linalg.cond(vectors))
+            limit = 1.0 / float(tol) if tol else DIAGONALIZE_MAX_CONDITION
+            if not np.isfinite(condition) or condition > limit:
+                return f"Matrix is not diagonalizable (eigenvector condition number {condition:.3g})"
+            P_inv = np.linalg.inv(vectors)
+        return {
+            "P": ResultEncoder.real_if_close(vectors),
+            "D": ResultEncoder.real_if_close(np.diag(values)),
+            "P_inv": ResultEncoder.real_if_close(P_inv),
+            "condition_number": condition,
+            "message": "Matrix is diagonalizable"
+        }
+
+    @staticmethod
+    def diagonalize(matrix, engine="auto", tol=None):
+        try:
+            F = Factorizations.of(matrix)
+            if MatrixAlgebra.engine_for("diagonalize", F, engine) == "numeric":
+                return MatrixAlgebra.numeric_diagonalize(F, tol)
+            M = F.symbolic()
             if M.is_diagonalizable():
                 P, D = M.diagonalize()
-                P_inv = P.inv()
-                P_list = []
-                for i in range(P.rows):
-                    row = []
-                    for j in range(P.cols):
-                        val = P[i, j]
-                        if hasattr(val, 'evalf'):
-                            row.append(float(val.evalf()))
-                        else:
-                            row.append(float(val))
-                    P_list.append(row)
-                D_list = []
-                for i in range(D.rows):
-                    row = []
-                    for j in range(D.cols):
-                        val = D[i, j]
-                        if hasattr(val, 'evalf'):
-                            row.append(float(val.evalf()))
-                        else:
-                            row.append(float(val))
-                    D_list.append(row)
-                P_inv_list = []
-                for i in range(P_inv.rows):
-                    row = []
-                    for j in range(P_inv.cols):
-                        val = P_inv[i, j]
-                        if hasattr(val, 'evalf'):
-                            row.append(float(val.evalf()))
-                        else:
-                            row.append(float(val))
-                    P_inv_list.append(row)
                 return {
-                    "P": P_list,
-                    "D": D_list,
-                    "P_inv": P_inv_list,
+                    "P": ResultEncoder.as_array(P),
+                    "D": ResultEncoder.as_array(D),
+                    "P_inv": ResultEncoder.as_array(P.inv()),
                     "message": "Matrix is diagonalizable"
                 }
             else:
@@ -240,51 +458,150 @@ class MatrixAlgebra:
             raise Exception(f"Diagonalization failed: {str(e)}")
 
     @staticmethod
-    def inverse(matrix):
+    def power(matrix, exponent=None):
+        try:
+            if exponent is None or isinstance(exponent, bool) or not float(exponent).is_integer():
+                raise ValueError("Matrix powers need an integer exponent")
+            exponent = int(float(exponent))
+            F = Factorizations.of(matrix)
+            A = F.array()
+            if A.shape[0] != A.shape[1]:
+                raise ValueError("Matrix must be square for powers")
+            structure = F.structure()
+            if structure == "diagonal":
+                values = np.diag(A)
+                if exponent < 0 and np.any(values == 0):
+                    return "Matrix is singular - negative powers do not exist"
+                return np.diag(values ** float(exponent))
+            if structure == "symmetric" and NumericEngine.prefers_numeric(F.matrix):
+                # One cached eigendecomposition serves every exponent; integer matrices keep
+                # exact repeated squaring instead of picking up rounding from the eigenvectors
+                values, vectors = F.eigh()
+                if exponent < 0 and np.abs(values).min() <= A.shape[0] * np.finfo(float).eps * np.abs(values).max():
+                    return "Matrix is singular - negative powers do not exist"
+                return (vectors * values ** float(exponent)) @ vectors.T
+            base = A
+            if exponent < 0:
+                base = NumericEngine.inverse_from_lu(A, *F.lu())
+                if base is None:
+                    return "Matrix is singular - negative powers do not exist"
+            # Repeated squaring: about 2*log2(|exponent|) products
+            return np.linalg.matrix_power(base, abs(exponent))
+        except Exception as e:
+            raise Exception(f"Matrix power failed: {str(e)}")
+
+    @staticmethod
+    def expm(matrix, t=1.0):
         try:
-            M = sp.Matrix(matrix)
+            t = float(t)
+            F = Factorizations.of(matrix)
+            A = F.array()
+            if A.shape[0] != A.shape[1]:
+                raise ValueError("Matrix must be square for the matrix exponential")
+            structure = F.structure()
+            if structure == "diagonal":
+                return np.diag(np.exp(t * np.diag(A)))
+            if structure == "symmetric":
+                values, vectors = F.eigh()
+                return (vectors * np.exp(t * values)) @ vectors.T
+            # Scaling and squaring with a Pade approximant
+            return linalg.expm(t * A)
+        except Exception as e:
+            raise Exception(f"Matrix exponential failed: {str(e)}")
+
+    @staticmethod
+    def linear_flow(matrix, x0, times, t0=None, forcing=None):
+        # x(t) = expm(A (t - t0)) x0 for every t from one decomposition of A; a constant
+        # forcing b (x' = A x + b) rides along as an extra state that is always 1
+        try:
+            A = NumericEngine.as_array(matrix)
+            n = A.shape[0]
+            if A.shape[1] != n:
+                raise ValueError("Matrix must be square for a linear system")
+            x0 = np.asarray(x0, dtype=float).ravel()
+            if x0.size != n:
+                raise ValueError(f"Expected {n} initial values, got {x0.size}")
+            times = np.atleast_1d(np.asarray(times, dtype=float))
+            offsets = times - (times[0] if t0 is None else float(t0))
+            if forcing is not None and np.any(forcing):
+                A = np.block([[A, np.asarray(forcing, dtype=float).reshape(n, 1)], [np.zeros((1, n + 1))]])
+                x0 = np.append(x0, 1.0)
+            F = Factorizations.of(A)
+            values, vectors, structure = MatrixAlgebra.eigen_decomposition(F)
+            if structure in ("diagonal", "symmetric"):
+                coefficients = vectors.T @ x0
+            elif np.linalg.cond(vectors) <= LINEAR_FLOW_MAX_CONDITION:
+                coefficients = np.linalg.solve(vectors, x0.astype(vectors.dtype))
+            else:
+                return {"states": MatrixAlgebra.propagate(A, x0, offsets)[:n], "method": "propagator"}
+            states = np.empty((A.shape[0], offsets.size))
+            for first in range(0, offsets.size, LINEAR_FLOW_BLOCK):
+                block = offsets[first:first + LINEAR_FLOW_BLOCK]
+                # Columns are V (exp(lambda t) * c); the imaginary parts of a real system cancel
+                states[:, first:first + block.size] = (vectors @ (np.exp(np.outer(values, block)) * coefficients[:, np.newaxis])).real
+            return {"states": states[:n], "method": "eigendecomposition"}
+        except Exception as e:
+            raise Exception(f"Linear system evaluation failed: {str(e)}")
+
+    @staticmethod
+    def propagate(A, x0, offsets):
+        # Defective or badly conditioned A: x(t + h) = expm(A h) x(t), one exponential per distinct step
+        states = np.empty((A.shape[0], offsets.size))
+        states[:, 0] = linalg.expm(A * offsets[0]) @ x0 if offsets[0] else x0
+        propagators = {}
+        for k, h in enumerate(np.diff(offsets)):
+            # Grid steps differ only in their last bits; those share one propagator
+            key = float(f"{h:.14g}")
+            E = propagators.get(key)
+            if E is None:
+                E = propagators[key] = linalg.expm(A * key)
+            states[:, k + 1] = E @ states[:, k]
+        return states
+
+    @staticmethod
+    def inverse(matrix, engine="auto", tol=None):
+        try:
+            F = Factorizations.of(matrix)
+            used = MatrixAlgebra.select_engine(F, engine)
+            if used == "numeric":
+                inv_matrix = NumericEngine.inverse_from_lu(F.array(), *F.lu(), tol)
+                if inv_matrix is None:
+                    return "Matrix is singular - no inverse exists"
+                return inv_matrix
+            if used == "exact":
+                inv_matrix = F.exact_inverse()
+                if inv_matrix is None:
+                    return "Matrix is singular - no inverse exists"
+                return ExactEngine.to_float(inv_matrix)
+            M = F.symbolic()
             if M.shape[0] != M.shape[1]:
                 raise ValueError("Matrix must be square for inversion")
-            if M.det() == 0:
+            if F.symbolic_det() == 0:
                 return "Matrix is singular - no inverse exists"
-            inv_matrix = M.inv()
-            result = []
-            for i in range(inv_matrix.rows):
-                row = []
-                for j in range(inv_matrix.cols):
-                    val = inv_matrix[i, j]
-                    if hasattr(val, 'evalf'):
-                        row.append(float(val.evalf()))
-                    else:
-                        row.append(float(val))
-                result.append(row)
-            return result
+            return ResultEncoder.as_array(M.inv())
         except Exception as e:
             raise Exception(f"Inversion failed: {str(e)}")
 
     @staticmethod
-    def transpose(matrix):
+    def transpose(matrix, engine="auto", tol=None):
         try:
-            M = sp.Matrix(matrix)
-            transpose_matrix = M.T
-            result = []
-            for i in range(transpose_matrix.rows):
-                row = []
-                for j in range(transpose_matrix.cols):
-                    val = transpose_matrix[i, j]
-                    if hasattr(val, 'evalf'):
-                        row.append(float(val.evalf()))
-                    else:
-                        row.append(float(val))
-                result.append(row)
-            return result
+            F = Factorizations.of(matrix)
+            if MatrixAlgebra.select_engine(F, engine, exact=False) == "numeric":
+                return F.array().T
+            return ResultEncoder.as_array(F.symbolic().T)
         except Exception as e:
             raise Exception(f"Transpose failed: {str(e)}")
 
     @staticmethod
-    def trace(matrix):
+    def trace(matrix, engine="auto", tol=None):
         try:
-            M = sp.Matrix(matrix)
+            F = Factorizations.of(matrix)
+            if MatrixAlgebra.select_engine(F, engine, exact=False) == "numeric":
+                A = F.array()
+                if A.shape[0] != A.shape[1]:
+                    raise ValueError("Matrix must be square for trace computation")
+                return float(np.trace(A))
+            M = F.symbolic()
             if M.shape[0] != M.shape[1]:
                 raise ValueError("Matrix must be square for trace computation")
             return float(M.trace())
@@ -292,19 +609,28 @@ class MatrixAlgebra:
             raise Exception(f"Trace computation failed: {str(e)}")
 
     @staticmethod
-    def rank(matrix):
+    def rank(matrix, engine="auto", tol=None):
         try:
-            M = sp.Matrix(matrix)
-            return int(M.rank())
+            F = Factorizations.of(matrix)
+            used = MatrixAlgebra.select_engine(F, engine)
+            if used == "numeric":
+                return F.numeric_rank(tol)
+            if used == "exact":
+                return F.exact_rank()
+            return int(F.symbolic_rank())
         except Exception as e:
             raise Exception(f"Rank computation failed: {str(e)}")
 
     @staticmethod
-    def nullity(matrix):
+    def nullity(matrix, engine="auto", tol=None):
         try:
-            M = sp.Matrix(matrix)
-            rank = M.rank()
-            return M.shape[1] - rank
+            F = Factorizations.of(matrix)
+            used = MatrixAlgebra.select_engine(F, engine)
+            if used == "numeric":
+                return F.array().shape[1] - F.numeric_rank(tol)
+            if used == "exact":
+                return F.array().shape[1] - F.exact_rank()
+            return F.symbolic().shape[1] - F.symbolic_rank()
         except Exception as e:
             raise Exception(f"Nullity computation failed: {str(e)}")
 
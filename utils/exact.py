@@ -0,0 +1,134 @@
+import os
+from fractions import Fraction
+from math import lcm, prod
+from numbers import Rational
+import numpy as np
+from utils.numeric import AUTO_NUMERIC_SIZE
+
+# "Short decimal": a float with at most this many digits after the point, e.g. 0.125 or 2.5
+EXACT_MAX_DECIMALS = int(os.environ.get("EXACT_MAX_DECIMALS", 6))
+AUTO_EXACT_SIZE = int(os.environ.get("AUTO_EXACT_SIZE", AUTO_NUMERIC_SIZE))
+# Scaled decimals must stay integers a float can hold exactly
+EXACT_SAFE_INTEGER = 2 ** 53
+
+class ExactEngine:
+    @staticmethod
+    def prefers_exact(matrix):
+        A = np.asarray(matrix)
+        if A.ndim not in (1, 2) or A.size == 0 or max(A.shape) > AUTO_EXACT_SIZE:
+            return False
+        if A.dtype.kind in "iub":
+            return True
+        if A.dtype.kind == "O":
+            return all(isinstance(x, Rational) for x in A.flat)
+        if A.dtype.kind != "f" or not np.isfinite(A).all():
+            return False
+        scaled = A * 10.0 ** EXACT_MAX_DECIMALS
+        if np.any(np.abs(scaled) >= EXACT_SAFE_INTEGER):
+            return False
+        return bool(np.all(np.abs(scaled - np.round(scaled)) <= 4 * np.finfo(float).eps * np.abs(scaled)))
+
+    @staticmethod
+    def rationals(matrix):
+        rows = np.asarray(matrix, dtype=object).tolist()
+        if rows and not isinstance(rows[0], list):
+            # Same convention as NumericEngine.as_array: a flat list is a column vector
+            rows = [[x] for x in rows]
+        if rows and any(len(row) != len(rows[0]) for row in rows):
+            raise ValueError("Matrix rows must all have the same length")
+        return [[ExactEngine.rational(x) for x in row] for row in rows]
+
+    @staticmethod
+    def rational(value):
+        if isinstance(value, (bool, np.bool_)):
+            return Fraction(int(value))
+        if isinstance(value, Rational):
+            return Fraction(value)
+        if isinstance(value, np.integer):
+            return Fraction(int(value))
+        value = float(value)
+        if not np.isfinite(value):
+            raise ValueError("Exact arithmetic needs finite entries")
+        # The shortest repr is the decimal the user typed, not the nearest binary fraction
+        return Fraction(repr(value))
+
+    @staticmethod
+    def integer_rows(rows):
+        # Clearing each row's denominators leaves pivots and the RREF unchanged
+        scales = [lcm(*(x.denominator for x in row)) if row else 1 for row in rows]
+        return [[int(x * d) for x in row] for row, d in zip(rows, scales)], scales
+
+    @staticmethod
+    def gauss_jordan(rows, columns=None):
+        # Fraction-free Gauss-Jordan (Bareiss): every division is exact, so entries stay integers.
+        # On return each pivot column holds `den` in its pivot row and zeros elsewhere.
+        M = [list(row) for row in rows]
+        m = len(M)
+        n = len(M[0]) if m else 0
+        den, sign, row, pivots = 1, 1, 0, []
+        for col in range(n if columns is None else columns):
+            if row >= m:
+                break
+            p = next((i for i in range(row, m) if M[i][col]), None)
+            if p is None:
+                continue
+            if p != row:
+                M[row], M[p] = M[p], M[row]
+                sign = -sign
+            pivot_row = M[row]
+            pivot = pivot_row[col]
+            for i in range(m):
+                a = M[i][col]
+                if i == row:
+                    continue
+                if a:
+                    M[i] = [(pivot * x - a * y) // den for x, y in zip(M[i], pivot_row)]
+                elif pivot != den:
+                    M[i] = [pivot * x // den for x in M[i]]
+            den = pivot
+            pivots.append(col)
+            row += 1
+        return M, den, sign, pivots
+
+    @staticmethod
+    def rref(matrix):
+        M, den, sign, pivots = ExactEngine.gauss_jordan(ExactEngine.integer_rows(ExactEngine.rationals(matrix))[0])
+        return [[Fraction(x, den) for x in row] for row in M], pivots
+
+    @staticmethod
+    def det(matrix):
+        rows = ExactEngine.rationals(matrix)
+        if any(len(row) != len(rows) for row in rows):
+            raise ValueError("Matrix must be square for determinant computation")
+        integers, scales = ExactEngine.integer_rows(rows)
+        M, den, sign, pivots = ExactEngine.gauss_jordan(integers)
+        if len(pivots) < len(rows):
+            return Fraction(0)
+        return Fraction(sign * den, prod(scales))
+
+    @staticmethod
+    def inverse(matrix):
+        # None when the matrix is singular
+        rows = ExactEngine.rationals(matrix)
+        n = len(rows)
+        if any(len(row) != n for row in rows):
+            raise ValueError("Matrix must be square for inversion")
+        integers, scales = ExactEngine.integer_rows(rows)
+        augmented = [row + [int(i == j) for j in range(n)] for i, row in enumerate(integers)]
+        M, den, sign, pivots = ExactEngine.gauss_jordan(augmented, columns=n)
+        if len(pivots) < n:
+            return None
+        # A = diag(1/scales) @ B, so inv(A) = inv(B) @ diag(scales)
+        return [[Fraction(x * d, den) for x, d in zip(row[n:], scales)] for row in M]
+
+    @staticmethod
+    def to_float(value):
+        if isinstance(value, Fraction):
+            return float(value)
+        return np.array(value, dtype=float)
+
+    @staticmethod
+    def to_strings(value):
+        if isinstance(value, list):
+            return [ExactEngine.to_strings(x) for x in value]
+        return str(value)
@@ -0,0 +1,670 @@
+import os
+import re
+import numpy as np
+from utils.lazy import lazy_module
+from utils.numeric import NumericEngine
+from utils.factorization import Factorizations
+
+linalg = lazy_module("scipy.linalg")
+
+EXPRESSION_MAX_LENGTH = int(os.environ.get("EXPRESSION_MAX_LENGTH", 10000))
+EXPRESSION_MAX_NODES = int(os.environ.get("EXPRESSION_MAX_NODES", 1000))
+EXPRESSION_MAX_POWER = int(os.environ.get("EXPRESSION_MAX_POWER", 1000))
+# Largest eye(n); the identity is allocated densely, so n is bounded like any uploaded matrix
+EXPRESSION_MAX_DIM = int(os.environ.get("EXPRESSION_MAX_DIM", os.environ.get("MAX_MATRIX_DIM", 1000)))
+EXPRESSION_FUNCTIONS = {"inv": 1, "transpose": 1, "det": 1, "trace": 1, "solve": 2, "eye": 1}
+# Matrix names with spaces or punctuation are written in double quotes, e.g. "Matrix A" * B
+EXPRESSION_TOKENS = re.compile(
+    r"\s*(?:(\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)|([A-Za-z_]\w*)|\"([^\"]+)\"|([-+*/^(),;=']))"
+)
+COMMUTATIVE = ("add", "mul")
+
+class ExpressionGraph:
+    # Nodes are hash-consed: building the same subexpression twice returns the same node,
+    # which is the common-subexpression elimination. Ids only ever point backwards,
+    # so id order is a valid evaluation order.
+    def __init__(self, resolve):
+        self.resolve = resolve
+        self.nodes = []
+        self.index = {}
+        self.leaves = {}
+        self.variables = {}
+        self.chain_cost = 0
+        self.naive_cost = 0
+        self.rewrites = 0
+        # Product node -> the flat factor list it was ordered from, so (A*B)*C is re-planned as one chain
+        self.chains = {}
+        self.result = None
+        self.outputs = {}
+
+    def add(self, op, args=(), value=None, shape=None, text=None):
+        if op in COMMUTATIVE:
+            args = tuple(sorted(args))
+        key = (op, args, value)
+        node = self.index.get(key)
+        if node is not None:
+            return node
+        if len(self.nodes) >= EXPRESSION_MAX_NODES:
+            raise ValueError(f"Expression is too large; the limit is {EXPRESSION_MAX_NODES} nodes")
+        node = len(self.nodes)
+        self.nodes.append({"op": op, "args": args, "value": value, "shape": shape, "text": text})
+        self.index[key] = node
+        return node
+
+    def shape(self, node):
+        return self.nodes[node]["shape"]
+
+    def text(self, node):
+        return self.nodes[node]["text"]
+
+    def is_scalar(self, node):
+        return self.shape(node) == ()
+
+    def constant(self, value):
+        value = float(value)
+        return self.add("const", value=value, shape=(), text=str(int(value)) if value.is_integer() else repr(value))
+
+    def constant_value(self, node):
+        return self.nodes[node]["value"] if self.nodes[node]["op"] == "const" else None
+
+    def matrix(self, name):
+        if name in self.variables:
+            return self.variables[name]
+        if name not in self.leaves:
+            matrix = self.resolve(name)
+            if matrix is None:
+                raise ValueError(f"Unknown matrix: {name}")
+            factorizations = Factorizations.of(matrix)
+            self.leaves[name] = factorizations
+        shape = self.leaves[name].array().shape
+        text = name if re.match(r"^[A-Za-z_]\w*$", name) else f'"{name}"'
+        return self.add("matrix", value=name, shape=shape, text=text)
+
+    def negate(self, node):
+        constant = self.constant_value(node)
+        if constant is not None:
+            return self.constant(-constant)
+        if self.nodes[node]["op"] == "neg":
+            return self.nodes[node]["args"][0]
+        return self.add("neg", (node,), shape=self.shape(node), text=f"-{self.text(node)}")
+
+    def scale(self, node, factor):
+        constant = self.constant_value(factor)
+        if constant == 1:
+            return node
+        if constant == -1:
+            return self.negate(node)
+        if self.is_scalar(node):
+            return self.multiply_scalars(node, factor)
+        return self.add("scale", (node, factor), shape=self.shape(node), text=f"{self.text(factor)}*{self.text(node)}")
+
+    def multiply_scalars(self, a, b):
+        x, y = self.constant_value(a), self.constant_value(b)
+        if x is not None and y is not None:
+            return self.constant(x * y)
+        if x == 1 or y == 1:
+            return b if x == 1 else a
+        return self.add("mul", (a, b), shape=(), text=f"{self.text(a)}*{self.text(b)}")
+
+    def divide(self, a, b):
+        if not self.is_scalar(b):
+            raise ValueError(f"Only division by a scalar is supported; use inv() for {self.text(b)}")
+        y = self.constant_value(b)
+        if y == 0:
+            raise ValueError("Division by zero")
+        if y is not None:
+            return self.scale(a, self.constant(1.0 / y))
+        return self.add("div", (a, b), shape=self.shape(a), text=f"{self.text(a)}/{self.text(b)}")
+
+    def combine(self, op, a, b):
+        symbol = "+" if op == "add" else "-"
+        if self.is_scalar(a) != self.is_scalar(b):
+            raise ValueError(f"Cannot {'add' if op == 'add' else 'subtract'} a scalar and a matrix: "
+                             f"{self.text(a)} {symbol} {self.text(b)}")
+        if self.shape(a) != self.shape(b):
+            raise ValueError(f"Matrix dimensions must match for {'addition' if op == 'add' else 'subtraction'}: "
+                             f"{self.text(a)} is {format_shape(self.shape(a))}, {self.text(b)} is {format_shape(self.shape(b))}")
+        x, y = self.constant_value(a), self.constant_value(b)
+        if x is not None and y is not None:
+            return self.constant(x + y if op == "add" else x - y)
+        return self.add(op, (a, b), shape=self.shape(a), text=f"({self.text(a)} {symbol} {self.text(b)})")
+
+    def transpose(self, node):
+        if self.is_scalar(node):
+            return node
+        if self.nodes[node]["op"] == "transpose":
+            return self.nodes[node]["args"][0]
+        m, n = self.shape(node)
+        return self.add("transpose", (node,), shape=(n, m), text=f"{self.text(node)}^T")
+
+    def square(self, node, purpose):
+        shape = self.shape(node)
+        if shape == () or shape[0] != shape[1]:
+            raise ValueError(f"Matrix must be square for {purpose}: {self.text(node)} is {format_shape(shape)}")
+
+    def inverse(self, node):
+        if self.is_scalar(node):
+            return self.divide(self.constant(1), node)
+        self.square(node, "inversion")
+        return self.add("inv", (node,), shape=self.shape(node), text=f"inv({self.text(node)})")
+
+    def reduce(self, op, node):
+        self.square(node, "determinant computation" if op == "det" else "trace")
+        return self.add(op, (node,), shape=(), text=f"{op}({self.text(node)})")
+
+    def eye(self, size):
+        n = self.constant_value(size)
+        if n is None or n != int(n) or n < 0:
+            raise ValueError("eye() takes a non-negative integer size")
+        if n > EXPRESSION_MAX_DIM:
+            raise ValueError(f"eye() sizes are limited to {EXPRESSION_MAX_DIM}")
+        return self.add("eye", value=int(n), shape=(int(n), int(n)), text=f"eye({int(n)})")
+
+    def power(self, node, exponent):
+        if self.is_scalar(node):
+            x = self.constant_value(node)
+            if x is not None:
+                return self.constant(x ** exponent)
+            return self.add("pow", (node,), value=exponent, shape=(), text=f"{self.text(node)}^{exponent}")
+        if abs(exponent) > EXPRESSION_MAX_POWER:
+            raise ValueError(f"Matrix powers are limited to {EXPRESSION_MAX_POWER}")
+        self.square(node, "powers")
+        if exponent < 0:
+            node, exponent = self.inverse(node), -exponent
+        if exponent == 0:
+            return self.eye(self.constant(self.shape(node)[0]))
+        if exponent == 1:
+            return node
+        return self.add("pow", (node,), value=exponent, shape=self.shape(node), text=f"{self.text(node)}^{exponent}")
+
+    def solve(self, a, b, transposed=False):
+        self.square(a, "solving")
+        if self.is_scalar(b):
+            raise ValueError(f"The right-hand side of a solve must be a matrix: {self.text(b)}")
+        rows = self.shape(b)[1] if transposed else self.shape(b)[0]
+        if rows != self.shape(a)[0]:
+            raise ValueError(f"Inner dimensions must match for multiplication: {self.text(a)} is "
+                             f"{format_shape(self.shape(a))}, {self.text(b)} is {format_shape(self.shape(b))}")
+        if transposed:
+            # b * inv(a), solved as a^T x^T = b^T with a's own LU factors
+            return self.add("rsolve", (b, a), shape=self.shape(b), text=f"{self.text(b)}*inv({self.text(a)})")
+        return self.add("solve", (a, b), shape=self.shape(b), text=f"solve({self.text(a)}, {self.text(b)})")
+
+    def product(self, factors):
+        # Products are flattened into one chain so the multiplication order is chosen globally
+        coefficient = self.constant(1)
+        chain = []
+        pending = list(factors)
+        while pending:
+            node = pending.pop(0)
+            entry = self.nodes[node]
+            if self.is_scalar(node):
+                coefficient = self.multiply_scalars(coefficient, node)
+            elif entry["op"] == "neg":
+                coefficient = self.negate(coefficient)
+                pending.insert(0, entry["args"][0])
+            elif entry["op"] == "scale":
+                coefficient = self.multiply_scalars(coefficient, entry["args"][1])
+                pending.insert(0, entry["args"][0])
+            elif node in self.chains:
+                pending[0:0] = list(self.chains[node])
+            else:
+                chain.append(node)
+        if not chain:
+            return coefficient
+        for left, right in zip(chain, chain[1:]):
+            if self.shape(left)[1] != self.shape(right)[0]:
+                raise ValueError(f"Inner dimensions must match for multiplication: {self.text(left)} is "
+                                 f"{format_shape(self.shape(left))}, {self.text(right)} is {format_shape(self.shape(right))}")
+        if self.constant_value(coefficient) not in (None, 1, -1):
+            # A constant is cheapest applied to the smallest operand, not to the finished product
+            result_size = self.shape(chain[0])[0] * self.shape(chain[-1])[1]
+            # Inverses are left alone so they can still become solves
+            candidates = [i for i, node in enumerate(chain) if self.nodes[node]["op"] != "inv"]
+            smallest = min(candidates, key=lambda i: np.prod(self.shape(chain[i])), default=None)
+            if smallest is not None and np.prod(self.shape(chain[smallest])) < result_size:
+                chain[smallest] = self.scale(chain[smallest], coefficient)
+                coefficient = self.constant(1)
+        return self.scale(self.ordered(chain), coefficient)
+
+    def ordered(self, chain):
+        inverses = [i for i, node in enumerate(chain) if self.nodes[node]["op"] == "inv"]
+        if not inverses:
+            return self.optimal_chain(chain)
+        i = inverses[0]
+        left, target, right = chain[:i], self.nodes[chain[i]]["args"][0], chain[i + 1:]
+        if not left and not right:
+            return chain[i]
+        self.rewrites += 1
+        # inv(X)*Y becomes solve(X, Y) and Y*inv(X) a transposed solve; with operands on both
+        # sides the side with fewer right-hand-side columns is solved against
+        if right and (not left or self.shape(chain[-1])[1] <= self.shape(chain[0])[0]):
+            solved = self.solve(target, self.ordered(right))
+            return self.ordered(left + [solved]) if left else solved
+        solved = self.solve(target, self.optimal_chain(left), transposed=True)
+        return self.ordered([solved] + right) if right else solved
+
+    def optimal_chain(self, chain):
+        if len(chain) == 1:
+            return chain[0]
+        dims = [self.shape(chain[0])[0]] + [self.shape(node)[1] for node in chain]
+        k = len(chain)
+        cost = [[0] * k for _ in range(k)]
+        split = [[0] * k for _ in range(k)]
+        for length in range(2, k + 1):
+            for i in range(k - length + 1):
+                j = i + length - 1
+                cost[i][j] = None
+                for s in range(i, j):
+                    c = cost[i][s] + cost[s + 1][j] + dims[i] * dims[s + 1] * dims[j + 1]
+                    if cost[i][j] is None or c < cost[i][j]:
+                        cost[i][j], split[i][j] = c, s
+        self.chain_cost += cost[0][k - 1]
+        self.naive_cost += sum(dims[0] * dims[s] * dims[s + 1] for s in range(1, k))
+
+        def build(i, j):
+            if i == j:
+                return chain[i]
+            s = split[i][j]
+            a, b = build(i, s), build(s + 1, j)
+            return self.add("matmul", (a, b), shape=(self.shape(a)[0], self.shape(b)[1]),
+                            text=f"{self.text(a)}*{self.text(b)}")
+
+        node = build(0, k - 1)
+        self.chains[node] = tuple(chain)
+        return node
+
+
+def format_shape(shape):
+    return "a scalar" if shape == () else f"{shape[0]}x{shape[1]}"
+
+class _Parser:
+    def __init__(self, tokens, graph):
+        self.tokens = tokens
+        self.position = 0
+        self.graph = graph
+
+    def peek(self, offset=0):
+        position = self.position + offset
+        return self.tokens[position] if position < len(self.tokens) else (None, None)
+
+    def next(self):
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def expect(self, symbol):
+        kind, value = self.next()
+        if kind != "symbol" or value != symbol:
+            raise ValueError(f"Expected '{symbol}' but found {describe(value)}")
+
+    def accept(self, *symbols):
+        kind, value = self.peek()
+        if kind == "symbol" and value in symbols:
+            self.position += 1
+            return value
+        return None
+
+    def program(self):
+        result = None
+        while self.peek()[0] is not None:
+            if self.accept(";"):
+                continue
+            kind, value = self.peek()
+            second = self.peek(1)
+            if kind == "name" and second == ("symbol", "="):
+                if value in EXPRESSION_FUNCTIONS:
+                    raise ValueError(f"Cannot assign to the function name '{value}'")
+                self.position += 2
+                result = self.graph.variables[value] = self.expression()
+            else:
+                result = self.expression()
+            if self.peek()[0] is not None:
+                self.expect(";")
+        if result is None:
+            raise ValueError("Expression is empty")
+        return result
+
+    def expression(self):
+        node = self.term()
+        while True:
+            symbol = self.accept("+", "-")
+            if symbol is None:
+                return node
+            node = self.graph.combine("add" if symbol == "+" else "sub", node, self.term())
+
+    def term(self):
+        factors = [self.unary()]
+        divisors = []
+        while True:
+            symbol = self.accept("*", "/")
+            if symbol is None:
+                break
+            node = self.unary()
+            constant = self.graph.constant_value(node)
+            if symbol == "*":
+                factors.append(node)
+            elif constant:
+                # Dividing by a constant is one more factor of the product, not a separate pass
+                factors.append(self.graph.constant(1.0 / constant))
+            else:
+                divisors.append(node)
+        node = self.graph.product(factors) if len(factors) > 1 else factors[0]
+        for divisor in divisors:
+            node = self.graph.divide(node, divisor)
+        return node
+
+    def unary(self):
+        if self.accept("-"):
+            return self.graph.negate(self.unary())
+        if self.accept("+"):
+            return self.unary()
+        return self.postfix()
+
+    def postfix(self):
+        node = self.primary()
+        while True:
+            if self.accept("'"):
+                node = self.graph.transpose(node)
+            elif self.accept("^"):
+                node = self.exponent(node)
+            else:
+                return node
+
+    def exponent(self, node):
+        if self.peek() == ("name", "T"):
+            self.position += 1
+            return self.graph.transpose(node)
+        parenthesized = self.accept("(")
+        negative = self.accept("-")
+        kind, value = self.next()
+        if kind != "number" or not float(value).is_integer():
+            raise ValueError(f"Exponents must be integers or T, found {describe(value)}")
+        if parenthesized:
+            self.expect(")")
+        exponent = int(float(value))
+        return self.graph.power(node, -exponent if negative else exponent)
+
+    def primary(self):
+        kind, value = self.next()
+        if kind == "number":
+            return self.graph.constant(value)
+        if kind == "quoted":
+            return self.graph.matrix(value)
+        if kind == "name":
+            if value in EXPRESSION_FUNCTIONS and self.peek() == ("symbol", "("):
+                return self.call(value)
+            return self.graph.matrix(value)
+        if kind == "symbol" and value == "(":
+            node = self.expression()
+            self.expect(")")
+            return node
+        raise ValueError(f"Unexpected {describe(value)}")
+
+    def call(self, name):
+        self.expect("(")
+        args = [self.expression()]
+        while self.accept(","):
+            args.append(self.expression())
+        self.expect(")")
+        if len(args) != EXPRESSION_FUNCTIONS[name]:
+            raise ValueError(f"{name}() takes {EXPRESSION_FUNCTIONS[name]} argument(s), got {len(args)}")
+        graph = self.graph
+        if name == "inv":
+            return graph.inverse(args[0])
+        if name == "transpose":
+            return graph.transpose(args[0])
+        if name in ("det", "trace"):
+            return graph.reduce(name, args[0])
+        if name == "eye":
+            return graph.eye(args[0])
+        return graph.solve(args[0], args[1])
+
+
+def describe(value):
+    return "end of expression" if value is None else f"'{value}'"
+
+
+class MatrixExpression:
+    @staticmethod
+    def tokenize(expression):
+        tokens = []
+        position = 0
+        text = expression.rstrip()
+        while position < len(text):
+            match = EXPRESSION_TOKENS.match(text, position)
+            if not match:
+                raise ValueError(f"Unexpected character '{text[position:].strip()[0]}' in expression")
+            number, name, quoted, symbol = match.groups()
+            if number is not None:
+                tokens.append(("number", number))
+            elif name is not None:
+                tokens.append(("name", name))
+            elif quoted is not None:
+                tokens.append(("quoted", quoted))
+            else:
+                tokens.append(("symbol", symbol))
+            position = match.end()
+        return tokens
+
+    @staticmethod
+    def compile(expression, resolve, outputs=None):
+        # resolve(name) returns the matrix bound to a name, or None when there is none
+        try:
+            if not isinstance(expression, str) or not expression.strip():
+                raise ValueError("An expression is required")
+            if len(expression) > EXPRESSION_MAX_LENGTH:
+                raise ValueError(f"Expression is longer than {EXPRESSION_MAX_LENGTH} characters")
+            graph = ExpressionGraph(resolve)
+            graph.result = _Parser(MatrixExpression.tokenize(expression), graph).program()
+            for name in outputs or []:
+                if name not in graph.variables:
+                    raise ValueError(f"Output '{name}' is not assigned in the expression")
+                graph.outputs[name] = graph.variables[name]
+            return graph
+        except Exception as e:
+            raise Exception(f"Invalid expression: {str(e)}")
+
+    @staticmethod
+    def evaluate(graph, tol=None):
+        try:
+            return MatrixExpression.run(graph, tol)
+        except Exception as e:
+            raise Exception(f"Expression evaluation failed: {str(e)}")
+
+    @staticmethod
+    def run(graph, tol=None):
+        roots = [graph.result] + list(graph.outputs.values())
+        needed = set()
+        pending = list(roots)
+        while pending:
+            node = pending.pop()
+            if node not in needed:
+                needed.add(node)
+                pending.extend(graph.nodes[node]["args"])
+        order = sorted(needed)
+        # Consumers left per node; results handed back to the caller are pinned with an extra count
+        refs = dict.fromkeys(order, 0)
+        for node in order:
+            for arg in graph.nodes[node]["args"]:
+                refs[arg] += 1
+        shared = sum(1 for node in order if refs[node] > 1 and graph.nodes[node]["op"] not in ("matrix", "const"))
+        for node in roots:
+            refs[node] += 1
+
+        evaluator = _Evaluator(graph, refs, tol)
+        for node in order:
+            evaluator.step(node)
+
+        result = {
+            "result": evaluator.values[graph.result],
+            "shape": list(graph.shape(graph.result)),
+            "plan": evaluator.plan,
+            "stats": {
+                "nodes": len(order),
+                "shared_subexpressions": shared,
+                "solve_rewrites": graph.rewrites,
+                "multiplication_cost": graph.chain_cost,
+                "left_to_right_cost": graph.naive_cost,
+                "temporaries": evaluator.allocations,
+                "reused_buffers": evaluator.reused,
+                "in_place": evaluator.in_place
+            }
+        }
+        if graph.outputs:
+            result["outputs"] = {name: evaluator.values[node] for name, node in graph.outputs.items()}
+        return result
+
+
+class _Evaluator:
+    # Temporaries whose last consumer has run go to a per-shape pool; elementwise steps write
+    # into a dying operand and products draw their output buffer from the pool.
+    def __init__(self, graph, refs, tol):
+        self.graph = graph
+        self.refs = refs
+        self.tol = tol
+        self.values = {}
+        self.owned = set()
+        self.pool = {}
+        self.factors = {}
+        self.labels = {}
+        self.plan = []
+        self.allocations = 0
+        self.reused = 0
+        self.in_place = 0
+
+    def dying(self, node, args):
+        return self.refs[node] == 1 and node in self.owned and args.count(node) == 1
+
+    def buffer(self, shape):
+        free = self.pool.get(shape)
+        if free:
+            self.reused += 1
+            return free.pop()
+        self.allocations += 1
+        return np.empty(shape)
+
+    def target(self, shape, candidates, args):
+        for node in candidates:
+            if self.dying(node, args):
+                self.in_place += 1
+                return self.values[node]
+        return self.buffer(shape)
+
+    def factorize(self, node):
+        if node not in self.factors:
+            entry = self.graph.nodes[node]
+            if entry["op"] == "matrix":
+                factorizations = self.graph.leaves[entry["value"]]
+                self.factors[node] = (factorizations.array(),) + tuple(factorizations.lu())
+            else:
+                # Temporaries may be overwritten later, so they never enter the shared factorization cache
+                self.factors[node] = NumericEngine.lu(self.values[node])
+        return self.factors[node]
+
+    def lu(self, node):
+        A, lu, piv = self.factorize(node)
+        if NumericEngine.rcond_from_lu(A, lu) <= NumericEngine.rcond_threshold(A.shape[0], self.tol):
+            raise ValueError(f"Matrix {self.graph.text(node)} is singular")
+        return A, lu, piv
+
+    def step(self, node):
+        entry = self.graph.nodes[node]
+        op, args = entry["op"], list(entry["args"])
+        values = [self.values[arg] for arg in args]
+        shape = entry["shape"]
+        fresh = op not in ("matrix", "const", "transpose")
+        if op == "const":
+            value = entry["value"]
+        elif op == "matrix":
+            value = self.graph.leaves[entry["value"]].array()
+        elif op == "eye":
+            value = self.buffer(shape)
+            value[...] = np.eye(shape[0])
+        elif shape == () and op in ("neg", "mul", "div", "add", "sub", "pow"):
+            value = float({"neg": lambda: -values[0], "mul": lambda: values[0] * values[1],
+                           "div": lambda: values[0] / values[1], "add": lambda: values[0] + values[1],
+                           "sub": lambda: values[0] - values[1], "pow": lambda: values[0] ** entry["value"]}[op]())
+        elif op == "neg":
+            value = np.negative(values[0], out=self.target(shape, args, args))
+        elif op == "scale":
+            value = np.multiply(values[0], values[1], out=self.target(shape, args[:1], args))
+        elif op == "div":
+            value = np.divide(values[0], values[1], out=self.target(shape, args[:1], args))
+        elif op == "add":
+            value = np.add(values[0], values[1], out=self.target(shape, args, args))
+        elif op == "sub":
+            value = np.subtract(values[0], values[1], out=self.target(shape, args, args))
+        elif op == "transpose":
+            # A view: the operand's buffer must stay untouched for as long as the view may be read
+            value = values[0].T
+            self.owned.discard(args[0])
+        elif op == "matmul":
+            value = np.matmul(values[0], values[1], out=self.buffer(shape))
+        elif op == "pow":
+            value = np.linalg.matrix_power(values[0], entry["value"])
+            self.allocations += 1
+        elif op == "inv":
+            A, lu, piv = self.lu(args[0])
+            value = linalg.lu_solve((lu, piv), np.eye(shape[0]), check_finite=False)
+            self.allocations += 1
+        elif op == "solve":
+            A, lu, piv = self.lu(args[0])
+            value = linalg.lu_solve((lu, piv), values[1], overwrite_b=self.dying(args[1], args), check_finite=False)
+            self.allocations += 1
+        elif op == "rsolve":
+            # b * inv(a) = (a^T \ b^T)^T, reusing a's LU factors with trans=1
+            A, lu, piv = self.lu(args[1])
+            value = linalg.lu_solve((lu, piv), values[0].T, trans=1, overwrite_b=self.dying(args[0], args),
+                                    check_finite=False).T
+            self.allocations += 1
+        elif op == "det":
+            A, lu, piv = self.factorize(args[0])
+            value = NumericEngine.det_from_lu(lu, piv)
+        elif op == "trace":
+            value = float(np.trace(values[0]))
+        else:
+            raise ValueError(f"Unsupported expression node: {op}")
+
+        self.values[node] = value
+        if fresh and isinstance(value, np.ndarray) and value.flags.c_contiguous and value.flags.writeable:
+            self.owned.add(node)
+        if op not in ("matrix", "const"):
+            self.record(node, op, args)
+        for arg in set(args):
+            self.refs[arg] -= args.count(arg)
+            if self.refs[arg] == 0:
+                self.release(arg, value)
+
+    def release(self, node, consumer):
+        value = self.values.pop(node)
+        if node in self.owned and not (isinstance(consumer, np.ndarray) and np.may_share_memory(value, consumer)):
+            self.pool.setdefault(value.shape, []).append(value)
+        self.owned.discard(node)
+
+    def record(self, node, op, args):
+        self.labels[node] = f"t{len(self.plan) + 1}"
+        operands = [self.labels.get(arg) or self.graph.text(arg) for arg in args]
+        if op == "matmul":
+            step = f"{operands[0]} * {operands[1]}"
+        elif op in ("add", "sub"):
+            step = f"{operands[0]} {'+' if op == 'add' else '-'} {operands[1]}"
+        elif op in ("scale", "mul"):
+            step = f"{operands[1] if op == 'scale' else operands[0]} * {operands[0] if op == 'scale' else operands[1]}"
+        elif op == "div":
+            step = f"{operands[0]} / {operands[1]}"
+        elif op == "neg":
+            step = f"-{operands[0]}"
+        elif op == "transpose":
+            step = f"{operands[0]}^T"
+        elif op == "pow":
+            step = f"{operands[0]}^{self.graph.nodes[node]['value']}"
+        elif op == "rsolve":
+            step = f"{operands[0]} * inv({operands[1]})  [transposed LU solve]"
+        elif op == "solve":
+            step = f"solve({operands[0]}, {operands[1]})  [LU solve]"
+        elif op == "eye":
+            step = self.graph.text(node)
+        else:
+            step = f"{op}({', '.join(operands)})"
+        self.plan.append(f"{self.labels[node]} = {step}")
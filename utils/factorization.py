@@ -0,0 +1,247 @@
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from utils.lazy import lazy_module
+from utils.numeric import NumericEngine
+from utils.exact import ExactEngine
+
+sp = lazy_module("sympy")
+linalg = lazy_module("scipy.linalg")
+
+CACHE_BYTES = int(os.environ.get("FACTORIZATION_CACHE_BYTES", 64 * 1024 * 1024))
+CACHE_TTL = float(os.environ.get("FACTORIZATION_CACHE_TTL", 600))
+# Rough footprint of one SymPy matrix cell; used only for the byte budget
+SYMBOLIC_ENTRY_BYTES = 256
+
+def estimate_nbytes(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    # Only SymPy itself can have produced a SymPy matrix; the check must not import it
+    if "sympy" in sys.modules and isinstance(value, sp.MatrixBase):
+        return value.rows * value.cols * SYMBOLIC_ENTRY_BYTES
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_nbytes(v) for v in value)
+    return 64
+
+def freeze(value):
+    # Cached arrays are shared between requests, so callers must not mutate them
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+    elif isinstance(value, tuple):
+        for v in value:
+            freeze(v)
+    return value
+
+class Factorizations:
+    def __init__(self, matrix, key=None, cache=None):
+        self.matrix = matrix
+        self.key = key
+        self.nbytes = 0
+        self._cache = cache
+        self._entries = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def of(matrix):
+        if isinstance(matrix, Factorizations):
+            return matrix
+        return factorization_cache.lookup(matrix)
+
+    def memo(self, key, compute):
+        return self._get(("memo",) + tuple(key), compute)
+
+    def _get(self, key, compute):
+        if key in self._entries:
+            if self._cache:
+                self._cache.record_decomposition(hit=True)
+            return self._entries[key]
+        with self._lock:
+            if key not in self._entries:
+                value = freeze(compute())
+                self._entries[key] = value
+                if self._cache:
+                    self._cache.record_decomposition(hit=False)
+                    self._cache.grow(self, estimate_nbytes(value))
+                else:
+                    self.nbytes += estimate_nbytes(value)
+            return self._entries[key]
+
+    def array(self):
+        return self._get("array", lambda: NumericEngine.as_array(self.matrix))
+
+    def lu(self):
+        return self._get("lu", lambda: NumericEngine.lu(self.array())[1:])
+
+    def cholesky(self):
+        # None when the matrix is not symmetric positive definite
+        return self._get("cholesky", lambda: NumericEngine.cholesky(self.array()))
+
+    def qr(self):
+        return self._get("qr", lambda: linalg.qr(self.array(), mode="economic", pivoting=True, check_finite=False))
+
+    def row_qr(self):
+        return self._get("row_qr", lambda: linalg.qr(self.array().T, mode="economic", pivoting=True, check_finite=False))
+
+    def singular_values(self):
+        return self._get("svd", lambda: NumericEngine.singular_values(self.array()))
+
+    def eig(self):
+        return self._get("eig", lambda: np.linalg.eig(self.array()))
+
+    def eigh(self, subset=None):
+        # subset=(lo, hi) asks LAPACK for only those eigenpairs, in ascending order
+        return self._get(("eigh", subset), lambda: linalg.eigh(
+            self.array(), subset_by_index=list(subset) if subset else None, check_finite=False))
+
+    def structure(self):
+        return self._get("structure", lambda: NumericEngine.structure(self.array()))
+
+    def triangular_eig(self):
+        return self._get("triangular_eig", lambda: NumericEngine.triangular_eig(
+            self.array(), lower=self.structure() == "lower_triangular"))
+
+    def elimination(self, tol=None, reduced=True):
+        key = ("rref" if reduced else "ref", tol)
+        return self._get(key, lambda: NumericEngine.eliminate(self.array(), tol, reduced))
+
+    def numeric_rank(self, tol=None):
+        return NumericEngine.rank_from_singular_values(self.singular_values(), self.array().shape, tol)
+
+    def independent(self, tol=None):
+        # Indices of independent rows and columns: the leading column pivots of a pivoted QR,
+        # as many as the SVD rank for the same tol, so every basis has exactly rank vectors
+        rank = self.numeric_rank(tol)
+        if rank == 0:
+            return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+        return np.sort(self.row_qr()[2][:rank]), np.sort(self.qr()[2][:rank])
+
+    def exact(self):
+        return self._get("exact", lambda: ExactEngine.rationals(self.matrix))
+
+    def exact_rref(self):
+        return self._get("exact_rref", lambda: ExactEngine.rref(self.exact()))
+
+    def exact_rank(self):
+        return len(self.exact_rref()[1])
+
+    def exact_det(self):
+        return self._get("exact_det", lambda: ExactEngine.det(self.exact()))
+
+    def exact_inverse(self):
+        return self._get("exact_inverse", lambda: ExactEngine.inverse(self.exact()))
+
+    def symbolic(self):
+        return self._get("sympy", lambda: sp.Matrix(self.matrix))
+
+    def symbolic_rref(self):
+        return self._get("sympy_rref", lambda: self.symbolic().rref())
+
+    def symbolic_echelon(self):
+        return self._get("sympy_echelon", lambda: self.symbolic().echelon_form(with_pivots=True))
+
+    def symbolic_rank(self):
+        return len(self.symbolic_rref()[1])
+
+    def symbolic_det(self):
+        return self._get("sympy_det", lambda: self.symbolic().det())
+
+    def rational_spectrum(self):
+        # Whether the characteristic polynomial splits into linear factors over the rationals
+        return self._get("rational_spectrum", lambda: all(
+            factor.degree() <= 1 for factor, _ in self.symbolic().charpoly().factor_list()[1]))
+
+class FactorizationCache:
+    def __init__(self, max_bytes=CACHE_BYTES, ttl=CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._created = {}
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0, "misses": 0, "uncacheable": 0,
+            "decomposition_hits": 0, "decomposition_misses": 0,
+            "evictions": 0, "expirations": 0
+        }
+
+    @staticmethod
+    def content_key(matrix):
+        try:
+            raw = np.asarray(matrix)
+        except (ValueError, TypeError):
+            return None, None
+        if raw.dtype.kind not in "iubf":
+            return None, None
+        A = NumericEngine.as_array(raw)
+        digest = hashlib.blake2b(A.tobytes(), digest_size=16)
+        digest.update(f"{raw.dtype.kind}:{A.shape}".encode())
+        return digest.hexdigest(), A
+
+    def lookup(self, matrix):
+        key, A = FactorizationCache.content_key(matrix)
+        if key is None:
+            with self._lock:
+                self._counters["uncacheable"] += 1
+            return Factorizations(matrix)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - self._created[key] > self.ttl:
+                self._remove(key)
+                self._counters["expirations"] += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return entry
+            self._counters["misses"] += 1
+            entry = Factorizations(matrix, key, self)
+            self._entries[key] = entry
+            self._created[key] = now
+        entry._get("array", lambda: A)
+        return entry
+
+    def grow(self, entry, size):
+        with self._lock:
+            entry.nbytes += size
+            if self._entries.get(entry.key) is not entry:
+                return
+            self.bytes += size
+            while self.bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._counters["evictions"] += 1
+
+    def record_decomposition(self, hit):
+        with self._lock:
+            self._counters["decomposition_hits" if hit else "decomposition_misses"] += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._created.pop(key, None)
+        self.bytes -= entry.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._created.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats.update({
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl
+            })
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+factorization_cache = FactorizationCache()
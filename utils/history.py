@@ -0,0 +1,218 @@
+import json
+import os
+import queue
+import reprlib
+import threading
+import time
+from contextlib import contextmanager
+import numpy as np
+from utils.metrics import storage_latency
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+HISTORY_KEEP = int(os.environ.get("HISTORY_KEEP", 50))
+HISTORY_QUEUE_SIZE = int(os.environ.get("HISTORY_QUEUE_SIZE", 1000))
+HISTORY_BATCH_SIZE = 100
+HISTORY_COMPACT_INTERVAL = 60.0
+PREVIEW_LENGTH = 100
+
+_preview_repr = reprlib.Repr()
+_preview_repr.maxlevel = 3
+_preview_repr.maxlist = 6
+_preview_repr.maxtuple = 6
+_preview_repr.maxdict = 6
+_preview_repr.maxstring = PREVIEW_LENGTH
+_preview_repr.maxother = 40
+
+_CLEAR = object()
+
+class HistoryLog:
+    def __init__(self, path, keep=HISTORY_KEEP, queue_size=HISTORY_QUEUE_SIZE):
+        self.path = path
+        self.keep = keep
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        # Entries enqueued but not yet written; only changed under the condition
+        self._pending = 0
+        self._drained = threading.Condition()
+        self._lines = self._count_lines()
+        self._last_compaction = time.monotonic()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+
+    @staticmethod
+    def preview(result, limit=PREVIEW_LENGTH):
+        # Bounded-cost rendering: never stringifies a whole large result
+        if isinstance(result, np.ndarray):
+            text = np.array2string(result, threshold=16, edgeitems=2, max_line_width=limit)
+        elif isinstance(result, str):
+            text = result[:limit + 1]
+        else:
+            text = _preview_repr.repr(result)
+        return text[:limit] + '...' if len(text) > limit else text
+
+    def record(self, entry):
+        self._ensure_writer()
+        with self._drained:
+            try:
+                self._queue.put_nowait(entry)
+                self._pending += 1
+            except queue.Full:
+                # Compute endpoints must never wait on history I/O
+                self.dropped += 1
+
+    def clear(self, timeout=1.0):
+        self._ensure_writer()
+        with self._drained:
+            # Queued entries would be wiped anyway, so discarding them frees room for the marker
+            while True:
+                try:
+                    self._queue.get_nowait()
+                    self._pending -= 1
+                except queue.Empty:
+                    break
+            self._queue.put_nowait(_CLEAR)
+            self._pending += 1
+        return self.flush(timeout)
+
+    def flush(self, timeout=1.0):
+        with self._drained:
+            return self._drained.wait_for(lambda: self._pending == 0, timeout)
+
+    def tail(self, n):
+        self.flush(0.5)
+        return self._read_tail(n)
+
+    @storage_latency.timed("history", "read")
+    def _read_tail(self, n):
+        if n <= 0 or not os.path.exists(self.path):
+            return []
+        with open(self.path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            data = b''
+            while position > 0 and data.count(b'\n') <= n:
+                step = min(8192, position)
+                position -= step
+                f.seek(position)
+                data = f.read(step) + data
+        entries = []
+        for line in data.splitlines()[-n:]:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+        return entries
+
+    def import_json(self, json_path):
+        if os.path.exists(self.path) or not os.path.exists(json_path):
+            return 0
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if not isinstance(entries, list):
+            return 0
+        self._append(entries[-self.keep:])
+        return len(entries[-self.keep:])
+
+    def _ensure_writer(self):
+        if self._writer is not None and self._writer.is_alive():
+            return
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._run, name="history-writer", daemon=True)
+                self._writer.start()
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=HISTORY_COMPACT_INTERVAL)
+            except queue.Empty:
+                try:
+                    self._maybe_compact()
+                except OSError:
+                    pass
+                continue
+            batch = [first]
+            while len(batch) < HISTORY_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(batch)
+            except OSError:
+                pass
+            finally:
+                with self._drained:
+                    self._pending -= len(batch)
+                    if self._pending == 0:
+                        self._drained.notify_all()
+
+    def _write_batch(self, batch):
+        pending = []
+        for item in batch:
+            if item is _CLEAR:
+                self._append(pending)
+                pending = []
+                self._rewrite([])
+            else:
+                pending.append(item)
+        self._append(pending)
+        self._maybe_compact()
+
+    @contextmanager
+    def _locked(self):
+        # A separate lock file, since compaction replaces the log file itself
+        with open(f"{self.path}.lock", 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            yield
+
+    @storage_latency.timed("history", "write")
+    def _append(self, entries):
+        if not entries:
+            return
+        payload = ''.join(json.dumps(entry) + '\n' for entry in entries).encode('utf-8')
+        with self._locked():
+            with open(self.path, 'ab') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+        self._lines += len(entries)
+
+    def _rewrite(self, entries):
+        with self._locked():
+            self._replace(entries)
+
+    @storage_latency.timed("history", "rewrite")
+    def _replace(self, entries):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(''.join(json.dumps(entry) + '\n' for entry in entries).encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        self._lines = len(entries)
+        self._last_compaction = time.monotonic()
+
+    def _maybe_compact(self):
+        overdue = time.monotonic() - self._last_compaction > HISTORY_COMPACT_INTERVAL
+        if self._lines <= 2 * self.keep and not (overdue and self._lines > self.keep):
+            return
+        with self._locked():
+            self._replace(self._read_tail(self.keep))
+
+    def _count_lines(self):
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, 'rb') as f:
+            return sum(1 for _ in f)
+
+    def close(self, timeout=2.0):
+        self.flush(timeout)
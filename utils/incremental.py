@@ -0,0 +1,191 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import ExitStack, contextmanager
+import numpy as np
+from utils.lazy import lazy_module
+from utils.numeric import NumericEngine
+
+linalg = lazy_module("scipy.linalg")
+
+ANALYSIS_SESSION_LIMIT = int(os.environ.get("ANALYSIS_SESSION_LIMIT", 64))
+ANALYSIS_SESSION_TTL = float(os.environ.get("ANALYSIS_SESSION_TTL", 1800))
+# Rank-one updates between full refactorizations, which bounds the rounding they accumulate
+ANALYSIS_SESSION_REFRESH = int(os.environ.get("ANALYSIS_SESSION_REFRESH", 50))
+# Matrix names hash onto this many edit locks, so the lock table stays bounded
+ANALYSIS_EDIT_STRIPES = 64
+# One rank-one update costs O(n^2) against O(n^3) for refactoring; an edit spanning more
+# than n / UPDATE_COST_RATIO rows (or columns) is refactored instead
+UPDATE_COST_RATIO = 8
+# Sherman-Morrison denominators this small relative to their terms mean the update lost the inverse
+SHERMAN_MORRISON_TOLERANCE = 1e-8
+# R diagonals within this factor of the usual rank tolerance are not trusted to show full rank
+RANK_MARGIN = 1e4
+
+class AnalysisSession:
+    # Server-side factorizations of one saved matrix: a full QR (for rank and determinant) and,
+    # while the matrix is invertible, its inverse. Edits are applied as rank-one updates.
+    def __init__(self, name, matrix):
+        self.name = name
+        self.lock = threading.Lock()
+        self.updates = 0
+        self.refactors = 0
+        self.touched = time.monotonic()
+        self.refactor(matrix)
+
+    def refactor(self, matrix):
+        A = np.array(NumericEngine.as_array(matrix), dtype=float)
+        self.A = A
+        self.Q, self.R = linalg.qr(A, check_finite=False)
+        # Givens rotations in qr_update have determinant 1, so det(Q) never changes between refactors
+        self.q_sign = float(np.sign(np.linalg.det(self.Q))) if A.shape[0] == A.shape[1] else None
+        self.inverse = None
+        if A.shape[0] == A.shape[1] and A.size:
+            self.inverse = NumericEngine.inverse_from_lu(*NumericEngine.lu(A))
+        self.updates = 0
+        self.refactors += 1
+
+    def update(self, matrix):
+        B = NumericEngine.as_array(matrix)
+        if B.shape != self.A.shape:
+            self.refactor(B)
+            return {"method": "refactor", "changed_entries": int(B.size), "rank_one_updates": 0}
+        changed = self.A != B
+        count = int(np.count_nonzero(changed))
+        if not count:
+            return {"method": "unchanged", "changed_entries": 0, "rank_one_updates": 0}
+        rows = np.flatnonzero(changed.any(axis=1))
+        columns = np.flatnonzero(changed.any(axis=0))
+        by_row = rows.size <= columns.size
+        lines = rows if by_row else columns
+        if (lines.size * UPDATE_COST_RATIO > max(min(B.shape), 1)
+                or self.updates + lines.size > ANALYSIS_SESSION_REFRESH):
+            self.refactor(B)
+            return {"method": "refactor", "changed_entries": count, "rank_one_updates": 0}
+        m, n = B.shape
+        for line in lines:
+            # A row edit is e_i (new_row - old_row)^T; a column edit is (new_col - old_col) e_j^T
+            if by_row:
+                u = np.zeros(m)
+                u[line] = 1.0
+                v = B[line] - self.A[line]
+            else:
+                u = B[:, line] - self.A[:, line]
+                v = np.zeros(n)
+                v[line] = 1.0
+            self.rank_one(u, v)
+        return {"method": "rank_one", "changed_entries": count, "rank_one_updates": int(lines.size)}
+
+    def rank_one(self, u, v):
+        self.A += np.outer(u, v)
+        self.Q, self.R = linalg.qr_update(self.Q, self.R, u, v, overwrite_qruv=True, check_finite=False)
+        if self.inverse is not None:
+            # Sherman-Morrison: inv(A + u v^T) = inv(A) - (inv(A) u)(v^T inv(A)) / (1 + v^T inv(A) u)
+            w = self.inverse @ u
+            z = v @ self.inverse
+            denominator = 1.0 + v @ w
+            if abs(denominator) <= SHERMAN_MORRISON_TOLERANCE * (1.0 + np.linalg.norm(v) * np.linalg.norm(w)):
+                self.inverse = None
+            else:
+                self.inverse -= np.outer(w / denominator, z)
+        self.updates += 1
+
+    def analysis(self, tol=None):
+        m, n = self.A.shape
+        diagonal = np.abs(np.diag(self.R))
+        margin = RANK_MARGIN * max(m, n) * np.finfo(float).eps * np.linalg.norm(self.R) if tol is None else float(tol)
+        # A triangular factor whose diagonal stays clear of zero has full rank, read off in O(n).
+        # Anything closer is settled by the singular values of a fresh R (the same as A's),
+        # so singular and nearly singular matrices pay the full cost
+        full = diagonal.size == min(m, n) and bool(np.all(diagonal > margin))
+        if full:
+            rank = min(m, n)
+        else:
+            if self.updates:
+                self.refactor(self.A)
+            rank = NumericEngine.rank(self.R, tol)
+            full = rank == min(m, n)
+        A, R = self.A, self.R
+        result = {"rank": int(rank), "nullity": int(n - rank), "full_rank": full}
+        if m == n:
+            result["det"] = float(self.q_sign * np.prod(np.diag(R))) if n else 1.0
+            if not full:
+                self.inverse = None
+                result["inverse"] = "Matrix is singular - no inverse exists"
+            else:
+                if self.inverse is None:
+                    # Invertible again after a singular stretch: rebuilt from the QR factors
+                    self.inverse = linalg.solve_triangular(R, self.Q.T, check_finite=False)
+                result["inverse"] = self.inverse.copy()
+            # The RREF of an invertible matrix is the identity
+            result["rref"] = np.eye(n) if full else NumericEngine.eliminate(A, tol)[0]
+        else:
+            result["rref"] = NumericEngine.eliminate(A, tol)[0]
+        return result
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "shape": list(self.A.shape),
+            "updates_since_refactor": self.updates,
+            "refactors": self.refactors
+        }
+
+
+class AnalysisSessions:
+    # Sessions live in this process; with several workers each keeps its own
+    def __init__(self, limit=ANALYSIS_SESSION_LIMIT, ttl=ANALYSIS_SESSION_TTL):
+        self.limit = limit
+        self.ttl = ttl
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._edit_locks = [threading.Lock() for _ in range(ANALYSIS_EDIT_STRIPES)]
+
+    @contextmanager
+    def editing(self, *names):
+        # Held across a stored-matrix write and its session refresh; stripes are taken in order
+        stripes = sorted({hash(name) % ANALYSIS_EDIT_STRIPES for name in names})
+        with ExitStack() as stack:
+            for stripe in stripes:
+                stack.enter_context(self._edit_locks[stripe])
+            yield
+
+    def open(self, name, matrix):
+        session = AnalysisSession(name, matrix)
+        with self._lock:
+            self._sessions[name] = session
+            self._sessions.move_to_end(name)
+            while len(self._sessions) > self.limit:
+                self._sessions.popitem(last=False)
+        return session
+
+    def get(self, name):
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(name)
+            if session is not None and now - session.touched > self.ttl:
+                del self._sessions[name]
+                session = None
+            if session is not None:
+                session.touched = now
+                self._sessions.move_to_end(name)
+            return session
+
+    def rename(self, old_name, new_name):
+        with self._lock:
+            session = self._sessions.pop(old_name, None)
+            if session is not None:
+                session.name = new_name
+                self._sessions[new_name] = session
+            return session
+
+    def close(self, name):
+        with self._lock:
+            return self._sessions.pop(name, None) is not None
+
+    def stats(self):
+        with self._lock:
+            return {"sessions": [session.stats() for session in self._sessions.values()], "limit": self.limit}
+
+analysis_sessions = AnalysisSessions()
@@ -0,0 +1,195 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from utils.results import ResultEncoder
+
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 2))
+JOB_MAX_PENDING = int(os.environ.get("JOB_MAX_PENDING", 100))
+JOB_RESULT_TTL = float(os.environ.get("JOB_RESULT_TTL", 3600))
+JOB_RESULT_BYTES = int(os.environ.get("JOB_RESULT_BYTES", 64 * 1024 * 1024))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = frozenset([SUCCEEDED, FAILED, CANCELLED])
+
+class JobCancelled(Exception):
+    pass
+
+class JobQueueFull(Exception):
+    pass
+
+class Job:
+    def __init__(self, kind, params):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.status = QUEUED
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self.nbytes = 0
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def report(self, progress):
+        # Called from inside long computations; doubles as the cancellation checkpoint
+        if self._cancel.is_set():
+            raise JobCancelled(f"Job {self.id} was cancelled")
+        self.progress = min(max(float(progress), self.progress), 1.0)
+
+    def to_dict(self):
+        job = {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": round(self.progress, 4),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+        if self.cancelled and self.status not in FINISHED:
+            job["cancel_requested"] = True
+        if self.status == SUCCEEDED:
+            job["result"] = self.result
+        elif self.status == FAILED:
+            job["error"] = self.error
+        return job
+
+class JobQueue:
+    def __init__(self, executor=None, max_pending=JOB_MAX_PENDING, ttl=JOB_RESULT_TTL, max_bytes=JOB_RESULT_BYTES):
+        # Any concurrent.futures-style executor works; threads are the default
+        self.executor = executor or ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job")
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.handlers = {}
+        self.counters = {"submitted": 0, "succeeded": 0, "failed": 0, "cancelled": 0, "evicted": 0, "expired": 0}
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, kind, handler):
+        self.handlers[kind] = handler
+
+    def submit(self, kind, params):
+        if kind not in self.handlers:
+            raise ValueError(f"Unsupported job kind: {kind}")
+        job = Job(kind, params)
+        with self._lock:
+            self._prune()
+            pending = sum(1 for j in self._jobs.values() if j.status not in FINISHED)
+            if pending >= self.max_pending:
+                raise JobQueueFull(f"Job queue is full ({self.max_pending} pending jobs)")
+            self._jobs[job.id] = job
+            self.counters["submitted"] += 1
+        job.future = self.executor.submit(self._execute, job)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            self._prune()
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status in FINISHED:
+                return job
+            job._cancel.set()
+            if job.status == QUEUED:
+                if job.future is not None:
+                    job.future.cancel()
+                self._finish(job, CANCELLED)
+        return job
+
+    def _execute(self, job):
+        with self._lock:
+            if job.cancelled or job.status != QUEUED:
+                return
+            job.status = RUNNING
+            job.started_at = time.time()
+        try:
+            result = self.handlers[job.kind](job.params, job)
+        except Exception as e:
+            # Solvers re-wrap exceptions, so a JobCancelled may arrive disguised
+            with self._lock:
+                if job.cancelled:
+                    self._finish(job, CANCELLED)
+                else:
+                    job.error = str(e)
+                    self._finish(job, FAILED)
+            return
+
+        nbytes = len(ResultEncoder.dumps(result, fallback=str))
+        with self._lock:
+            if job.cancelled:
+                self._finish(job, CANCELLED)
+                return
+            job.result = result
+            job.progress = 1.0
+            job.nbytes = nbytes
+            self.bytes += nbytes
+            self._finish(job, SUCCEEDED)
+            self._prune()
+
+    def _finish(self, job, status):
+        job.status = status
+        job.finished_at = time.time()
+        self.counters[status] += 1
+
+    def _prune(self):
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            if job.status in FINISHED and now - job.finished_at > self.ttl:
+                self._drop(job_id)
+                self.counters["expired"] += 1
+        # Oldest finished results go first when the memory budget is exceeded
+        for job_id, job in list(self._jobs.items()):
+            if self.bytes <= self.max_bytes:
+                break
+            if job.status in FINISHED:
+                self._drop(job_id)
+                self.counters["evicted"] += 1
+
+    def _drop(self, job_id):
+        job = self._jobs.pop(job_id)
+        self.bytes -= job.nbytes
+
+    def shutdown(self):
+        with self._lock:
+            for job in self._jobs.values():
+                if job.status not in FINISHED:
+                    job._cancel.set()
+        self.executor.shutdown(wait=False)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            by_status = {}
+            for job in self._jobs.values():
+                by_status[job.status] = by_status.get(job.status, 0) + 1
+            stats.update({
+                "retained": len(self._jobs),
+                "by_status": by_status,
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl
+            })
+        return stats
+
+job_queue = JobQueue()
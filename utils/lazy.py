@@ -0,0 +1,74 @@
+import importlib
+import os
+import sys
+import threading
+import time
+
+# The math stacks that dominate worker boot; they load on first use instead
+HEAVY_MODULES = ("sympy", "scipy.linalg", "scipy.sparse", "scipy.sparse.linalg", "scipy.integrate")
+MATH_PRELOAD = os.environ.get("MATH_PRELOAD", "1") != "0"
+BOOT_TIME_BUDGET = float(os.environ.get("BOOT_TIME_BUDGET", 1.0))
+
+import_times = {}
+_preload = {"thread": None, "started_at": None, "finished_at": None, "error": None}
+_preload_lock = threading.Lock()
+
+def load(name):
+    # Always through importlib: a module another thread is still importing sits in
+    # sys.modules half-initialized, and import_module waits for it to finish
+    loaded = name in sys.modules
+    started = time.perf_counter()
+    module = importlib.import_module(name)
+    if not loaded:
+        import_times.setdefault(name, time.perf_counter() - started)
+    return module
+
+class LazyModule:
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def __getattr__(self, attribute):
+        module = self._module
+        if module is None:
+            module = load(self._name)
+            self.__dict__["_module"] = module
+        return getattr(module, attribute)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+def lazy_module(name):
+    return LazyModule(name)
+
+def preload(modules=HEAVY_MODULES):
+    for name in modules:
+        load(name)
+
+def start_preload(modules=HEAVY_MODULES):
+    # Idempotent; meant to run once the worker is already answering requests
+    with _preload_lock:
+        if _preload["thread"] is not None:
+            return False
+        _preload["started_at"] = time.time()
+
+        def run():
+            try:
+                preload(modules)
+            except Exception as e:
+                _preload["error"] = str(e)
+            _preload["finished_at"] = time.time()
+
+        _preload["thread"] = threading.Thread(target=run, name="math-preload", daemon=True)
+        _preload["thread"].start()
+    return True
+
+def import_report(boot_seconds=None):
+    return {
+        "boot_seconds": boot_seconds,
+        "boot_budget_seconds": BOOT_TIME_BUDGET,
+        "heavy_modules_loaded": [name for name in HEAVY_MODULES if name in sys.modules],
+        "lazy_import_seconds": dict(import_times),
+        "preload": {key: value for key, value in _preload.items() if key != "thread"}
+    }
@@ -0,0 +1,177 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (2, 3, 4, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+EVALUATION_BUCKETS = (10, 100, 1000, 10000, 100000, 1000000)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def format_labels(names, values, extra=None):
+    pairs = [f'{name}="{escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, description, labels=()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        return [(self.name, format_labels(self.labels, key), value) for key, value in sorted(values.items())]
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, description, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        # Only the bucket index is found outside the lock; cumulative counts are built at render time
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, *labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def timed(self, *labels):
+        def decorator(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.time(*labels):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def samples(self):
+        with self._lock:
+            series = {key: (list(counts), total) for key, (counts, total) in self._series.items()}
+        samples = []
+        for key, (counts, total) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + format_value(bound) + '"'
+                samples.append((f"{self.name}_bucket", format_labels(self.labels, key, le), cumulative))
+            samples.append((f"{self.name}_sum", format_labels(self.labels, key), total))
+            samples.append((f"{self.name}_count", format_labels(self.labels, key), cumulative))
+        return samples
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, description, labels=()):
+        metric = Counter(name, description, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, description, labels=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(name, description, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, function):
+        # Called at scrape time; returns (name, description, {label: value} or None, value) gauges
+        self._collectors.append(function)
+        return function
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {format_value(value)}")
+        described = set()
+        for collect in self._collectors:
+            for name, description, labels, value in collect():
+                if name not in described:
+                    lines.append(f"# HELP {name} {description}")
+                    lines.append(f"# TYPE {name} gauge")
+                    described.add(name)
+                labels = labels or {}
+                lines.append(f"{name}{format_labels(labels.keys(), labels.values())} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+# Each server process keeps its own registry; scrape every worker (or aggregate) under gunicorn
+metrics = MetricsRegistry()
+
+http_requests = metrics.counter(
+    "matrixlab_http_requests_total", "HTTP requests by route, method and status code", ("route", "method", "status"))
+http_latency = metrics.histogram(
+    "matrixlab_http_request_duration_seconds", "Time from request arrival to response headers", ("route", "method"))
+http_errors = metrics.counter(
+    "matrixlab_http_errors_total", "Requests answered with an error status or success=false", ("route",))
+phase_latency = metrics.histogram(
+    "matrixlab_request_phase_seconds", "Time spent decoding request bodies, computing and encoding responses",
+    ("phase",))
+operation_latency = metrics.histogram(
+    "matrixlab_operation_duration_seconds", "Compute time per matrix or ODE operation", ("operation",))
+operation_engines = metrics.counter(
+    "matrixlab_operations_total", "Completed operations by the engine that ran them", ("operation", "engine"))
+operation_errors = metrics.counter(
+    "matrixlab_operation_errors_total", "Operations that raised an error", ("operation",))
+matrix_sizes = metrics.histogram(
+    "matrixlab_matrix_size", "Largest dimension of each input matrix", ("operation",), SIZE_BUCKETS)
+ode_evaluations = metrics.histogram(
+    "matrixlab_ode_function_evaluations", "Right-hand side evaluations (nfev) per integration", ("method",),
+    EVALUATION_BUCKETS)
+coalesced_requests = metrics.counter(
+    "matrixlab_coalesced_requests_total", "Requests answered by an identical in-flight computation",
+    ("kind", "scope"))
+storage_latency = metrics.histogram(
+    "matrixlab_storage_duration_seconds", "Latency of matrix store and history log I/O", ("store", "operation"))
+
+@contextmanager
+def track_operation(operation, size=None):
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        operation_errors.inc(operation)
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        operation_latency.observe(elapsed, operation)
+        phase_latency.observe(elapsed, "compute")
+        if size:
+            matrix_sizes.observe(size, operation)
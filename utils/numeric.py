@@ -0,0 +1,192 @@
+import warnings
+import numpy as np
+from utils.lazy import lazy_module
+
+linalg = lazy_module("scipy.linalg")
+lapack = lazy_module("scipy.linalg.lapack")
+
+AUTO_NUMERIC_SIZE = 20
+
+class NumericEngine:
+    @staticmethod
+    def as_array(matrix):
+        A = np.array(matrix, dtype=float)
+        if A.ndim == 1:
+            # sp.Matrix treats a flat list as a column vector
+            A = A.reshape(-1, 1)
+        if A.ndim != 2:
+            raise ValueError("Matrix must be two-dimensional")
+        return A
+
+    @staticmethod
+    def prefers_numeric(matrix):
+        A = np.asarray(matrix)
+        if A.dtype.kind not in "iubf":
+            return False
+        if A.ndim == 2 and max(A.shape) > AUTO_NUMERIC_SIZE:
+            return True
+        if A.dtype.kind == "f":
+            finite = np.isfinite(A)
+            return not finite.all() or not np.all(A[finite] == np.round(A[finite]))
+        return False
+
+    @staticmethod
+    def elimination_tolerance(A, tol=None):
+        if tol is not None:
+            return float(tol)
+        if A.size == 0:
+            return 0.0
+        return max(A.shape) * np.finfo(float).eps * np.linalg.norm(A, np.inf)
+
+    @staticmethod
+    def eliminate(matrix, tol=None, reduced=True):
+        R = NumericEngine.as_array(matrix)
+        m, n = R.shape
+        tol = NumericEngine.elimination_tolerance(R, tol)
+        pivots = []
+        row = 0
+        for col in range(n):
+            if row >= m:
+                break
+            p = row + int(np.argmax(np.abs(R[row:, col])))
+            if abs(R[p, col]) <= tol:
+                R[row:, col] = 0.0
+                continue
+            if p != row:
+                R[[row, p]] = R[[p, row]]
+            if reduced:
+                R[row] /= R[row, col]
+                others = np.arange(m) != row
+                R[others] -= np.outer(R[others, col], R[row])
+                R[others, col] = 0.0
+            else:
+                R[row + 1:] -= np.outer(R[row + 1:, col] / R[row, col], R[row])
+                R[row + 1:, col] = 0.0
+            pivots.append(col)
+            row += 1
+        return R, pivots
+
+    @staticmethod
+    def singular_values(matrix):
+        A = NumericEngine.as_array(matrix)
+        if A.size == 0:
+            return np.zeros(0)
+        return linalg.svd(A, compute_uv=False, check_finite=False)
+
+    @staticmethod
+    def rank(matrix, tol=None):
+        A = NumericEngine.as_array(matrix)
+        return NumericEngine.rank_from_singular_values(NumericEngine.singular_values(A), A.shape, tol)
+
+    @staticmethod
+    def rank_from_singular_values(s, shape, tol=None):
+        if s.size == 0:
+            return 0
+        if tol is None:
+            tol = s[0] * max(shape) * np.finfo(float).eps
+        return int(np.count_nonzero(s > float(tol)))
+
+    @staticmethod
+    def lu(matrix):
+        A = NumericEngine.as_array(matrix)
+        if A.shape[0] != A.shape[1]:
+            raise ValueError("Matrix must be square for LU factorization")
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", linalg.LinAlgWarning)
+            lu, piv = linalg.lu_factor(A, check_finite=False)
+        return A, lu, piv
+
+    @staticmethod
+    def det(matrix):
+        A, lu, piv = NumericEngine.lu(matrix)
+        return NumericEngine.det_from_lu(lu, piv)
+
+    @staticmethod
+    def det_from_lu(lu, piv):
+        if lu.size == 0:
+            return 1.0
+        sign = -1.0 if np.count_nonzero(piv != np.arange(piv.size)) % 2 else 1.0
+        return float(sign * np.prod(np.diag(lu)))
+
+    @staticmethod
+    def inverse(matrix, tol=None):
+        A, lu, piv = NumericEngine.lu(matrix)
+        return NumericEngine.inverse_from_lu(A, lu, piv, tol)
+
+    @staticmethod
+    def inverse_from_lu(A, lu, piv, tol=None):
+        n = A.shape[0]
+        if n == 0:
+            return np.zeros((0, 0))
+        if NumericEngine.rcond_from_lu(A, lu) <= NumericEngine.rcond_threshold(n, tol):
+            return None
+        return linalg.lu_solve((lu, piv), np.eye(n), check_finite=False)
+
+    @staticmethod
+    def rcond_threshold(n, tol=None):
+        return float(tol) if tol is not None else n * np.finfo(float).eps
+
+    @staticmethod
+    def rcond_from_lu(A, lu):
+        if not np.all(np.diag(lu) != 0):
+            return 0.0
+        rcond, _ = lapack.dgecon(lu, np.linalg.norm(A, 1), norm="1")
+        return float(rcond)
+
+    @staticmethod
+    def cholesky(matrix):
+        A = NumericEngine.as_array(matrix)
+        n = A.shape[0]
+        if n == 0 or A.shape[1] != n or np.any(np.diag(A) <= 0):
+            return None
+        if np.abs(A - A.T).max() > n * np.finfo(float).eps * np.abs(A).max():
+            return None
+        # Positive definiteness is decided by whether the factorization succeeds
+        try:
+            return linalg.cho_factor(A, lower=False, check_finite=False)
+        except linalg.LinAlgError:
+            return None
+
+    @staticmethod
+    def rcond_from_cholesky(A, c):
+        rcond, _ = lapack.dpocon(c, np.linalg.norm(A, 1))
+        return float(rcond)
+
+    @staticmethod
+    def structure(A):
+        # Works on one matrix or a stack; a stack gets the structure all of its members share
+        n = A.shape[-1]
+        if A.ndim < 2 or A.shape[-2] != n:
+            return "rectangular"
+        if n == 0:
+            return "diagonal"
+        index = np.arange(n)
+        off_diagonal = A.copy()
+        off_diagonal[..., index, index] = 0.0
+        if not off_diagonal.any():
+            return "diagonal"
+        if not np.tril(A, -1).any():
+            return "upper_triangular"
+        if not np.triu(A, 1).any():
+            return "lower_triangular"
+        if np.abs(A - np.swapaxes(A, -1, -2)).max() <= n * np.finfo(float).eps * np.abs(A).max():
+            return "symmetric"
+        return "general"
+
+    @staticmethod
+    def triangular_eig(A, lower=False):
+        # None when diagonal entries repeat: the matrix may be defective, so LAPACK decides
+        if lower:
+            result = NumericEngine.triangular_eig(np.ascontiguousarray(A[::-1, ::-1]))
+            return None if result is None else (result[0][::-1], result[1][::-1, ::-1])
+        values = np.diag(A).copy()
+        n = values.size
+        gaps = np.abs(np.subtract.outer(values, values))
+        np.fill_diagonal(gaps, np.inf)
+        if n > 1 and gaps.min() <= n * np.finfo(float).eps * max(np.abs(values).max(), 1.0):
+            return None
+        # Back substitution for every eigenvector at once, one row at a time; vector k has a 1 in row k
+        vectors = np.eye(n)
+        for i in range(n - 2, -1, -1):
+            vectors[i, i + 1:] = (A[i, i + 1:] @ vectors[i + 1:, i + 1:]) / (values[i + 1:] - values[i])
+        return values, vectors / np.linalg.norm(vectors, axis=0)
@@ -0,0 +1,801 @@
+import ast
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+import numpy as np
+from utils.lazy import lazy_module
+from utils.algebra import MatrixAlgebra
+from utils.metrics import ode_evaluations
+
+sp = lazy_module("sympy")
+sps = lazy_module("scipy.sparse")
+integrate = lazy_module("scipy.integrate")
+
+FUNCTIONS = {
+    "sin": np.sin, "cos": np.cos, "tan": np.tan,
+    "asin": np.arcsin, "acos": np.arccos, "atan": np.arctan,
+    "sinh": np.sinh, "cosh": np.cosh, "tanh": np.tanh,
+    "exp": np.exp, "log": np.log, "ln": np.log, "log10": np.log10,
+    "sqrt": np.sqrt, "abs": np.abs, "sign": np.sign,
+    "max": np.maximum, "min": np.minimum
+}
+CONSTANTS = {"pi": np.pi, "e": np.e}
+
+@lru_cache(maxsize=None)
+def sympy_namespace():
+    # Built on first use so importing this module does not load SymPy
+    return {
+        "sin": sp.sin, "cos": sp.cos, "tan": sp.tan,
+        "asin": sp.asin, "acos": sp.acos, "atan": sp.atan,
+        "sinh": sp.sinh, "cosh": sp.cosh, "tanh": sp.tanh,
+        "exp": sp.exp, "log": sp.log, "ln": sp.log, "log10": lambda v: sp.log(v, 10),
+        "sqrt": sp.sqrt, "abs": sp.Abs, "sign": sp.sign,
+        "max": sp.Max, "min": sp.Min,
+        "pi": sp.pi, "e": sp.E
+    }
+
+EXPLICIT_METHODS = ("RK45", "RK23", "DOP853")
+IMPLICIT_METHODS = ("Radau", "BDF", "LSODA")
+METHODS = ("auto",) + EXPLICIT_METHODS + IMPLICIT_METHODS
+# Closed-form evaluation of constant-coefficient linear systems; chosen by auto when it applies
+LINEAR_METHOD = "expm"
+# Span times the fastest decay rate; beyond this explicit steppers are step-size bound
+STIFFNESS_THRESHOLD = 500.0
+LARGE_SYSTEM_SIZE = 10
+# Right-hand side evaluations an auto-selected explicit method may spend before switching
+EXPLICIT_EVALUATION_BUDGET = 20000
+STREAM_CHUNK_SIZE = 500
+SWEEP_MAX_MEMBERS = int(os.environ.get("SWEEP_MAX_MEMBERS", 1000))
+SWEEP_WORKERS = int(os.environ.get("SWEEP_WORKERS", os.cpu_count() or 2))
+SWEEP_MODES = ("grid", "zip")
+
+SUPERSCRIPTS = {"²": "2", "³": "3", "⁴": "4", "⁵": "5", "⁶": "6", "⁷": "7", "⁸": "8", "⁹": "9"}
+LEIBNIZ_PATTERN = re.compile(r"d\^?(\d+)y/dx\^?\1")
+PRIME_PATTERN = re.compile(r"y('+)")
+POWER_PATTERN = re.compile(r"y\^\((\d+)\)")
+SYSTEM_LHS_PATTERN = re.compile(r"^(?:d([A-Za-z_]\w*)/d([A-Za-z_]\w*)|([A-Za-z_]\w*)')$")
+CONDITION_PATTERN = re.compile(r"([A-Za-z_]\w*)('*)\(([^)]*)\)=([^,;]+)")
+
+TOKEN_PATTERN = re.compile(
+    r"(\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)|([A-Za-z_]\w*)|(\*\*|[-+*/^(),%])"
+)
+
+ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Load, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.Mod, ast.USub, ast.UAdd
+)
+
+class ExpressionCompiler:
+    @staticmethod
+    def tokenize(expression):
+        tokens = []
+        position = 0
+        text = expression.strip()
+        while position < len(text):
+            if text[position].isspace():
+                position += 1
+                continue
+            match = TOKEN_PATTERN.match(text, position)
+            if not match:
+                raise ValueError(f"Unexpected character '{text[position]}' in expression: {expression}")
+            number, name, symbol = match.groups()
+            if number is not None:
+                tokens.append(("number", number))
+            elif name is not None:
+                tokens.append(("name", name))
+            else:
+                tokens.append(("symbol", "**" if symbol == "^" else symbol))
+            position = match.end()
+        return tokens
+
+    @staticmethod
+    def normalize(expression):
+        source = []
+        previous = None
+        for kind, value in ExpressionCompiler.tokenize(expression):
+            # Implicit multiplication: 2y, 3(x+1), (x+1)(x-1), x y
+            starts_operand = kind in ("number", "name") or value == "("
+            ends_operand = previous is not None and (
+                previous[0] == "number" or previous[1] == ")" or
+                (previous[0] == "name" and not (value == "(" and previous[1] in FUNCTIONS))
+            )
+            if starts_operand and ends_operand:
+                source.append("*")
+            source.append(value)
+            previous = (kind, value)
+        if not source:
+            raise ValueError("Expression is empty")
+        return "".join(source)
+
+    @staticmethod
+    def validate(source, variables):
+        try:
+            tree = ast.parse(source, mode="eval")
+        except SyntaxError:
+            raise ValueError(f"Could not parse expression: {source}")
+        for node in ast.walk(tree):
+            if not isinstance(node, ALLOWED_NODES):
+                raise ValueError(f"Unsupported syntax in expression: {source}")
+            if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+                raise ValueError(f"Unsupported constant in expression: {source}")
+            if isinstance(node, ast.Call):
+                if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords:
+                    raise ValueError(f"Unsupported function call in expression: {source}")
+            if isinstance(node, ast.Name) and node.id not in variables \
+                    and node.id not in FUNCTIONS and node.id not in CONSTANTS:
+                raise ValueError(f"Unknown name '{node.id}' in expression: {source}")
+        return tree
+
+    @staticmethod
+    def compile(expression, variables=("x", "y")):
+        return _compile_normalized(re.sub(r"\s+", "", expression), tuple(variables))
+
+    @staticmethod
+    def cache_info():
+        return _compile_normalized.cache_info()
+
+@lru_cache(maxsize=256)
+def _compile_normalized(expression, variables):
+    source = ExpressionCompiler.normalize(expression)
+    tree = ExpressionCompiler.validate(source, variables)
+    arguments = ast.arguments(
+        posonlyargs=[], args=[ast.arg(arg=v) for v in variables], vararg=None,
+        kwonlyargs=[], kw_defaults=[], kwarg=None, defaults=[]
+    )
+    function = ast.fix_missing_locations(ast.Expression(body=ast.Lambda(args=arguments, body=tree.body)))
+    namespace = {"__builtins__": {}}
+    namespace.update(FUNCTIONS)
+    namespace.update(CONSTANTS)
+    return eval(compile(function, "<ode>", "eval"), namespace)
+
+
+class OdeSystem:
+    def __init__(self, independent, symbols, labels, expressions, equation):
+        self.independent = independent
+        self.symbols = symbols
+        self.labels = labels
+        self.expressions = expressions
+        self.equation = equation
+        self.size = len(expressions)
+        t = sp.Symbol(independent)
+        state = [sp.Symbol(name) for name in symbols]
+        self._rhs = sp.lambdify([t] + state, expressions, modules="numpy")
+        self._jacobian = sp.lambdify([t] + state, sp.Matrix(expressions).jacobian(state), modules="numpy")
+        self._linear = None
+
+    def fun(self, t, y):
+        values = self._rhs(t, *y)
+        return np.array([np.broadcast_to(v, np.shape(y[0])) for v in values], dtype=float)
+
+    def jac(self, t, y):
+        return np.array(self._jacobian(t, *y), dtype=float)
+
+    def linear_form(self):
+        # (A, b) when the system is x' = A x + b with constant A and b, otherwise None
+        if self._linear is None:
+            self._linear = (self._linear_form(),)
+        return self._linear[0]
+
+    def _linear_form(self):
+        state = [sp.Symbol(name) for name in self.symbols]
+        J = sp.Matrix(self.expressions).jacobian(state)
+        b = [expression.subs({symbol: 0 for symbol in state}) for expression in self.expressions]
+        # Any remaining symbol is a state variable (nonlinear) or the independent variable (time-varying)
+        if any(entry.free_symbols for entry in J) or any(value.free_symbols for value in b):
+            return None
+        try:
+            A = np.array(J.evalf().tolist(), dtype=float)
+            b = np.array([value.evalf() for value in b], dtype=float)
+        except TypeError:
+            return None
+        if not (np.isfinite(A).all() and np.isfinite(b).all()):
+            return None
+        return A, b
+
+    @staticmethod
+    def parse_expression(text, variables):
+        source = ExpressionCompiler.normalize(text)
+        ExpressionCompiler.validate(source, variables)
+        namespace = {name: sp.Symbol(name) for name in variables}
+        namespace.update(sympy_namespace())
+        # The AST has been whitelisted, so sympify only sees arithmetic and known names
+        return sp.sympify(source, locals=namespace)
+
+    @staticmethod
+    def higher_order(equation):
+        return _compile_higher_order(re.sub(r"\s+", "", equation))
+
+    @staticmethod
+    def first_order_system(equations):
+        if isinstance(equations, str):
+            equations = re.split(r"[;\n]", equations)
+        return _compile_first_order_system(tuple(" ".join(e.split()) for e in equations if e.strip()))
+
+    @staticmethod
+    def parse_conditions(conditions):
+        values = {}
+        for name, primes, _, value in CONDITION_PATTERN.findall(re.sub(r"\s+", "", conditions)):
+            try:
+                values[(name, len(primes))] = float(value)
+            except ValueError:
+                raise ValueError(f"Invalid initial condition value: {name}{primes}(...)={value}")
+        if not values:
+            raise ValueError("Invalid initial condition format. Use: y(x0)=y0, y'(x0)=y1")
+        return values
+
+@lru_cache(maxsize=128)
+def _compile_higher_order(equation):
+    text = equation
+    for superscript, digit in SUPERSCRIPTS.items():
+        text = text.replace(superscript, digit)
+    text = text.replace("dy/dx", "y_1")
+    text = LEIBNIZ_PATTERN.sub(lambda m: f"y_{int(m.group(1))}", text)
+    text = POWER_PATTERN.sub(lambda m: f"y_{int(m.group(1))}", text)
+    text = PRIME_PATTERN.sub(lambda m: f"y_{len(m.group(1))}", text)
+    sides = text.split("=")
+    if len(sides) != 2:
+        raise ValueError("Equation must contain exactly one '='")
+    orders = [int(k) for k in re.findall(r"\by_(\d+)\b", text)]
+    if not orders:
+        raise ValueError("No derivative of y found. Use y', y'', ... or dy/dx, d²y/dx², ...")
+    order = max(orders)
+    variables = ["x", "y"] + [f"y_{k}" for k in range(1, order + 1)]
+    lhs = OdeSystem.parse_expression(sides[0], variables)
+    rhs = OdeSystem.parse_expression(sides[1], variables)
+    highest = sp.Symbol(f"y_{order}")
+    solutions = sp.solve(sp.Eq(lhs, rhs), highest)
+    if not solutions:
+        raise ValueError(f"Could not solve the equation for the order-{order} derivative")
+    symbols = ["y"] + [f"y_{k}" for k in range(1, order)]
+    labels = ["y", "dy"] + [f"d{k}y" for k in range(2, order)]
+    expressions = [sp.Symbol(name) for name in symbols[1:]] + [solutions[0]]
+    return OdeSystem("x", symbols, labels[:order], expressions, equation)
+
+@lru_cache(maxsize=128)
+def _compile_first_order_system(equations):
+    if not equations:
+        raise ValueError("At least one equation is required")
+    names, independents, sources = [], set(), []
+    for equation in equations:
+        sides = equation.split("=")
+        if len(sides) != 2:
+            raise ValueError(f"Equation must contain exactly one '=': {equation}")
+        match = SYSTEM_LHS_PATTERN.match(sides[0].replace(" ", ""))
+        if not match:
+            raise ValueError(f"Left-hand side must be x' or dx/dt: {equation}")
+        name = match.group(1) or match.group(3)
+        independents.add(match.group(2) or "t")
+        if name in names:
+            raise ValueError(f"Variable '{name}' has more than one equation")
+        names.append(name)
+        sources.append(sides[1])
+    if len(independents) != 1:
+        raise ValueError("All equations must use the same independent variable")
+    independent = independents.pop()
+    if independent in names:
+        raise ValueError(f"'{independent}' cannot be both the independent and a dependent variable")
+    variables = [independent] + names
+    expressions = [OdeSystem.parse_expression(source, variables) for source in sources]
+    return OdeSystem(independent, names, list(names), expressions, "; ".join(equations))
+
+class StiffnessDetected(Exception):
+    pass
+
+class OdeSolver:
+    @staticmethod
+    def select_method(jacobian, span, size=1, method="auto"):
+        if method not in METHODS:
+            raise ValueError(f"Unsupported method: {method}. Use one of: {', '.join(METHODS)}")
+        if method != "auto":
+            return method, None
+        try:
+            if sps.issparse(jacobian) and (jacobian - sps.diags(jacobian.diagonal())).count_nonzero() == 0:
+                # Stacked sweeps pass a diagonal Jacobian; its eigenvalues are the diagonal
+                eigenvalues = jacobian.diagonal()
+            else:
+                jacobian = jacobian.toarray() if sps.issparse(jacobian) else jacobian
+                eigenvalues = np.linalg.eigvals(np.atleast_2d(jacobian))
+            stiffness = float(max(0.0, -eigenvalues.real.min()) * span)
+        except (np.linalg.LinAlgError, ValueError):
+            return "LSODA", None
+        if not np.isfinite(stiffness):
+            return "LSODA", None
+        if stiffness > STIFFNESS_THRESHOLD:
+            return ("BDF" if size > LARGE_SYSTEM_SIZE else "Radau"), stiffness
+        return "RK45", stiffness
+
+    @staticmethod
+    def estimate_jacobian(fun, t, y):
+        y = np.asarray(y, dtype=float)
+        h = np.sqrt(np.finfo(float).eps) * np.maximum(1.0, np.abs(y))
+        columns = y[:, np.newaxis] + np.diag(h)
+        f0 = fun(t, y[:, np.newaxis])
+        return (fun(t, columns) - f0) / h
+
+    @staticmethod
+    def budgeted(fun, budget):
+        calls = [0]
+
+        def wrapped(t, y):
+            calls[0] += 1
+            if calls[0] > budget:
+                raise StiffnessDetected()
+            return fun(t, y)
+        return wrapped
+
+    @staticmethod
+    def monitored(fun, start, end, monitor):
+        span = end - start
+
+        def wrapped(t, y):
+            monitor((t - start) / span)
+            return fun(t, y)
+        return wrapped
+
+    @staticmethod
+    def grid_size(start, end, step):
+        return int(np.ceil((end - start) / step + 0.5))
+
+    @staticmethod
+    def grid(start, end, step, first=0, stop=None):
+        # Points of the output grid by index, so streams never materialize the whole range
+        stop = OdeSolver.grid_size(start, end, step) if stop is None else stop
+        return np.minimum(start + np.arange(first, stop) * step, end)
+
+    @staticmethod
+    def stream(fun, start, end, step, y0, method="auto", rtol=1e-3, atol=1e-6, jac=None,
+               chunk_size=STREAM_CHUNK_SIZE, linear=None):
+        if linear is not None:
+            return LinearStream(linear, start, end, step, y0, chunk_size)
+        return OdeStream(fun, start, end, step, y0, method, rtol, atol, jac, chunk_size)
+
+    @staticmethod
+    def linear(linear, start, end, step, y0):
+        # x(t) = expm(A (t - start)) x0 on the whole output grid, without stepping
+        A, b = linear
+        t = OdeSolver.grid(start, end, step)
+        flow = MatrixAlgebra.linear_flow(A, y0, t, start, b)
+        return t, flow["states"], flow["method"]
+
+    @staticmethod
+    def integrate(fun, start, end, step, y0, method="auto", rtol=1e-3, atol=1e-6, jac=None, monitor=None):
+        y0 = np.asarray(y0, dtype=float)
+        if monitor is not None:
+            # Reports progress through the span; the monitor may raise to abort the integration
+            fun = OdeSolver.monitored(fun, start, end, monitor)
+        automatic = method == "auto"
+        if automatic or method not in METHODS:
+            J = jac(start, y0) if jac else OdeSolver.estimate_jacobian(fun, start, y0)
+            method, stiffness = OdeSolver.select_method(J, end - start, y0.size, method)
+        else:
+            stiffness = None
+        options = {"t_eval": OdeSolver.grid(start, end, step), "rtol": float(rtol), "atol": float(atol), "vectorized": True}
+
+        if automatic and method in EXPLICIT_METHODS:
+            # Stiffness that only develops after t0 shows up as a step-size collapse
+            try:
+                solution = integrate.solve_ivp(OdeSolver.budgeted(fun, EXPLICIT_EVALUATION_BUDGET),
+                                     [start, end], y0, method=method, **options)
+                if solution.success:
+                    return solution, method, stiffness
+            except StiffnessDetected:
+                pass
+            method = "BDF" if y0.size > LARGE_SYSTEM_SIZE else "Radau"
+
+        if jac is not None and method in IMPLICIT_METHODS:
+            options["jac"] = jac
+        solution = integrate.solve_ivp(fun, [start, end], y0, method=method, **options)
+        if not solution.success:
+            raise ValueError(f"Integration failed: {solution.message}")
+        return solution, method, stiffness
+
+class OdeStream:
+    def __init__(self, fun, start, end, step, y0, method, rtol, atol, jac, chunk_size):
+        self.fun = fun
+        self.jac = jac
+        self.start = start
+        self.end = end
+        self.step = step
+        self.y0 = np.asarray(y0, dtype=float)
+        self.rtol = float(rtol)
+        self.atol = float(atol)
+        self.chunk_size = max(1, int(chunk_size))
+        self.automatic = method == "auto"
+        if self.automatic or method not in METHODS:
+            J = jac(start, self.y0) if jac else OdeSolver.estimate_jacobian(fun, start, self.y0)
+            method, self.stiffness = OdeSolver.select_method(J, end - start, self.y0.size, method)
+        else:
+            self.stiffness = None
+        self.method = method
+        self.points = OdeSolver.grid_size(start, end, step)
+
+    def solver(self, method, t0, y0):
+        options = {"rtol": self.rtol, "atol": self.atol, "vectorized": True}
+        if self.jac is not None and method in IMPLICIT_METHODS:
+            options["jac"] = self.jac
+        # Method names match the solver classes in scipy.integrate
+        return getattr(integrate, method)(self.fun, t0, y0, self.end, **options)
+
+    def __iter__(self):
+        # Steps the solver directly and samples each step's dense output, so memory
+        # holds one chunk of grid points no matter how long the range is
+        solver = self.solver(self.method, self.start, self.y0)
+        blocks, buffered, index = [(np.array([self.start]), self.y0[:, np.newaxis])], 1, 1
+        while index < self.points:
+            message = solver.step()
+            if solver.status == "failed":
+                raise ValueError(f"Integration failed: {message}")
+            dense = solver.dense_output()
+            if solver.status == "finished":
+                reached = self.points
+            else:
+                reached = min(self.points, int(np.floor((solver.t - self.start) / self.step)) + 1)
+                if (self.automatic and self.method in EXPLICIT_METHODS
+                        and solver.nfev > EXPLICIT_EVALUATION_BUDGET):
+                    # Same late-stiffness fallback as integrate(), continuing from the current state
+                    self.method = "BDF" if self.y0.size > LARGE_SYSTEM_SIZE else "Radau"
+                    solver = self.solver(self.method, solver.t, solver.y)
+            while index < reached:
+                stop = min(reached, index + self.chunk_size - buffered)
+                t = OdeSolver.grid(self.start, self.end, self.step, index, stop)
+                blocks.append((t, dense(t)))
+                buffered += len(t)
+                index = stop
+                if buffered >= self.chunk_size:
+                    yield OdeStream.concatenate(blocks)
+                    blocks, buffered = [], 0
+        if blocks:
+            yield OdeStream.concatenate(blocks)
+
+    @staticmethod
+    def concatenate(blocks):
+        return np.concatenate([t for t, _ in blocks]), np.concatenate([y for _, y in blocks], axis=1)
+
+class LinearStream:
+    # OdeStream's interface for x' = A x + b: each block is evaluated in closed form, and
+    # the decomposition of A is cached, so blocks cost only their own grid points
+    def __init__(self, linear, start, end, step, y0, chunk_size):
+        self.linear = linear
+        self.start = start
+        self.end = end
+        self.step = step
+        self.y0 = np.asarray(y0, dtype=float)
+        self.chunk_size = max(1, int(chunk_size))
+        self.method = LINEAR_METHOD
+        self.stiffness = None
+        self.points = OdeSolver.grid_size(start, end, step)
+
+    def __iter__(self):
+        A, b = self.linear
+        for first in range(0, self.points, self.chunk_size):
+            t = OdeSolver.grid(self.start, self.end, self.step, first, min(first + self.chunk_size, self.points))
+            yield t, MatrixAlgebra.linear_flow(A, self.y0, t, self.start, b)["states"]
+
+class OdeProblem:
+    # Right-hand side, Jacobian, initial state and response details of one ODE request
+    @staticmethod
+    def build(equation, conditions, ode_type):
+        if ode_type == "first_order":
+            return OdeProblem.first_order(equation, conditions)
+        elif ode_type in ("second_order", "higher_order"):
+            return OdeProblem.higher_order(equation, conditions, ode_type)
+        elif ode_type == "system":
+            return OdeProblem.system(equation, conditions)
+        else:
+            raise ValueError(f"Unsupported ODE type: {ode_type}")
+
+    @staticmethod
+    def first_order_expression(equation):
+        equation = equation.replace(' ', '')
+
+        if 'dy/dx=' in equation:
+            return equation, equation.split('dy/dx=')[1]
+        elif "y'=" in equation:
+            return equation, equation.split("y'=")[1]
+        else:
+            raise ValueError("Invalid first order ODE format. Use: dy/dx = ... or y' = ...")
+
+    @staticmethod
+    def first_order_condition(conditions):
+        conditions = conditions.replace(' ', '')
+        ic_match = re.match(r"y\(([^)]+)\)=([^,]+)", conditions)
+        if not ic_match:
+            raise ValueError("Invalid initial condition format. Use: y(x0)=y0")
+
+        return float(ic_match.group(1)), float(ic_match.group(2))
+
+    @staticmethod
+    def first_order(equation, conditions):
+        equation, expr = OdeProblem.first_order_expression(equation)
+        x0, y0 = OdeProblem.first_order_condition(conditions)
+
+        rhs = ExpressionCompiler.compile(expr, ("x", "y"))
+
+        def ode_func(x, y):
+            return np.broadcast_to(rhs(x, y[0]), y[0].shape)[np.newaxis]
+
+        return {
+            "fun": ode_func,
+            "jac": None,
+            "y0": [y0],
+            "independent": "x",
+            "labels": ["y"],
+            "details": {
+                "type": "first_order",
+                "initial_condition": f"y({x0}) = {y0}",
+                "equation": equation
+            }
+        }
+
+    @staticmethod
+    def higher_order(equation, conditions, ode_type="higher_order"):
+        system = OdeSystem.higher_order(equation)
+        values = OdeSystem.parse_conditions(conditions)
+        return {
+            "fun": system.fun,
+            "jac": system.jac,
+            "system": system,
+            "y0": [values.get(("y", k), 0.0) for k in range(system.size)],
+            "independent": "x",
+            "labels": system.labels,
+            "details": {
+                "type": ode_type,
+                "order": system.size,
+                "initial_conditions": conditions.replace(' ', ''),
+                "equation": equation.replace(' ', '')
+            }
+        }
+
+    @staticmethod
+    def system(equations, conditions):
+        system = OdeSystem.first_order_system(equations)
+        values = OdeSystem.parse_conditions(conditions)
+        return {
+            "fun": system.fun,
+            "jac": system.jac,
+            "system": system,
+            "y0": [values.get((name, 0), 0.0) for name in system.symbols],
+            "independent": system.independent,
+            "labels": system.labels,
+            "details": {
+                "type": "system",
+                "variables": system.labels,
+                "independent": system.independent,
+                "initial_conditions": conditions.replace(' ', ''),
+                "equation": system.equation
+            }
+        }
+
+class SweepPool:
+    # Processes for sweeps of higher order ODEs and systems, started on the first such sweep
+    def __init__(self, workers=SWEEP_WORKERS):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            if self._executor is None:
+                # Spawned rather than forked: the server already runs job and batch threads
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+sweep_pool = SweepPool()
+
+class OdeSweep:
+    @staticmethod
+    def variables(equation, ode_type):
+        # Names the member problem solves for or integrates over; parameters are bound into the
+        # equation text, so one of these as a parameter would silently rewrite the equation
+        if ode_type != "system":
+            return {"x", "y"}
+        equations = re.split(r"[;\n]", equation) if isinstance(equation, str) else equation
+        names = set()
+        for text in equations:
+            match = SYSTEM_LHS_PATTERN.match(text.split("=")[0].replace(" ", ""))
+            if match:
+                names.update([match.group(1) or match.group(3), match.group(2) or "t"])
+        return names
+
+    @staticmethod
+    def parse_parameters(parameters, variables=()):
+        reserved = set(FUNCTIONS) | set(CONSTANTS) | {"x", "y", "t"}
+        names, values = [], []
+        for name, items in parameters.items():
+            if name in variables:
+                raise ValueError(f"Sweep parameter '{name}' is a variable of the equation")
+            if not re.match(r"^[A-Za-z_]\w*$", name) or name in reserved or re.match(r"^y_\d+$", name):
+                raise ValueError(f"Invalid sweep parameter name: {name}")
+            items = np.atleast_1d(np.asarray(items, dtype=float))
+            if items.ndim != 1 or items.size == 0:
+                raise ValueError(f"Sweep parameter '{name}' must be a non-empty list of numbers")
+            names.append(name)
+            values.append(items)
+        return names, values
+
+    @staticmethod
+    def expand(sweep, equation, conditions, ode_type):
+        # One entry per member: its condition string and its value of every parameter
+        if not isinstance(sweep, dict):
+            raise ValueError("A sweep object with initial and/or parameters lists is required")
+
+        mode = sweep.get("mode", "grid")
+        if mode not in SWEEP_MODES:
+            raise ValueError(f"Unsupported sweep mode: {mode}. Use one of: {', '.join(SWEEP_MODES)}")
+        initial = sweep.get("initial")
+        parameters = sweep.get("parameters") or {}
+        if not initial and not parameters:
+            raise ValueError("A sweep needs a list of initial conditions, parameter values, or both")
+        if not isinstance(parameters, dict):
+            raise ValueError("Sweep parameters must map names to lists of values")
+
+        if initial is None:
+            initial = [conditions]
+        elif not isinstance(initial, list):
+            initial = [initial]
+        members_conditions = []
+        for item in initial:
+            if isinstance(item, str):
+                members_conditions.append(item.strip())
+            elif ode_type == "first_order":
+                # Bare numbers are y0 values at the x0 of the base condition
+                x0, _ = OdeProblem.first_order_condition(conditions)
+                members_conditions.append(f"y({x0:g})={float(item)!r}")
+            else:
+                raise ValueError("Initial conditions of higher order ODEs and systems must be condition strings")
+
+        names, values = OdeSweep.parse_parameters(parameters, OdeSweep.variables(equation, ode_type))
+        sizes = [len(members_conditions)] + [len(v) for v in values]
+        if mode == "grid":
+            members = int(np.prod(sizes))
+        else:
+            members = max(sizes)
+            if any(size not in (1, members) for size in sizes):
+                raise ValueError("In zip mode every sweep list must have the same length (or length 1)")
+        if members > SWEEP_MAX_MEMBERS:
+            raise ValueError(f"Sweep has {members} members; the limit is {SWEEP_MAX_MEMBERS}")
+
+        if mode == "grid":
+            index = np.indices(sizes).reshape(len(sizes), -1)
+        else:
+            index = np.array([np.arange(members) if size > 1 else np.zeros(members, dtype=int) for size in sizes])
+        return {
+            "mode": mode,
+            "conditions": [members_conditions[i] for i in index[0]],
+            "parameters": {name: items[i] for name, items, i in zip(names, values, index[1:])}
+        }
+
+    @staticmethod
+    def first_order_problem(equation, sweep):
+        equation, expr = OdeProblem.first_order_expression(equation)
+        names = tuple(sweep["parameters"])
+        rhs = ExpressionCompiler.compile(expr, ("x", "y") + names)
+        y0 = np.array([OdeProblem.first_order_condition(c)[1] for c in sweep["conditions"]])
+        flat = [np.asarray(v, dtype=float) for v in sweep["parameters"].values()]
+        # Column vectors broadcast against the (members, k) states vectorized solvers pass in
+        columns = [v[:, np.newaxis] for v in flat]
+
+        def ode_func(x, y):
+            return np.broadcast_to(rhs(x, y, *columns), y.shape)
+
+        def ode_jac(x, y):
+            # Members never interact, so the Jacobian is diagonal: one forward difference per member
+            h = np.sqrt(np.finfo(float).eps) * np.maximum(1.0, np.abs(y))
+            slope = (rhs(x, y + h, *flat) - rhs(x, y, *flat)) / h
+            return sps.diags(np.broadcast_to(slope, y.shape), format="csc")
+
+        return {"fun": ode_func, "jac": ode_jac, "y0": y0, "equation": equation}
+
+    @staticmethod
+    def stacked(equation, start, end, step, method, rtol, atol, sweep, monitor=None):
+        problem = OdeSweep.first_order_problem(equation, sweep)
+        members = len(problem["y0"])
+        # The solvers bound the RMS error over all components; tightening by sqrt(members)
+        # keeps each member within the tolerance it would get when solved on its own
+        scale = np.sqrt(members)
+        solution, method_used, stiffness = OdeSolver.integrate(
+            problem["fun"], start, end, step, problem["y0"], method, rtol / scale, atol / scale,
+            jac=problem["jac"], monitor=monitor
+        )
+        ode_evaluations.observe(solution.nfev, method_used)
+        return {
+            "equation": problem["equation"],
+            "strategy": "stacked",
+            "method": method_used,
+            "stiffness": stiffness,
+            "solution": {"x": solution.t, "y": solution.y}
+        }
+
+    @staticmethod
+    def bind_parameters(text, values):
+        for name, value in values.items():
+            text = re.sub(rf"\b{name}\b", f"({float(value)!r})", text)
+        return text
+
+    @staticmethod
+    def member(equation, conditions, ode_type, start, end, step, method, rtol, atol):
+        # Runs in a pool process; only this module is imported there
+        problem = OdeProblem.build(equation, conditions, ode_type)
+        solution, method_used, _ = OdeSolver.integrate(
+            problem["fun"], start, end, step, problem["y0"], method, rtol, atol, jac=problem["jac"]
+        )
+        return solution.y, method_used, solution.nfev
+
+    @staticmethod
+    def fan_out(equation, conditions, ode_type, start, end, step, method, rtol, atol, sweep, monitor=None):
+        names = list(sweep["parameters"])
+        tasks = []
+        for i, member_conditions in enumerate(sweep["conditions"]):
+            values = {name: sweep["parameters"][name][i] for name in names}
+            tasks.append((OdeSweep.bind_parameters(equation, values), member_conditions, ode_type,
+                          start, end, step, method, rtol, atol))
+        # Compiling the first member up front reports malformed input before any process starts
+        problem = OdeProblem.build(*tasks[0][:3])
+
+        solutions, methods = [None] * len(tasks), [None] * len(tasks)
+        if sweep_pool.workers < 1:
+            for i, task in enumerate(tasks):
+                solutions[i], methods[i], nfev = OdeSweep.member(*task)
+                ode_evaluations.observe(nfev, methods[i])
+                if monitor:
+                    monitor((i + 1) / len(tasks))
+        else:
+            pool = sweep_pool.get()
+            futures = {pool.submit(OdeSweep.member, *task): i for i, task in enumerate(tasks)}
+            try:
+                for done, future in enumerate(as_completed(futures), 1):
+                    i = futures[future]
+                    solutions[i], methods[i], nfev = future.result()
+                    ode_evaluations.observe(nfev, methods[i])
+                    if monitor:
+                        monitor(done / len(tasks))
+            finally:
+                for future in futures:
+                    future.cancel()
+
+        stacked = np.stack(solutions)
+        result = {
+            "equation": equation,
+            "strategy": "process_pool",
+            "method": methods[0] if len(set(methods)) == 1 else methods,
+            "solution": {problem["independent"]: OdeSolver.grid(start, end, step)}
+        }
+        for k, label in enumerate(problem["labels"]):
+            result["solution"][label] = stacked[:, k, :]
+        return result
+
+    @staticmethod
+    def solve(equation, conditions, ode_type, start, end, step, method="auto", rtol=1e-3, atol=1e-6,
+              sweep=None, monitor=None):
+        try:
+            if ode_type == "first_order":
+                result = OdeSweep.stacked(equation, start, end, step, method, rtol, atol, sweep, monitor)
+            elif ode_type in ("second_order", "higher_order", "system"):
+                result = OdeSweep.fan_out(equation, conditions, ode_type, start, end, step, method, rtol, atol,
+                                          sweep, monitor)
+            else:
+                raise ValueError(f"Unsupported ODE type: {ode_type}")
+        except Exception as e:
+            raise Exception(f"ODE sweep failed: {str(e)}")
+
+        result.update({
+            "type": ode_type,
+            "range_start": start,
+            "range_end": end,
+            "step_size": step,
+            "sweep": {
+                "mode": sweep["mode"],
+                "members": len(sweep["conditions"]),
+                "conditions": sweep["conditions"],
+                "parameters": sweep["parameters"]
+            }
+        })
+        return result
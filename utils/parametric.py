@@ -0,0 +1,203 @@
+import os
+import re
+from functools import lru_cache
+import numpy as np
+from utils.lazy import lazy_module
+from utils.ode import ExpressionCompiler, OdeSystem, FUNCTIONS, CONSTANTS
+from utils.results import ResultEncoder
+
+sp = lazy_module("sympy")
+
+PARAMETRIC_OPERATIONS = ("det", "trace", "inverse", "eig", "rank", "nullity")
+PARAMETRIC_MODES = ("grid", "zip")
+PARAMETRIC_MAX_POINTS = int(os.environ.get("PARAMETRIC_MAX_POINTS", 100000))
+PARAMETRIC_MAX_SIZE = int(os.environ.get("PARAMETRIC_MAX_SIZE", 50))
+# Largest matrix whose result is derived in closed form; beyond it the formula outgrows LAPACK
+SYMBOLIC_LIMITS = {"trace": None, "det": 4, "inverse": 3, "eig": 2}
+# Closed forms bigger than this (in SymPy operation count) are dropped for the batched numeric path
+PARAMETRIC_MAX_OPS = int(os.environ.get("PARAMETRIC_MAX_OPS", 2000))
+NAME_PATTERN = re.compile(r"^[A-Za-z_]\w*$")
+
+class ParametricAlgebra:
+    @staticmethod
+    def parse_cells(matrix):
+        if not isinstance(matrix, list) or not matrix or not all(isinstance(row, list) for row in matrix):
+            raise ValueError("A parametric matrix must be a non-empty list of rows")
+        if any(len(row) != len(matrix[0]) for row in matrix) or not matrix[0]:
+            raise ValueError("Matrix rows must all have the same non-zero length")
+        if max(len(matrix), len(matrix[0])) > PARAMETRIC_MAX_SIZE:
+            raise ValueError(f"Parametric matrices are limited to {PARAMETRIC_MAX_SIZE}x{PARAMETRIC_MAX_SIZE}")
+        cells = []
+        for row in matrix:
+            for cell in row:
+                if isinstance(cell, bool) or not isinstance(cell, (str, int, float)):
+                    raise ValueError(f"Matrix cells must be numbers or expressions, got: {cell!r}")
+                if isinstance(cell, str):
+                    cells.append(re.sub(r"\s+", "", cell))
+                else:
+                    cells.append(str(cell) if isinstance(cell, int) else repr(float(cell)))
+        return tuple(cells), (len(matrix), len(matrix[0]))
+
+    @staticmethod
+    def parse_grid(parameters, mode="grid"):
+        if mode not in PARAMETRIC_MODES:
+            raise ValueError(f"Unsupported grid mode: {mode}. Use one of: {', '.join(PARAMETRIC_MODES)}")
+        if not isinstance(parameters, dict) or not parameters:
+            raise ValueError("Parameters must map each name to a list of values or {start, stop, num}")
+        names, axes = [], []
+        for name, values in parameters.items():
+            if not NAME_PATTERN.match(name) or name in FUNCTIONS or name in CONSTANTS:
+                raise ValueError(f"Invalid parameter name: {name}")
+            if isinstance(values, dict):
+                values = np.linspace(float(values["start"]), float(values["stop"]), int(values.get("num", 50)))
+            values = np.atleast_1d(np.asarray(values, dtype=float))
+            if values.ndim != 1 or values.size == 0:
+                raise ValueError(f"Parameter '{name}' needs a non-empty list of numbers")
+            names.append(name)
+            axes.append(values)
+
+        sizes = [len(values) for values in axes]
+        if mode == "grid":
+            shape = sizes
+            points = int(np.prod(sizes))
+        else:
+            points = max(sizes)
+            if any(size not in (1, points) for size in sizes):
+                raise ValueError("In zip mode every parameter list must have the same length (or length 1)")
+            shape = [points]
+        if points > PARAMETRIC_MAX_POINTS:
+            raise ValueError(f"Grid has {points} points; the limit is {PARAMETRIC_MAX_POINTS}")
+        if mode == "grid":
+            columns = [column.ravel() for column in np.meshgrid(*axes, indexing="ij")]
+        else:
+            columns = [np.broadcast_to(values, (points,)) for values in axes]
+        return tuple(names), columns, shape
+
+    @staticmethod
+    def stack(cells, shape, names, columns):
+        # Batched numeric path: one (points, n, n) array built from vectorized cell functions
+        points = len(columns[0])
+        stacked = np.empty((points,) + shape)
+        for index, cell in enumerate(cells):
+            value = ExpressionCompiler.compile(cell, names)(*columns)
+            stacked[:, index // shape[1], index % shape[1]] = value
+        return stacked
+
+    @staticmethod
+    def numeric(operation, stacked, tol=None):
+        if operation == "det":
+            return np.linalg.det(stacked)
+        if operation == "trace":
+            return np.trace(stacked, axis1=1, axis2=2)
+        if operation in ("rank", "nullity"):
+            rank = np.linalg.matrix_rank(stacked, tol=tol)
+            return rank if operation == "rank" else stacked.shape[2] - rank
+        if operation == "eig":
+            # Sorted so the eigenvalue columns of neighbouring grid points line up
+            return ResultEncoder.real_if_close(np.sort_complex(np.linalg.eigvals(stacked)))
+        if operation == "inverse":
+            # Singular grid points come back as NaN instead of failing the whole batch
+            inverse = np.full(stacked.shape, np.nan)
+            regular = np.linalg.cond(stacked) < 1.0 / np.finfo(float).eps
+            if regular.any():
+                inverse[regular] = np.linalg.inv(stacked[regular])
+            return inverse
+        raise ValueError(f"Unsupported parametric operation: {operation}")
+
+    @staticmethod
+    def kernel(operation, cells, shape, names):
+        # (function, closed-form text) or None when no tractable closed form exists
+        limit = SYMBOLIC_LIMITS.get(operation, 0)
+        if operation not in SYMBOLIC_LIMITS or shape[0] != shape[1] or (limit is not None and shape[0] > limit):
+            return None
+        try:
+            return _compile_kernel(operation, cells, shape, names)
+        except Exception:
+            return None
+
+    @staticmethod
+    def evaluate(operation, matrix, parameters, mode="grid", tol=None, method="auto"):
+        try:
+            if operation not in PARAMETRIC_OPERATIONS:
+                raise ValueError(f"Unsupported parametric operation: {operation}. "
+                                 f"Use one of: {', '.join(PARAMETRIC_OPERATIONS)}")
+            if method not in ("auto", "symbolic", "numeric"):
+                raise ValueError(f"Unknown method: {method}. Use auto, symbolic or numeric")
+            cells, shape = ParametricAlgebra.parse_cells(matrix)
+            if operation not in ("rank", "nullity") and shape[0] != shape[1]:
+                raise ValueError(f"Matrix must be square for {operation}")
+            names, columns, grid_shape = ParametricAlgebra.parse_grid(parameters, mode)
+            for cell in cells:
+                # Unknown names and unsafe syntax fail here, before any SymPy work
+                ExpressionCompiler.compile(cell, names)
+
+            kernel = ParametricAlgebra.kernel(operation, cells, shape, names) if method != "numeric" else None
+            if method == "symbolic" and kernel is None:
+                raise ValueError(f"No tractable closed form for {operation} of a {shape[0]}x{shape[1]} matrix")
+            if kernel is not None:
+                function, expression = kernel
+                values = ParametricAlgebra.apply_kernel(operation, function, shape, columns)
+            else:
+                expression = None
+                values = ParametricAlgebra.numeric(operation, ParametricAlgebra.stack(cells, shape, names, columns), tol)
+
+            result = {
+                "operation": operation,
+                "method": "symbolic" if kernel is not None else "numeric",
+                "mode": mode,
+                "grid_shape": grid_shape,
+                "points": len(columns[0]),
+                "parameters": {name: column for name, column in zip(names, columns)},
+                "values": values
+            }
+            if expression is not None:
+                result["expression"] = expression
+            return result
+        except Exception as e:
+            raise Exception(f"Parametric evaluation failed: {str(e)}")
+
+    @staticmethod
+    def apply_kernel(operation, function, shape, columns):
+        points = len(columns[0])
+        if operation == "eig":
+            # Closed-form roots take square roots of negative discriminants
+            columns = [column.astype(complex) for column in columns]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            outputs = function(*columns)
+        if operation in ("det", "trace"):
+            return np.broadcast_to(np.asarray(outputs, dtype=float), (points,)).copy()
+        dtype = complex if operation == "eig" else float
+        values = np.stack([np.broadcast_to(np.asarray(v, dtype=dtype), (points,)) for v in outputs], axis=1)
+        if operation == "eig":
+            return ResultEncoder.real_if_close(np.sort_complex(values))
+        # Points where the closed form divides by a vanishing determinant match the numeric path's NaN
+        values[~np.isfinite(values)] = np.nan
+        return values.reshape((points,) + shape)
+
+@lru_cache(maxsize=128)
+def _compile_kernel(operation, cells, shape, names):
+    M = sp.Matrix(shape[0], shape[1], [OdeSystem.parse_expression(cell, names) for cell in cells])
+    if operation == "trace":
+        expression = M.trace()
+    elif operation == "det":
+        expression = M.det(method="berkowitz")
+    elif operation == "inverse":
+        determinant = M.det(method="berkowitz")
+        if determinant == 0:
+            return None
+        expression = M.adjugate() / determinant
+    else:
+        expression = list(sp.roots(M.charpoly(sp.Dummy("lambda")), multiple=True))
+        if len(expression) != shape[0]:
+            return None
+    if isinstance(expression, list):
+        outputs = expression
+    elif isinstance(expression, sp.MatrixBase):
+        outputs = list(expression)
+    else:
+        outputs = expression
+    if sp.count_ops(outputs) > PARAMETRIC_MAX_OPS:
+        return None
+    symbols = [sp.Symbol(name) for name in names]
+    function = sp.lambdify(symbols, outputs, modules="numpy", cse=True)
+    return function, str(expression)
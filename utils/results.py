@@ -0,0 +1,72 @@
+import json
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Imaginary parts at this level are rounding noise from real spectra
+IMAGINARY_TOLERANCE = 1e-10
+ORJSON_OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+class ResultEncoder:
+    @staticmethod
+    def as_array(value):
+        # One conversion for a whole SymPy matrix or nested list: float64 when real, complex128 otherwise
+        if hasattr(value, "evalf") and hasattr(value, "tolist"):
+            value = value.evalf().tolist()
+        try:
+            return np.array(value, dtype=float)
+        except TypeError:
+            return ResultEncoder.real_if_close(np.array(value, dtype=complex))
+
+    @staticmethod
+    def real_if_close(array, tol=IMAGINARY_TOLERANCE):
+        array = np.asarray(array)
+        if np.iscomplexobj(array) and np.all(np.abs(array.imag) < tol):
+            return np.ascontiguousarray(array.real)
+        return array
+
+    @staticmethod
+    def complex_values(array):
+        # JSON has no complex numbers; each entry becomes {"real", "imag"}, keeping the array's nesting
+        array = np.asarray(array)
+        return ResultEncoder._pair(array.real.tolist(), array.imag.tolist())
+
+    @staticmethod
+    def _pair(real, imag):
+        if isinstance(real, list):
+            return [ResultEncoder._pair(r, i) for r, i in zip(real, imag)]
+        return {"real": real, "imag": imag}
+
+    @staticmethod
+    def default(o, fallback=None):
+        if isinstance(o, np.ndarray):
+            if o.dtype.kind == "c":
+                return ResultEncoder.complex_values(o)
+            if orjson is not None and not o.flags.c_contiguous:
+                # orjson serializes C-contiguous arrays itself; dtypes it lacks come back as lists
+                return np.ascontiguousarray(o)
+            return o.tolist()
+        if isinstance(o, (complex, np.complexfloating)):
+            return {"real": float(o.real), "imag": float(o.imag)}
+        if isinstance(o, np.generic):
+            return o.item()
+        if fallback is not None:
+            return fallback(o)
+        raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+    @staticmethod
+    def dumps(obj, fallback=None):
+        def default(o):
+            return ResultEncoder.default(o, fallback)
+        if orjson is not None:
+            return orjson.dumps(obj, default=default, option=ORJSON_OPTIONS)
+        return json.dumps(obj, default=default, separators=(",", ":")).encode("utf-8")
+
+    @staticmethod
+    def loads(data):
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
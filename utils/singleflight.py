@@ -0,0 +1,228 @@
+import base64
+import hashlib
+import math
+import os
+import stat
+import threading
+import time
+import numpy as np
+from utils.metrics import coalesced_requests
+from utils.results import ResultEncoder
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# A directory shared by the workers on one host turns on cross-worker coalescing (POSIX only)
+SINGLEFLIGHT_DIR = os.environ.get("SINGLEFLIGHT_DIR", "")
+# How long a worker waits for another worker's computation before running its own
+SINGLEFLIGHT_WAIT = float(os.environ.get("SINGLEFLIGHT_WAIT", 30))
+# Rendezvous files older than this are swept
+SINGLEFLIGHT_RETENTION = float(os.environ.get("SINGLEFLIGHT_RETENTION", 60))
+SINGLEFLIGHT_POLL = 0.01
+# Tag of the typed values in a rendezvous file; plain JSON dicts may not use it as a key
+TYPE_TAG = "__type__"
+
+def canonical(value):
+    if isinstance(value, dict):
+        return {"items": sorted([str(key), canonical(item)] for key, item in value.items())}
+    if isinstance(value, (list, tuple)):
+        return [canonical(item) for item in value]
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == "O":
+            return canonical(value.tolist())
+        digest = hashlib.blake2b(np.ascontiguousarray(value).tobytes(), digest_size=16).hexdigest()
+        return {"array": [value.dtype.str, list(value.shape), digest]}
+    return value
+
+def request_key(*parts):
+    raw = ResultEncoder.dumps(canonical(list(parts)), fallback=repr)
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    def __init__(self, directory=SINGLEFLIGHT_DIR):
+        self.directory = directory if fcntl is not None else ""
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+        self._counters = {"computed": 0, "coalesced": 0, "shared_across_workers": 0}
+
+    def run(self, kind, key, compute):
+        # Callers with the same key share one result object, so it must be treated as read-only
+        if key is None:
+            return compute()
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self._counters["coalesced"] += 1
+        if not leader:
+            coalesced_requests.inc(kind, "thread")
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._compute(kind, key, compute)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _compute(self, kind, key, compute):
+        if not self.directory or not self._trusted():
+            return self._count(compute)
+        path = os.path.join(self.directory, key)
+        started = time.time()
+        with open(path + ".lock", "a+b") as handle:
+            if not self._acquire(handle):
+                return self._count(compute)
+            try:
+                os.utime(path + ".lock")
+                # Only a result finished after this request arrived counts as the same flight
+                finished_at, result = self._read(path + ".result")
+                if finished_at is not None and finished_at >= started:
+                    with self._lock:
+                        self._counters["shared_across_workers"] += 1
+                    coalesced_requests.inc(kind, "worker")
+                    return result
+                result = self._count(compute)
+                self._write(path + ".result", result)
+                return result
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _count(self, compute):
+        result = compute()
+        with self._lock:
+            self._counters["computed"] += 1
+        return result
+
+    def _acquire(self, handle):
+        deadline = time.monotonic() + SINGLEFLIGHT_WAIT
+        while True:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    return False
+                time.sleep(SINGLEFLIGHT_POLL)
+
+    def _trusted(self):
+        # Results are shared only through a private directory: owned by this user and closed to
+        # everyone else, so no other account can plant a result for the workers to return
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            info = os.stat(self.directory)
+        except OSError:
+            return False
+        return info.st_uid == os.geteuid() and not stat.S_IMODE(info.st_mode) & 0o077
+
+    @staticmethod
+    def encode(value):
+        # JSON with tagged arrays, tuples, complex numbers and non-finite floats, so a result read
+        # back has the types it was written with; anything else raises TypeError
+        if isinstance(value, np.generic):
+            return {TYPE_TAG: "scalar", "value": SingleFlight.encode(np.asarray(value))}
+        if value is None or isinstance(value, (bool, str, int)):
+            return value
+        if isinstance(value, float):
+            return value if math.isfinite(value) else {TYPE_TAG: "float", "value": repr(value)}
+        if isinstance(value, np.ndarray):
+            if value.dtype.kind not in "biufc":
+                raise TypeError(f"Cannot share an array of dtype {value.dtype}")
+            data = base64.b64encode(np.ascontiguousarray(value).tobytes()).decode("ascii")
+            return {TYPE_TAG: "ndarray", "dtype": value.dtype.str, "shape": list(value.shape), "data": data}
+        if isinstance(value, complex):
+            return {TYPE_TAG: "complex", "real": SingleFlight.encode(value.real), "imag": SingleFlight.encode(value.imag)}
+        if isinstance(value, tuple):
+            return {TYPE_TAG: "tuple", "items": [SingleFlight.encode(item) for item in value]}
+        if isinstance(value, list):
+            return [SingleFlight.encode(item) for item in value]
+        if isinstance(value, dict):
+            if TYPE_TAG in value or not all(isinstance(key, str) for key in value):
+                raise TypeError("Cannot share a dict with non-string or reserved keys")
+            return {key: SingleFlight.encode(item) for key, item in value.items()}
+        raise TypeError(f"Cannot share a result of type {type(value).__name__}")
+
+    @staticmethod
+    def decode(value):
+        if isinstance(value, list):
+            return [SingleFlight.decode(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        tag = value.get(TYPE_TAG)
+        if tag is None:
+            return {key: SingleFlight.decode(item) for key, item in value.items()}
+        if tag == "ndarray":
+            data = bytearray(base64.b64decode(value["data"]))
+            return np.frombuffer(data, dtype=np.dtype(value["dtype"])).reshape(value["shape"])
+        if tag == "scalar":
+            return SingleFlight.decode(value["value"])[()]
+        if tag == "float":
+            return float(value["value"])
+        if tag == "complex":
+            return complex(SingleFlight.decode(value["real"]), SingleFlight.decode(value["imag"]))
+        if tag == "tuple":
+            return tuple(SingleFlight.decode(item) for item in value["items"])
+        raise ValueError(f"Unknown value type: {tag}")
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path, "rb") as handle:
+                stored = ResultEncoder.loads(handle.read())
+            return float(stored["finished_at"]), SingleFlight.decode(stored["result"])
+        except (OSError, ValueError, TypeError, KeyError):
+            return None, None
+
+    def _write(self, path, result):
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            body = ResultEncoder.dumps({"finished_at": time.time(), "result": SingleFlight.encode(result)})
+            with open(temporary, "wb") as handle:
+                handle.write(body)
+            os.replace(temporary, path)
+        except (OSError, TypeError, ValueError):
+            # Results the format cannot hold are simply not shared with other workers
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        self._sweep()
+
+    def _sweep(self):
+        now = time.time()
+        if now - self._last_sweep < SINGLEFLIGHT_RETENTION:
+            return
+        self._last_sweep = now
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                # A lock file removed while a worker waits on it costs at most one duplicate computation
+                if now - os.path.getmtime(path) > SINGLEFLIGHT_RETENTION:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["in_flight"] = len(self._flights)
+        stats["cross_worker"] = bool(self.directory) and self._trusted()
+        return stats
+
+single_flight = SingleFlight()
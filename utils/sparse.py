@@ -0,0 +1,220 @@
+import os
+import numpy as np
+from utils.lazy import lazy_module
+from utils.numeric import NumericEngine
+
+sps = lazy_module("scipy.sparse")
+csgraph = lazy_module("scipy.sparse.csgraph")
+spla = lazy_module("scipy.sparse.linalg")
+
+SPARSE_FORMATS = ("coo", "csr")
+SPARSE_OPERATIONS = frozenset(["rank", "nullity", "transpose", "trace", "solve", "eigs"])
+EIGEN_TARGETS = {
+    "largest": "LM", "smallest": "SM",
+    "LM": "LM", "SM": "SM", "LA": "LA", "SA": "SA", "LR": "LR", "SR": "SR"
+}
+DEFAULT_EIGENPAIRS = 6
+# ARPACK's default allows 10n restarts, which can pin a worker for minutes on clustered spectra
+SPARSE_EIGEN_MAXITER = int(os.environ.get("SPARSE_EIGEN_MAXITER", 1000))
+# Largest coupled block (rows x columns) whose singular values rank computes densely
+SPARSE_RANK_MAX_BLOCK = int(os.environ.get("SPARSE_RANK_MAX_BLOCK", 4000000))
+
+class SparseAlgebra:
+    @staticmethod
+    def is_sparse(matrix):
+        if sps.issparse(matrix):
+            return True
+        return isinstance(matrix, dict) and matrix.get("format") in SPARSE_FORMATS
+
+    @staticmethod
+    def from_payload(matrix):
+        if sps.issparse(matrix):
+            return sps.csr_matrix(matrix, dtype=float)
+        try:
+            shape = tuple(int(n) for n in matrix["shape"])
+            if len(shape) != 2 or min(shape) < 1:
+                raise ValueError("shape must be [rows, cols]")
+            data = np.asarray(matrix["data"], dtype=float)
+            if matrix["format"] == "coo":
+                row = np.asarray(matrix["row"], dtype=np.int64)
+                col = np.asarray(matrix["col"], dtype=np.int64)
+                # Duplicate triplets are summed, as scipy does
+                return sps.coo_matrix((data, (row, col)), shape=shape).tocsr()
+            indptr = np.asarray(matrix["indptr"], dtype=np.int64)
+            indices = np.asarray(matrix["indices"], dtype=np.int64)
+            S = sps.csr_matrix((data, indices, indptr), shape=shape)
+            S.check_format(full_check=True)
+            return S
+        except KeyError as e:
+            raise ValueError(f"Sparse matrix is missing field {e}")
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid sparse matrix: {str(e)}")
+
+    @staticmethod
+    def to_payload(S):
+        C = S.tocoo()
+        return {"format": "coo", "shape": list(C.shape), "row": C.row, "col": C.col, "data": C.data}
+
+    @staticmethod
+    def densify(matrix):
+        return SparseAlgebra.from_payload(matrix).toarray()
+
+    @staticmethod
+    def run(operation, matrix, tol=None, **options):
+        if operation not in SPARSE_OPERATIONS:
+            raise ValueError(
+                f"Operation '{operation}' is not available for sparse matrices. "
+                f"Use one of: {', '.join(sorted(SPARSE_OPERATIONS))}, or pass dense=true to densify"
+            )
+        S = SparseAlgebra.from_payload(matrix)
+        if operation in ("rank", "nullity"):
+            return getattr(SparseAlgebra, operation)(S, tol)
+        return getattr(SparseAlgebra, operation)(S, **options)
+
+    @staticmethod
+    def singular_values(S):
+        # Rows and columns that share no nonzero fall apart into independent blocks, and the
+        # singular values of S are those of its blocks together; each block is taken densely
+        A = sps.coo_matrix(S)
+        A.sum_duplicates()
+        A.eliminate_zeros()
+        m, n = A.shape
+        if A.nnz == 0:
+            return np.zeros(0)
+        graph = sps.coo_matrix((np.ones(A.nnz), (A.row, A.col + m)), shape=(m + n, m + n))
+        count, labels = csgraph.connected_components(graph, directed=False)
+        row_labels, column_labels = labels[:m], labels[m:]
+        rows = np.bincount(row_labels, minlength=count)
+        columns = np.bincount(column_labels, minlength=count)
+        coupled = (rows > 0) & (columns > 0)
+        # A block with a single row or column has one singular value: its Euclidean norm
+        vector = coupled & ((rows == 1) | (columns == 1))
+        entry_labels = row_labels[A.row]
+        squares = np.bincount(entry_labels, weights=A.data ** 2, minlength=count)
+        values = [np.sqrt(squares[vector])]
+        blocks = np.flatnonzero(coupled & ~vector)
+        if blocks.size:
+            largest = blocks[np.argmax(rows[blocks] * columns[blocks])]
+            if rows[largest] * columns[largest] > SPARSE_RANK_MAX_BLOCK:
+                raise ValueError(
+                    f"A coupled {rows[largest]}x{columns[largest]} block exceeds the dense limit of "
+                    f"{SPARSE_RANK_MAX_BLOCK} entries (SPARSE_RANK_MAX_BLOCK)"
+                )
+            # Position of every row (column) inside its block
+            row_position = SparseAlgebra.block_positions(row_labels, count)
+            column_position = SparseAlgebra.block_positions(column_labels, count)
+            inside = ~vector[entry_labels]
+            entry_labels = entry_labels[inside]
+            entry_rows, entry_columns = row_position[A.row[inside]], column_position[A.col[inside]]
+            data = A.data[inside]
+            # Blocks of one shape go through LAPACK as a stack, a bounded number of entries at a time
+            slot = np.zeros(count, dtype=np.int64)
+            shapes = rows[blocks] * (n + 1) + columns[blocks]
+            for shape in np.unique(shapes):
+                group = blocks[shapes == shape]
+                r, c = rows[group[0]], columns[group[0]]
+                step = max(1, SPARSE_RANK_MAX_BLOCK // (r * c))
+                for first in range(0, group.size, step):
+                    chunk = group[first:first + step]
+                    slot[chunk] = np.arange(chunk.size)
+                    selected = np.isin(entry_labels, chunk)
+                    stack = np.zeros((chunk.size, r, c))
+                    stack[slot[entry_labels[selected]], entry_rows[selected], entry_columns[selected]] = data[selected]
+                    values.append(np.linalg.svd(stack, compute_uv=False).ravel())
+        return np.sort(np.concatenate(values))[::-1]
+
+    @staticmethod
+    def block_positions(labels, count):
+        order = np.argsort(labels, kind="stable")
+        starts = np.searchsorted(labels[order], np.arange(count))
+        positions = np.empty(labels.size, dtype=np.int64)
+        positions[order] = np.arange(labels.size) - starts[labels[order]]
+        return positions
+
+    @staticmethod
+    def rank(S, tol=None):
+        try:
+            # The same cutoff as the dense numeric engine: singular values above tol,
+            # by default max(shape) * eps * the largest singular value
+            return NumericEngine.rank_from_singular_values(SparseAlgebra.singular_values(S), S.shape, tol)
+        except Exception as e:
+            raise Exception(f"Sparse rank estimation failed: {str(e)}")
+
+    @staticmethod
+    def nullity(S, tol=None):
+        return S.shape[1] - SparseAlgebra.rank(S, tol)
+
+    @staticmethod
+    def transpose(S):
+        return SparseAlgebra.to_payload(S.T)
+
+    @staticmethod
+    def trace(S):
+        if S.shape[0] != S.shape[1]:
+            raise ValueError("Matrix must be square for trace computation")
+        return float(S.diagonal().sum())
+
+    @staticmethod
+    def solve(S, rhs=None):
+        try:
+            if S.shape[0] != S.shape[1]:
+                raise ValueError("Coefficient matrix must be square for a sparse LU solve")
+            if rhs is None:
+                raise ValueError("A right-hand side (rhs) is required")
+            b = np.asarray(rhs, dtype=float)
+            if b.shape[0] != S.shape[0]:
+                raise ValueError(f"Right-hand side has {b.shape[0]} rows; expected {S.shape[0]}")
+            lu = spla.splu(S.tocsc())
+            return lu.solve(b)
+        except RuntimeError as e:
+            raise Exception(f"Sparse solve failed: matrix is singular ({str(e)})")
+        except Exception as e:
+            raise Exception(f"Sparse solve failed: {str(e)}")
+
+    @staticmethod
+    def eigs(S, k=DEFAULT_EIGENPAIRS, which="largest"):
+        try:
+            n = S.shape[0]
+            if n != S.shape[1]:
+                raise ValueError("Matrix must be square for eigen analysis")
+            if which not in EIGEN_TARGETS:
+                raise ValueError(f"Unsupported target: {which}. Use one of: {', '.join(EIGEN_TARGETS)}")
+            target = EIGEN_TARGETS[which]
+            symmetric = abs(S - S.T).max() <= 1e-12 * max(abs(S).max(), 1.0)
+            k = int(k)
+            limit = n - 1 if symmetric else n - 2
+            if not 1 <= k <= limit:
+                raise ValueError(f"k must be between 1 and {limit} for a {n}x{n} matrix")
+            options = {"k": k, "maxiter": SPARSE_EIGEN_MAXITER}
+            if target == "SM":
+                # Shift-invert around zero converges far faster than ARPACK's SM mode
+                options.update(sigma=0, which="LM")
+            else:
+                options["which"] = target
+            if symmetric:
+                if target in ("LR", "SR"):
+                    options["which"] = "LA" if target == "LR" else "SA"
+                values, vectors = spla.eigsh(S.tocsc(), **options)
+            else:
+                if target in ("LA", "SA"):
+                    options["which"] = "LR" if target == "LA" else "SR"
+                values, vectors = spla.eigs(S.tocsc(), **options)
+            keys = {"LM": -np.abs(values), "SM": np.abs(values), "LA": -values.real, "LR": -values.real,
+                    "SA": values.real, "SR": values.real}
+            order = np.argsort(keys[target], kind="stable")
+            values, vectors = values[order], vectors[:, order]
+            if np.iscomplexobj(values) and np.all(np.abs(values.imag) < 1e-10):
+                values, vectors = values.real, vectors.real
+            return {
+                "eigenvalues": values,
+                "eigenvectors": vectors.T,
+                "symmetric": bool(symmetric),
+                "which": which
+            }
+        except spla.ArpackNoConvergence as e:
+            raise Exception(
+                f"Sparse eigen analysis failed: only {len(e.eigenvalues)} of {k} eigenpairs converged "
+                f"within {SPARSE_EIGEN_MAXITER} iterations; try which='smallest' or a smaller k"
+            )
+        except Exception as e:
+            raise Exception(f"Sparse eigen analysis failed: {str(e)}")
@@ -0,0 +1,172 @@
+import json
+import os
+import sqlite3
+import threading
+import numpy as np
+from utils.metrics import storage_latency
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matrices (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    cols INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_matrices_name ON matrices(name);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+METADATA_COLUMNS = "name, rows, cols, created_at, updated_at"
+
+class MatrixExistsError(ValueError):
+    pass
+
+class MatrixStore:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self.connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.row_factory = sqlite3.Row
+            # WAL lets gunicorn workers read while another one writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def encode(matrix):
+        A = np.asarray(matrix, dtype="<f8")
+        if A.ndim != 2 or A.size == 0:
+            raise ValueError("Matrix must be a non-empty two-dimensional list of numbers")
+        return A.shape[0], A.shape[1], A.tobytes()
+
+    @staticmethod
+    def decode(row):
+        return np.frombuffer(row["data"], dtype="<f8").reshape(row["rows"], row["cols"])
+
+    @staticmethod
+    def metadata(row):
+        return {
+            "name": row["name"],
+            "rows": row["rows"],
+            "cols": row["cols"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"]
+        }
+
+    @staticmethod
+    def now():
+        return np.datetime64("now").astype(str)
+
+    @storage_latency.timed("matrices", "write")
+    def insert(self, name, matrix):
+        rows, cols, blob = MatrixStore.encode(matrix)
+        timestamp = MatrixStore.now()
+        try:
+            with self.connection() as conn:
+                conn.execute(
+                    "INSERT INTO matrices (name, rows, cols, data, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (name, rows, cols, blob, timestamp, timestamp)
+                )
+        except sqlite3.IntegrityError:
+            raise MatrixExistsError(f"A matrix named '{name}' already exists")
+        return {"name": name, "rows": rows, "cols": cols, "created_at": timestamp, "updated_at": timestamp}
+
+    @storage_latency.timed("matrices", "write")
+    def update(self, old_name, new_name, matrix):
+        rows, cols, blob = MatrixStore.encode(matrix)
+        try:
+            with self.connection() as conn:
+                cursor = conn.execute(
+                    "UPDATE matrices SET name = ?, rows = ?, cols = ?, data = ?, updated_at = ? WHERE name = ?",
+                    (new_name, rows, cols, blob, MatrixStore.now(), old_name)
+                )
+        except sqlite3.IntegrityError:
+            raise MatrixExistsError(f"A matrix named '{new_name}' already exists")
+        return cursor.rowcount > 0
+
+    @storage_latency.timed("matrices", "write")
+    def edit(self, old_name, new_name, change):
+        # BEGIN IMMEDIATE takes the write lock before the read, so concurrent edits cannot interleave
+        conn = self.connection()
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute("SELECT rows, cols, data FROM matrices WHERE name = ?", (old_name,)).fetchone()
+                if row is None:
+                    return None
+                matrix = change(MatrixStore.decode(row))
+                rows, cols, blob = MatrixStore.encode(matrix)
+                conn.execute(
+                    "UPDATE matrices SET name = ?, rows = ?, cols = ?, data = ?, updated_at = ? WHERE name = ?",
+                    (new_name, rows, cols, blob, MatrixStore.now(), old_name)
+                )
+        except sqlite3.IntegrityError:
+            raise MatrixExistsError(f"A matrix named '{new_name}' already exists")
+        return matrix
+
+    @storage_latency.timed("matrices", "write")
+    def delete(self, name):
+        with self.connection() as conn:
+            cursor = conn.execute("DELETE FROM matrices WHERE name = ?", (name,))
+        return cursor.rowcount > 0
+
+    @storage_latency.timed("matrices", "read")
+    def get(self, name):
+        row = self.connection().execute(
+            "SELECT rows, cols, data FROM matrices WHERE name = ?", (name,)
+        ).fetchone()
+        return MatrixStore.decode(row) if row else None
+
+    @storage_latency.timed("matrices", "read")
+    def count(self):
+        return self.connection().execute("SELECT COUNT(*) FROM matrices").fetchone()[0]
+
+    @storage_latency.timed("matrices", "read")
+    def list(self, offset=0, limit=50):
+        rows = self.connection().execute(
+            f"SELECT {METADATA_COLUMNS} FROM matrices ORDER BY id LIMIT ? OFFSET ?", (limit, offset)
+        ).fetchall()
+        return [MatrixStore.metadata(row) for row in rows]
+
+    @storage_latency.timed("matrices", "read")
+    def all(self):
+        rows = self.connection().execute("SELECT name, rows, cols, data FROM matrices ORDER BY id").fetchall()
+        return [{"name": row["name"], "matrix": MatrixStore.decode(row).tolist()} for row in rows]
+
+    def migrate_json(self, json_path):
+        conn = self.connection()
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+            return 0
+        matrices = []
+        if os.path.exists(json_path):
+            with open(json_path, "r", encoding="utf-8") as f:
+                matrices = json.load(f)
+        imported = 0
+        timestamp = MatrixStore.now()
+        with conn:
+            for entry in matrices:
+                try:
+                    rows, cols, blob = MatrixStore.encode(entry["matrix"])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                # The JSON file allowed duplicate names; the first one was the one updates touched
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO matrices (name, rows, cols, data, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (str(entry.get("name", "")).strip() or f"M{imported + 1}", rows, cols, blob, timestamp, timestamp)
+                )
+                imported += cursor.rowcount
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('json_migrated', ?)", (timestamp,))
+        return imported
@@ -0,0 +1,157 @@
+import base64
+import io
+import json
+import numpy as np
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON = "application/json"
+NPY = "application/x-npy"
+MSGPACK = "application/x-msgpack"
+FORMATS = {"json": JSON, "npy": NPY, "msgpack": MSGPACK}
+# Wire dtype of every encoded matrix: little-endian float64
+WIRE_DTYPE = np.dtype("<f8")
+NPY_HEADER_READERS = {
+    (1, 0): np.lib.format.read_array_header_1_0,
+    (2, 0): np.lib.format.read_array_header_2_0
+}
+
+class MatrixTransport:
+    @staticmethod
+    def is_encoded(value):
+        # Sparse matrices also carry shape and data, but always name their format
+        return isinstance(value, dict) and "shape" in value and "data" in value and "format" not in value
+
+    @staticmethod
+    def decode_matrix(value):
+        if not MatrixTransport.is_encoded(value):
+            return value
+        dtype = np.dtype(value.get("dtype", "<f8"))
+        if dtype != WIRE_DTYPE:
+            raise ValueError(f"Unsupported matrix dtype: {value.get('dtype')}. Use <f8 (little-endian float64)")
+        raw = value["data"]
+        if isinstance(raw, str):
+            raw = base64.b64decode(raw, validate=True)
+        shape = tuple(int(n) for n in value["shape"])
+        # A view over the decoded bytes; no per-element Python objects are created
+        return np.frombuffer(raw, dtype=WIRE_DTYPE).reshape(shape)
+
+    @staticmethod
+    def decode_payload(value):
+        if isinstance(value, dict):
+            if MatrixTransport.is_encoded(value):
+                return MatrixTransport.decode_matrix(value)
+            return {key: MatrixTransport.decode_payload(item) for key, item in value.items()}
+        # Only lists of objects (e.g. batch jobs) are walked; nested number lists are left alone
+        if isinstance(value, list) and value and isinstance(value[0], dict):
+            return [MatrixTransport.decode_payload(item) for item in value]
+        return value
+
+    @staticmethod
+    def read_npy(raw):
+        stream = io.BytesIO(raw)
+        version = np.lib.format.read_magic(stream)
+        reader = NPY_HEADER_READERS.get(version)
+        if reader is None:
+            return np.load(io.BytesIO(raw), allow_pickle=False)
+        shape, fortran_order, dtype = reader(stream)
+        if dtype.kind not in "iuf":
+            raise ValueError(f"Unsupported .npy dtype: {dtype}")
+        count = int(np.prod(shape)) if shape else 1
+        array = np.frombuffer(raw, dtype=dtype, count=count, offset=stream.tell())
+        return array.reshape(shape, order="F" if fortran_order else "C")
+
+    @staticmethod
+    def write_npy(array):
+        buffer = io.BytesIO()
+        np.save(buffer, np.asarray(array), allow_pickle=False)
+        return buffer.getvalue()
+
+    @staticmethod
+    def query_params(args):
+        params = {}
+        for key, value in args.items():
+            try:
+                params[key] = json.loads(value)
+            except ValueError:
+                params[key] = value
+        return params
+
+    @staticmethod
+    def read_request(request):
+        mimetype = request.mimetype
+        if mimetype == NPY:
+            # The body is the matrix itself; everything else travels in the query string
+            params = MatrixTransport.query_params(request.args)
+            params["matrix"] = MatrixTransport.read_npy(request.get_data(cache=False))
+            return params
+        if mimetype == MSGPACK:
+            if msgpack is None:
+                raise ValueError("msgpack support is not installed on this server")
+            return MatrixTransport.decode_payload(msgpack.unpackb(request.get_data(cache=False), raw=False))
+        return MatrixTransport.decode_payload(request.get_json(silent=True))
+
+    @staticmethod
+    def option(request, data, key):
+        if request.args.get(key):
+            return request.args.get(key)
+        return data.get(key) if isinstance(data, dict) else None
+
+    @staticmethod
+    def response_format(request, data=None):
+        requested = MatrixTransport.option(request, data, "format")
+        if requested:
+            if requested not in FORMATS:
+                raise ValueError(f"Unsupported response format: {requested}. Use one of: {', '.join(FORMATS)}")
+            return FORMATS[requested]
+        # Only explicit Accept entries opt in; browsers sending */* keep getting JSON
+        for mimetype in request.accept_mimetypes.values():
+            if mimetype in (NPY, MSGPACK):
+                return mimetype
+        return JSON
+
+    @staticmethod
+    def encode_matrix(array, binary=False):
+        A = np.ascontiguousarray(array, dtype=WIRE_DTYPE)
+        data = A.tobytes() if binary else base64.b64encode(A).decode("ascii")
+        return {"dtype": WIRE_DTYPE.str, "shape": list(A.shape), "data": data}
+
+    @staticmethod
+    def encode_payload(value, binary=False):
+        if isinstance(value, np.ndarray):
+            if value.dtype.kind in "iuf" and value.ndim > 0:
+                return MatrixTransport.encode_matrix(value, binary)
+            if value.dtype.kind == "c" and value.ndim > 0:
+                # Complex results travel as two float64 matrices
+                return {"real": MatrixTransport.encode_matrix(value.real, binary),
+                        "imag": MatrixTransport.encode_matrix(value.imag, binary)}
+            return MatrixTransport.encode_payload(value.tolist(), binary)
+        if isinstance(value, (complex, np.complexfloating)):
+            return {"real": float(value.real), "imag": float(value.imag)}
+        if isinstance(value, np.generic):
+            return value.item()
+        if isinstance(value, dict):
+            return {key: MatrixTransport.encode_payload(item, binary) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [MatrixTransport.encode_payload(item, binary) for item in value]
+        return value
+
+    @staticmethod
+    def pack(payload, mimetype, base64_arrays=False):
+        if mimetype == NPY:
+            for key in ("result", "matrix"):
+                value = payload.get(key) if isinstance(payload, dict) else None
+                if isinstance(value, np.ndarray) and value.dtype.kind in "iuf":
+                    return MatrixTransport.write_npy(value), NPY
+            # Scalars, messages and errors have no .npy form
+            mimetype = JSON
+        if mimetype == MSGPACK:
+            if msgpack is None:
+                raise ValueError("msgpack support is not installed on this server")
+            return msgpack.packb(MatrixTransport.encode_payload(payload, binary=True), use_bin_type=True), MSGPACK
+        if base64_arrays:
+            payload = MatrixTransport.encode_payload(payload)
+        return payload, JSON
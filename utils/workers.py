@@ -0,0 +1,177 @@
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+SYMBOLIC_POOL_SIZE = int(os.environ.get("SYMBOLIC_POOL_SIZE", 2))
+SYMBOLIC_TIMEOUT = float(os.environ.get("SYMBOLIC_TIMEOUT", 10))
+# Per-operation overrides, e.g. SYMBOLIC_TIMEOUTS='{"diagonalize": 30}'
+SYMBOLIC_TIMEOUTS = json.loads(os.environ.get("SYMBOLIC_TIMEOUTS", "{}"))
+# Cheap symbolic operations stay in the request thread; IPC would cost more than they do
+SYMBOLIC_POOL_OPERATIONS = frozenset([
+    "rref", "ref", "det", "linear_independent", "basis_dimension", "row_space",
+    "col_space", "inverse", "rank", "nullity", "diagonalize"
+])
+# How often a task with a monitor checks it, e.g. for job cancellation
+SYMBOLIC_MONITOR_INTERVAL = 0.2
+
+class OperationTimeout(Exception):
+    def __init__(self, operation, limit, message=None):
+        self.operation = operation
+        self.limit = limit
+        super().__init__(message or f"Operation '{operation}' exceeded its {limit:g}s time limit")
+
+    def to_dict(self):
+        return {
+            "success": False,
+            "timed_out": True,
+            "operation": self.operation,
+            "limit_seconds": self.limit,
+            "error": str(self)
+        }
+
+def _worker_main(conn):
+    # Importing here is the warm-up: SymPy is loaded before the first task arrives
+    from utils.algebra import MatrixAlgebra
+    from utils.lazy import preload
+    preload()
+    conn.send(("ready", None))
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            return
+        if task is None:
+            return
+        operation, matrix, options = task
+        try:
+            conn.send(("ok", getattr(MatrixAlgebra, operation)(matrix, **options)))
+        except Exception as e:
+            conn.send(("error", str(e)))
+
+class _Worker:
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+
+    def stop(self):
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(1.0)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join(1.0)
+        self.conn.close()
+
+class SymbolicPool:
+    def __init__(self, size=SYMBOLIC_POOL_SIZE, timeout=SYMBOLIC_TIMEOUT, timeouts=None):
+        self.size = size
+        self.timeout = timeout
+        self.timeouts = dict(SYMBOLIC_TIMEOUTS if timeouts is None else timeouts)
+        self.counters = {"tasks": 0, "timeouts": 0, "restarts": 0, "errors": 0, "cancelled": 0}
+        self._context = multiprocessing.get_context("spawn")
+        self._idle = queue.Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+        self._started = False
+
+    @property
+    def enabled(self):
+        return self.size > 0
+
+    def handles(self, operation):
+        return self.enabled and operation in SYMBOLIC_POOL_OPERATIONS
+
+    def limit_for(self, operation):
+        return float(self.timeouts.get(operation, self.timeout))
+
+    def start(self):
+        if self._started:
+            return
+        with self._lock:
+            if self._started:
+                return
+            for _ in range(self.size):
+                self._spawn()
+            self._started = True
+
+    def _spawn(self):
+        worker = _Worker(self._context)
+        self._workers.append(worker)
+        self._idle.put(worker)
+        return worker
+
+    def _replace(self, worker):
+        worker.stop()
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+            self.counters["restarts"] += 1
+            self._spawn()
+
+    def run(self, operation, matrix, options=None, monitor=None):
+        limit = self.limit_for(operation)
+        deadline = time.monotonic() + limit
+        self.start()
+        try:
+            worker = self._idle.get(timeout=limit)
+        except queue.Empty:
+            self.counters["timeouts"] += 1
+            raise OperationTimeout(operation, limit, f"No symbolic worker became free within {limit:g}s for '{operation}'")
+
+        self.counters["tasks"] += 1
+        try:
+            worker.conn.send((operation, matrix, options or {}))
+            while True:
+                remaining = deadline - time.monotonic()
+                wait = remaining if monitor is None else min(remaining, SYMBOLIC_MONITOR_INTERVAL)
+                if remaining <= 0 or not worker.conn.poll(wait):
+                    if monitor is not None and remaining > SYMBOLIC_MONITOR_INTERVAL:
+                        self._check(worker, monitor)
+                        continue
+                    # The only way to stop a runaway SymPy computation is to kill its process
+                    self.counters["timeouts"] += 1
+                    self._replace(worker)
+                    raise OperationTimeout(operation, limit)
+                status, payload = worker.conn.recv()
+                if status != "ready":
+                    break
+        except (EOFError, OSError):
+            self.counters["errors"] += 1
+            self._replace(worker)
+            raise Exception(f"Symbolic worker exited while computing '{operation}'")
+
+        self._idle.put(worker)
+        if status == "error":
+            self.counters["errors"] += 1
+            raise Exception(payload)
+        return payload
+
+    def _check(self, worker, monitor):
+        # A monitor that raises (a cancelled job) takes the worker down with it
+        try:
+            monitor(0.0)
+        except Exception:
+            self.counters["cancelled"] += 1
+            self._replace(worker)
+            raise
+
+    def shutdown(self):
+        with self._lock:
+            for worker in self._workers:
+                worker.stop()
+            self._workers = []
+            self._idle = queue.Queue()
+            self._started = False
+
+    def stats(self):
+        stats = dict(self.counters)
+        stats.update({"size": self.size, "default_timeout": self.timeout, "timeouts_by_operation": self.timeouts})
+        return stats
+
+symbolic_pool = SymbolicPool()